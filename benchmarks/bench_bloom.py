@@ -0,0 +1,53 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+'''Timings of miss-heavy membership probes with unicode_bloom_filter in front
+of a unicode_set and of a mmap_unicode_dict, next to the containers alone,
+and the memory of the filter.
+
+Usage: python benchmarks/bench_bloom.py [number of strings]
+'''
+from __future__ import print_function
+import os
+import shutil
+import sys
+import tempfile
+
+from unicode_col import unicode_set, unicode_bloom_filter, mmap_unicode_dict, write_mmap_dict
+from bench_containers import make_names, bench, bench_memory
+
+def main(n):
+    names = make_names(n)
+    blocklist = unicode_set(names)
+    # About 1% of the probes are in the set
+    probes = [name + u'q' for name in make_names(9900, seed=1)] + names[:100]
+    print('%d strings, %d probes, %d hits' % (n, len(probes), sum(1 for x in probes if x in blocklist)))
+
+    print('\nMemory')
+    bench_memory('unicode_set(names)', lambda: unicode_set(names))
+    for error_rate in (0.01, 0.0001):
+        bench_memory('bloom filter, error_rate=%g' % error_rate,
+            lambda: unicode_bloom_filter.from_set(blocklist, error_rate=error_rate))
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmpdir, 'names.ucol')
+        write_mmap_dict(dict((name, None) for name in names), path)
+        with mmap_unicode_dict(path) as stored:
+            for error_rate in (0.01, 0.0001):
+                bloom = unicode_bloom_filter.from_set(blocklist, error_rate=error_rate)
+                print('\nerror_rate=%g, %d bits, %d hashes, %d false positives' % (error_rate,
+                    bloom.bits, bloom.hashes, sum(1 for x in probes if x in bloom and x not in blocklist)))
+                bench('x in bloom', lambda: [x in bloom for x in probes], number=3)
+                bench('x in bloom and x in unicode_set',
+                    lambda: [x in bloom and x in blocklist for x in probes], number=3)
+                bench('x in bloom and x in mmap_unicode_dict',
+                    lambda: [x in bloom and x in stored for x in probes], number=3)
+
+            print('\nwithout the filter')
+            bench('x in unicode_set', lambda: [x in blocklist for x in probes], number=3)
+            bench('x in mmap_unicode_dict', lambda: [x in stored for x in probes], number=3)
+    finally:
+        shutil.rmtree(tmpdir)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,59 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+'''Wall time of writers updating a concurrent_unicode_dict from several
+threads, next to a unicode_dict behind a global lock. The same work is split
+between 1, 2, 4 and 8 threads.
+
+Usage: python benchmarks/bench_concurrent.py [number of operations]
+'''
+from __future__ import print_function
+import sys
+import threading
+
+from unicode_col import unicode_dict, concurrent_unicode_dict
+from bench_containers import make_names, bench
+
+class locked_dict(object):
+    '''unicode_dict with a global lock around every operation'''
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data = unicode_dict()
+
+    def __setitem__(self, key, value):
+        with self.lock:
+            self.data[key] = value
+
+    def get(self, key, default=None):
+        with self.lock:
+            return self.data.get(key, default)
+
+    def setdefault(self, key, default=None):
+        with self.lock:
+            return self.data.setdefault(key, default)
+
+def writer(d, names):
+    for i, name in enumerate(names):
+        d[name] = i
+        d.get(name)
+        d.setdefault(name, i)
+
+def run(factory, names, threads):
+    d = factory()
+    chunks = [names[i::threads] for i in range(threads)]
+    workers = [threading.Thread(target=writer, args=(d, chunk)) for chunk in chunks]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return d
+
+def main(n):
+    names = make_names(n // 4) * 4
+    print('%d operations of each kind (set, get, setdefault), %d distinct keys' % (n, n // 4))
+    for threads in (1, 2, 4, 8):
+        print('\n%d threads' % threads)
+        bench('unicode_dict with a global lock', lambda: run(locked_dict, names, threads))
+        bench('concurrent_unicode_dict, 16 shards', lambda: run(concurrent_unicode_dict, names, threads))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,103 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+'''Timings of the containers: bulk construction, equality, set predicates,
+copies and range queries, each next to the per-element path it replaces.
+
+Usage: python benchmarks/bench_containers.py [number of strings]
+'''
+from __future__ import print_function
+import random
+import sys
+import timeit
+try:
+    import tracemalloc
+except ImportError: # Python 2
+    tracemalloc = None
+
+from unicode_col import unicode_dict, unicode_set, sorted_unicode_dict
+
+def make_names(n, seed=0):
+    '''Return n random words, with accents and mixed case'''
+    rnd = random.Random(seed)
+    letters = u'abcdefghijklmnopqrstuvwxyzàéèìòùüßñ'
+    names = []
+    for _ in range(n):
+        name = u''.join(rnd.choice(letters) for _ in range(rnd.randint(4, 12)))
+        names.append(name.upper() if rnd.random() < 0.2 else name)
+    return names
+
+def bench(name, function, repeat=3, number=1):
+    '''Print the best time of a call to function, out of repeat runs of number
+    calls each
+    '''
+    best = min(timeit.repeat(function, number=number, repeat=repeat)) / number
+    if best < 0.001:
+        print('%-45s %10.2f us' % (name, best * 1e6))
+    else:
+        print('%-45s %10.2f ms' % (name, best * 1000))
+
+def bench_memory(name, function):
+    '''Print the memory held by the result of function and the peak while it
+    runs. It needs tracemalloc (Python 3).
+    '''
+    if tracemalloc is None:
+        print('%-45s %10s' % (name, 'n/a'))
+        return
+    tracemalloc.start()
+    result = function()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    print('%-45s %10.2f MB held, %.2f MB peak' % (name, held / 1e6, peak / 1e6))
+
+def add_one_by_one(names):
+    ret = unicode_set()
+    for name in names:
+        ret.add(name)
+    return ret
+
+def main(n):
+    names = make_names(n)
+    pairs = [(name, i) for i, name in enumerate(names)]
+    print('%d strings' % n)
+
+    print('\nConstruction')
+    bench('unicode_set, add one by one', lambda: add_one_by_one(names))
+    bench('unicode_set(names)', lambda: unicode_set(names))
+    bench('unicode_set.from_iterable(names)', lambda: unicode_set.from_iterable(names))
+    bench('unicode_dict(pairs)', lambda: unicode_dict(pairs))
+    bench('unicode_dict.from_items(pairs)', lambda: unicode_dict.from_items(pairs))
+    bench('sorted_unicode_dict(pairs)', lambda: sorted_unicode_dict(pairs))
+
+    d = unicode_dict.from_items(pairs)
+    other = unicode_dict(d)
+    print('\nunicode_dict equality and copies')
+    bench('d == same collation copy', lambda: d == other)
+    bench('d == plain dict', lambda: d == dict(pairs))
+    bench('unicode_dict(d), collation keys reused', lambda: unicode_dict(d))
+    bench('unicode_dict(d, comparison_level=3)', lambda: unicode_dict(d, comparison_level=3))
+    bench('d.copy() and one change', lambda: d.copy().__setitem__(u'x', 1))
+
+    a = unicode_set(names[:n // 2])
+    b = unicode_set(names)
+    plain = list(names)
+    disjoint = unicode_set(name + u'q' for name in names)
+    print('\nunicode_set predicates')
+    bench('a.issubset(b), same collation', lambda: a.issubset(b))
+    bench('a.issubset(list), keys computed once', lambda: a.issubset(plain))
+    bench('all(x in b for x in a)', lambda: all(x in b for x in a))
+    bench('b.issuperset(a), same collation', lambda: b.issuperset(a))
+    bench('b.isdisjoint(disjoint), same collation', lambda: b.isdisjoint(disjoint))
+    bench('a | b', lambda: a | b)
+    bench('unicode_set.union_all([a, b, disjoint])', lambda: unicode_set.union_all([a, b, disjoint]))
+    bench('a.copy() and one change', lambda: a.copy().add(u'x'))
+
+    s = sorted_unicode_dict(pairs)
+    low, high = sorted(names[:2], key=s.sort_key)
+    print('\nsorted_unicode_dict range queries')
+    bench('list(s.irange(low, high))', lambda: list(s.irange(low, high)))
+    bench('scan of the keys between low and high', lambda: [k for k in d
+        if d.sort_key(low) <= d.sort_key(k) <= d.sort_key(high)])
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,55 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+'''Timings of unicode_counter: increment, update, most_common and the merge
+of two counters, next to unicode_defaultdict(int) and a full sort.
+
+Usage: python benchmarks/bench_counter.py [number of tokens]
+'''
+from __future__ import print_function
+import random
+import sys
+
+from unicode_col import unicode_counter, unicode_defaultdict
+from bench_containers import make_names, bench
+
+def count_defaultdict(tokens):
+    counts = unicode_defaultdict(int)
+    for token in tokens:
+        counts[token] += 1
+    return counts
+
+def count_increment(tokens):
+    counts = unicode_counter()
+    for token in tokens:
+        counts.increment(token)
+    return counts
+
+def main(n):
+    # Few frequent words and a long tail, like the words of a text
+    words = make_names(n // 10)
+    rnd = random.Random(0)
+    tokens = [words[int(len(words) * rnd.random() ** 4)] for _ in range(n)]
+    print('%d tokens, %d distinct' % (n, len(unicode_counter(tokens))))
+
+    print('\nCount')
+    bench('unicode_defaultdict(int), d[t] += 1', lambda: count_defaultdict(tokens))
+    bench('unicode_counter, increment(t)', lambda: count_increment(tokens))
+    bench('unicode_counter(tokens)', lambda: unicode_counter(tokens))
+
+    counts = unicode_counter(tokens)
+    plain = count_defaultdict(tokens)
+    print('\nTop 10')
+    bench('most_common(10)', lambda: counts.most_common(10), number=10)
+    bench('sorted(items, by count)[:10]', lambda: sorted(plain.items(),
+        key=lambda item: item[1], reverse=True)[:10], number=10)
+
+    first = unicode_counter(tokens[:n // 2])
+    second = unicode_counter(tokens[n // 2:])
+    print('\nMerge of two halves')
+    bench('first + second', lambda: first + second)
+    bench('first.copy().update(second)', lambda: first.copy().update(second))
+    bench('first.copy().update(tokens of the second)',
+        lambda: first.copy().update(tokens[n // 2:]))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
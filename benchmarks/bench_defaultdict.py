@@ -0,0 +1,44 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+'''Timings of a hot grouping loop on unicode_defaultdict(list), next to the
+same loop on unicode_dict with setdefault and with a membership test.
+
+Usage: python benchmarks/bench_defaultdict.py [number of records]
+'''
+from __future__ import print_function
+import sys
+
+from unicode_col import unicode_dict, unicode_defaultdict
+from bench_containers import make_names, bench
+
+def group_defaultdict(records):
+    groups = unicode_defaultdict(list)
+    for key, value in records:
+        groups[key].append(value)
+    return groups
+
+def group_setdefault(records):
+    groups = unicode_dict()
+    for key, value in records:
+        groups.setdefault(key, []).append(value)
+    return groups
+
+def group_contains(records):
+    groups = unicode_dict()
+    for key, value in records:
+        if key not in groups:
+            groups[key] = []
+        groups[key].append(value)
+    return groups
+
+def main(n):
+    for distinct in (n // 100, n // 2):
+        names = make_names(distinct)
+        records = [(names[i % distinct], i) for i in range(n)]
+        print('\n%d records, %d groups' % (n, distinct))
+        bench('unicode_defaultdict(list), d[k].append', lambda: group_defaultdict(records))
+        bench('unicode_dict, setdefault(k, []).append', lambda: group_setdefault(records))
+        bench('unicode_dict, k in d then d[k].append', lambda: group_contains(records))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,48 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+'''Lookup latency and memory of unicode_frozenset and unicode_frozendict,
+next to the mutable unicode_set and unicode_dict.
+
+Usage: python benchmarks/bench_frozen.py [number of strings]
+'''
+from __future__ import print_function
+import sys
+
+from unicode_col import unicode_dict, unicode_set, unicode_frozendict, unicode_frozenset
+from bench_containers import make_names, bench, bench_memory
+
+def main(n):
+    names = make_names(n)
+    pairs = [(name, i) for i, name in enumerate(names)]
+    hits = names[:1000]
+    misses = [name + u'q' for name in hits]
+    print('%d strings, lookups of %d strings' % (n, len(hits)))
+    # Warm up the collator, or the first class timed pays for it
+    unicode_set(names)
+
+    print('\nMemory')
+    bench_memory('unicode_set(names)', lambda: unicode_set(names))
+    bench_memory('unicode_frozenset(names)', lambda: unicode_frozenset(names))
+    bench_memory('unicode_dict(pairs)', lambda: unicode_dict(pairs))
+    bench_memory('unicode_frozendict(pairs)', lambda: unicode_frozendict(pairs))
+
+    for cls in (unicode_set, unicode_frozenset):
+        s = cls(names)
+        print('\n%s' % cls.__name__)
+        bench('x in s, hits', lambda: [x in s for x in hits], repeat=7, number=20)
+        bench('x in s, misses', lambda: [x in s for x in misses], repeat=7, number=20)
+
+    for cls in (unicode_dict, unicode_frozendict):
+        d = cls(pairs)
+        print('\n%s' % cls.__name__)
+        bench('d.get(x), hits', lambda: [d.get(x) for x in hits], repeat=7, number=20)
+        bench('d.get(x), misses', lambda: [d.get(x) for x in misses], repeat=7, number=20)
+
+    print('\nhash')
+    bench('hash(unicode_frozenset(names)), first', lambda: hash(unicode_frozenset(names)))
+    frozen = unicode_frozenset(names)
+    hash(frozen)
+    bench('hash(unicode_frozenset), cached', lambda: hash(frozen), number=1000)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,31 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+'''Timings and sizes of the binary format of unicode_set and unicode_dict
+(dumps_unicode_data and loads_unicode_data), next to pickle.
+
+Usage: python benchmarks/bench_io.py [number of strings]
+'''
+from __future__ import print_function
+import pickle
+import sys
+
+from unicode_col import unicode_set, unicode_dict, dumps_unicode_data, loads_unicode_data
+from bench_containers import make_names, bench
+
+def main(n):
+    names = make_names(n)
+    print('%d strings' % n)
+    for name, data in (('unicode_set', unicode_set(names)),
+            ('unicode_dict', unicode_dict.from_items((name, i) for i, name in enumerate(names)))):
+        dumped = dumps_unicode_data(data)
+        pickled = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+        print('\n%s: binary format %.2f MB, pickle %.2f MB' % (name,
+            len(dumped) / 1e6, len(pickled) / 1e6))
+        bench('dumps_unicode_data', lambda: dumps_unicode_data(data))
+        bench('pickle.dumps', lambda: pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+        bench('loads_unicode_data', lambda: loads_unicode_data(dumped))
+        bench('loads_unicode_data(memoryview)', lambda: loads_unicode_data(memoryview(dumped)))
+        bench('pickle.loads', lambda: pickle.loads(pickled))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
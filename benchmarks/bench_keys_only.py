@@ -0,0 +1,32 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+'''Memory and membership of a keys_only unicode_set, next to a unicode_set
+that keeps the strings.
+
+Usage: python benchmarks/bench_keys_only.py [number of strings]
+'''
+from __future__ import print_function
+import sys
+
+from unicode_col import unicode_set
+from bench_containers import make_names, bench, bench_memory
+
+def main(n):
+    names = make_names(n)
+    print('%d strings' % n)
+
+    print('\nMemory')
+    # The strings are made while the memory is traced, as if they were read from
+    # a file: the set that keeps them holds their memory
+    bench_memory('unicode_set(names)', lambda: unicode_set(make_names(n)))
+    bench_memory('unicode_set(names, keys_only=True)', lambda: unicode_set(make_names(n), keys_only=True))
+
+    full = unicode_set(names)
+    keys = unicode_set(names, keys_only=True)
+    probes = names[:500] + [name + u'q' for name in names[:500]]
+    print('\n%d lookups' % len(probes))
+    bench('x in unicode_set', lambda: [x in full for x in probes], number=10)
+    bench('x in keys_only unicode_set', lambda: [x in keys for x in probes], number=10)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
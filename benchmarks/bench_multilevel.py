@@ -0,0 +1,56 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+'''Memory, insert throughput and lookups of unicode_multilevel_index, next to
+one unicode_dict for each comparison level.
+
+Usage: python benchmarks/bench_multilevel.py [number of strings]
+'''
+from __future__ import print_function
+import sys
+
+from unicode_col import unicode_dict, unicode_defaultdict, unicode_multilevel_index
+from bench_containers import make_names, bench, bench_memory
+
+def build_index(names):
+    index = unicode_multilevel_index()
+    for name in names:
+        index.add(name)
+    return index
+
+def build_dicts(names, levels):
+    '''One dict for each level: the lower levels map to the list of the equal
+    strings, the strictest one (like the index) keeps a single string
+    '''
+    lists = [unicode_defaultdict(list, comparison_level=level) for level in levels[:-1]]
+    strictest = unicode_dict(comparison_level=levels[-1])
+    for name in names:
+        for d in lists:
+            d[name].append(name)
+        strictest[name] = name
+    return lists + [strictest]
+
+def main(n):
+    names = make_names(n)
+    print('%d strings' % n)
+
+    print('\nMemory')
+    bench_memory('unicode_multilevel_index', lambda: build_index(names))
+    bench_memory('dicts at levels 0 and 2', lambda: build_dicts(names, (0, 2)))
+    bench_memory('dicts at levels 0, 1 and 2', lambda: build_dicts(names, (0, 1, 2)))
+
+    print('\nInsert one by one')
+    bench('unicode_multilevel_index.add', lambda: build_index(names))
+    bench('dicts at levels 0 and 2', lambda: build_dicts(names, (0, 2)))
+    bench('dicts at levels 0, 1 and 2', lambda: build_dicts(names, (0, 1, 2)))
+
+    index = build_index(names)
+    level0, level2 = build_dicts(names, (0, 2))
+    probes = [name.upper() for name in names[:1000]]
+    print('\n%d lookups' % len(probes))
+    bench('index.lookup(x, 0)', lambda: [index.lookup(x, 0) for x in probes], number=10)
+    bench('index.lookup(x, 2)', lambda: [index.lookup(x, 2) for x in probes], number=10)
+    bench('level 0 dict.get(x)', lambda: [level0.get(x) for x in probes], number=10)
+    bench('level 2 dict.get(x)', lambda: [level2.get(x) for x in probes], number=10)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,44 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+'''Timings of a pipeline that wraps strings with a UnicodeStrFactory, dedupes
+them in a unicode_set and groups them in a unicode_dict: with the factory of
+the containers the collation keys are computed once, with plain strings or
+another factory they are computed at each step.
+
+Usage: python benchmarks/bench_pipeline.py [number of strings]
+'''
+from __future__ import print_function
+import sys
+
+from unicode_col import unicode_dict, unicode_set, UnicodeStrFactory
+from bench_containers import make_names, bench
+
+def pipeline(words):
+    unique = unicode_set(words)
+    groups = unicode_dict()
+    for i, word in enumerate(words):
+        groups.setdefault(word, []).append(i)
+    return list(unique.iter_unicode_str()), groups
+
+def main(n):
+    names = make_names(n // 4) * 4
+    print('%d strings, %d distinct' % (n, n // 4))
+    same = UnicodeStrFactory(locale='en_US')
+    other = UnicodeStrFactory(locale='en_US', comparison_level=1)
+
+    print('\nwrap')
+    bench('factory(name) for each string', lambda: [same(name) for name in names])
+
+    print('\ndedupe and group')
+    wrapped = [same(name) for name in names]
+    wrapped_other = [other(name) for name in names]
+    bench('plain strings', lambda: pipeline(names))
+    bench('unicode_str, same collation (keys reused)', lambda: pipeline(wrapped))
+    bench('unicode_str, another collation', lambda: pipeline(wrapped_other))
+
+    print('\nwrap, dedupe and group')
+    bench('plain strings, no wrap', lambda: pipeline(names))
+    bench('unicode_str, same collation', lambda: pipeline([same(name) for name in names]))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
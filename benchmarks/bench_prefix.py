@@ -0,0 +1,33 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+'''Latency of the prefix queries of unicode_prefix_index, next to a scan of
+all the strings with startswith.
+
+Usage: python benchmarks/bench_prefix.py [number of strings]
+'''
+from __future__ import print_function
+import sys
+import timeit
+
+from unicode_col import unicode_prefix_index
+from bench_containers import make_names, bench
+
+def main(n):
+    names = make_names(n)
+    print('%d strings' % n)
+
+    start = timeit.default_timer()
+    index = unicode_prefix_index(names)
+    print('%-45s %10.2f s' % ('unicode_prefix_index(names)', timeit.default_timer() - start))
+
+    lowered = [name.lower() for name in names]
+    for prefix in (u'mu', u'mül', u'abcd'):
+        print('\nprefix %r, %d matches' % (prefix, len(list(index.iprefix(prefix)))))
+        bench('iprefix, limit=10', lambda: list(index.iprefix(prefix, limit=10)), number=100)
+        bench('iprefix, all the matches', lambda: list(index.iprefix(prefix)), number=10)
+        # The scan doesn't even match the accents: it is a lower bound
+        bench('scan with lower().startswith, limit=10', lambda: [name for name in lowered
+            if name.startswith(prefix)][:10])
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
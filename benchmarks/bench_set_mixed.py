@@ -0,0 +1,46 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+'''Timings of the unicode_set operations and in-place updates with mixed
+inputs: a unicode_set of the same collation, a unicode_set of another
+collation, a plain set and a list. The methods are timed, since the operators
+reject a unicode_set of another collation.
+
+Usage: python benchmarks/bench_set_mixed.py [number of strings]
+'''
+from __future__ import print_function
+import sys
+
+from unicode_col import unicode_set
+from bench_containers import make_names, bench
+
+def main(n):
+    names = make_names(n)
+    a = unicode_set(names[:n // 2])
+    half = names[n // 4:n // 4 + n // 2]
+    others = [
+        ('unicode_set, same collation', unicode_set(half)),
+        ('unicode_set, comparison_level=1', unicode_set(half, comparison_level=1)),
+        ('set', set(half)),
+        ('list', list(half)),
+        ]
+    small = names[:100]
+    print('%d strings in each operand' % len(a))
+
+    for name, other in others:
+        print('\n%s' % name)
+        bench('a.intersection(other)', lambda: a.intersection(other))
+        bench('a.union(other)', lambda: a.union(other))
+        bench('a.difference(other)', lambda: a.difference(other))
+        bench('a.symmetric_difference(other)', lambda: a.symmetric_difference(other))
+        bench('a.copy().intersection_update(other)', lambda: a.copy().intersection_update(other))
+        bench('a.issubset(other)', lambda: a.issubset(other))
+    bench('per element, x in a for x in list', lambda: unicode_set(x for x in half if x in a))
+
+    print('\n%d strings against the whole set' % len(small))
+    bench('a & list of 100, smaller side iterated', lambda: a & small, number=100)
+    bench('a & unicode_set(list of 100)', lambda: a & unicode_set(small), number=100)
+    bench('unicode_set(list of 100) & list of the set',
+        lambda: unicode_set(small) & names[:n // 2], number=10)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
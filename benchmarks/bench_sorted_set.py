@@ -0,0 +1,60 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+'''Timings of sorted_unicode_set on a large set: construction, updates and
+the positional, neighbor and range queries of a paginated listing, next to
+sorting a unicode_set for each query.
+
+Usage: python benchmarks/bench_sorted_set.py [number of strings]
+'''
+from __future__ import print_function
+import sys
+import timeit
+
+from unicode_col import unicode_set, sorted_unicode_set
+from bench_containers import make_names, bench, bench_memory
+
+def timed(name, function):
+    '''Print the time of a single call of a function too slow to repeat'''
+    start = timeit.default_timer()
+    result = function()
+    print('%-45s %10.2f s' % (name, timeit.default_timer() - start))
+    return result
+
+def page_after(s, val, size):
+    '''The size strings after val, from the neighbor queries'''
+    start = s.bisect_right(val)
+    return list(s.islice(start, start + size))
+
+def build(names):
+    '''The order is built at the first query'''
+    s = sorted_unicode_set(names)
+    s.first()
+    return s
+
+def main(n):
+    names = make_names(n)
+    print('%d strings' % n)
+
+    print('\nConstruction')
+    plain = timed('unicode_set(names)', lambda: unicode_set(names))
+    s = timed('sorted_unicode_set(names) and a query', lambda: build(names))
+    bench_memory('memory of sorted_unicode_set(names[:n/10])', lambda: build(names[:n // 10]))
+    bench_memory('memory of unicode_set(names[:n/10])', lambda: unicode_set(names[:n // 10]))
+
+    probe = names[n // 3]
+    print('\nQueries')
+    bench('s.index(x)', lambda: s.index(probe), number=1000)
+    bench('s[i]', lambda: s[n // 2], number=1000)
+    bench('s.successor(x)', lambda: s.successor(probe), number=1000)
+    bench('s.predecessor(x)', lambda: s.predecessor(probe), number=1000)
+    bench('50 strings after x', lambda: page_after(s, probe, 50), number=1000)
+    bench('list(s.irange(x, y)), 50 strings', lambda: list(s.irange(s[n // 3], s[n // 3 + 49])), number=1000)
+    bench('sorted(unicode_set, key=sort_key)', lambda: sorted(plain, key=plain.sort_key), repeat=1)
+
+    print('\nUpdates')
+    extra = [name + u'q' for name in names[:1000]]
+    bench('1000 add, then 1000 remove', lambda: ([s.add(x) for x in extra],
+        [s.remove(x) for x in extra]))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
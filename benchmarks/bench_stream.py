@@ -0,0 +1,39 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+'''Timings of the stream functions: external_sort, dedupe and group_by, in
+memory and with the limits that make them spill to temporary files.
+
+Usage: python benchmarks/bench_stream.py [number of records]
+'''
+from __future__ import print_function
+import sys
+
+from unicode_col import unicode_set, external_sort, dedupe, group_by, count_reducer
+from bench_containers import make_names, bench
+
+def main(n):
+    names = make_names(n // 4) * 4
+    sort_key = unicode_set().sort_key
+    print('%d records, %d distinct' % (n, n // 4))
+
+    print('\nexternal_sort')
+    bench('sorted(key=sort_key), in memory', lambda: sorted(names, key=sort_key))
+    bench('external_sort, a single run', lambda: list(external_sort(names, max_records=n)))
+    bench('external_sort, runs of n/10', lambda: list(external_sort(names, max_records=n // 10)))
+    bench('external_sort, runs of n/10, 4 processes',
+        lambda: list(external_sort(names, max_records=n // 10, processes=4)))
+
+    print('\ndedupe')
+    bench('unicode_set, in memory', lambda: unicode_set(names))
+    bench('dedupe, no limit', lambda: list(dedupe(names)))
+    bench('dedupe, max_keys=n/40', lambda: list(dedupe(names, max_keys=n // 40)))
+    bench("dedupe keep='last', max_keys=n/40", lambda: list(dedupe(names, keep='last', max_keys=n // 40)))
+
+    records = [(name, i) for i, name in enumerate(names)]
+    print('\ngroup_by')
+    bench('group_by count, no limit', lambda: list(group_by(records, 0, count_reducer())))
+    bench('group_by count, max_groups=n/40',
+        lambda: list(group_by(records, 0, count_reducer(), max_groups=n // 40)))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,39 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+'''Memory and time of the iteration over the keys, values and items views
+of a unicode_dict, next to the lists they replace.
+
+Usage: python benchmarks/bench_views.py [number of entries]
+'''
+from __future__ import print_function
+import sys
+
+from unicode_col import unicode_dict
+from bench_containers import make_names, bench, bench_memory
+
+def consume(iterable):
+    count = 0
+    for _ in iterable:
+        count += 1
+    return count
+
+def main(n):
+    d = unicode_dict.from_items((name, i) for i, name in enumerate(make_names(n)))
+    print('%d entries' % len(d))
+
+    print('\nMemory of the iteration')
+    bench_memory('for item in d.items()', lambda: consume(d.items()))
+    bench_memory('for item in list(d.items())', lambda: consume(list(d.items())))
+    bench_memory('for key in d.keys()', lambda: consume(d.keys()))
+    bench_memory('for key in list(d.keys())', lambda: consume(list(d.keys())))
+    bench_memory('for value in d.values()', lambda: consume(d.values()))
+    bench_memory('for value in list(d.values())', lambda: consume(list(d.values())))
+
+    print('\nTime of the iteration')
+    bench('for item in d.items()', lambda: consume(d.items()))
+    bench('for item in list(d.items())', lambda: consume(list(d.items())))
+    bench('for key in d.keys()', lambda: consume(d.keys()))
+    bench('for key in list(d.keys())', lambda: consume(list(d.keys())))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,105 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import mmap
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from unicode_col import unicode_bloom_filter, unicode_set
+
+class TestUnicodeBloomFilter(unittest.TestCase):
+    def setUp(self):
+        self.names = [u'Zürich', u'Müller', u'Neumann', u'Abel', u'peña']
+        self.bloom = unicode_bloom_filter(100, 0.01)
+        self.bloom.update(self.names)
+
+    def test_positions(self):
+        for capacity in [1, 100, 479, 1000]:
+            bloom = unicode_bloom_filter(capacity, 0.01)
+            self.assertEqual(bloom.bits & (bloom.bits - 1), 0)
+            self.assertGreaterEqual(bloom.bits, capacity * 9)
+        # Every string sets as many bits as the hashes
+        for name in self.names + [u'name%d' % i for i in range(50)]:
+            single = unicode_bloom_filter(100, 0.01)
+            single.add(name)
+            data = single.to_bytes()[-single.bits // 8:]
+            self.assertEqual(sum(bin(ord(data[i:i + 1])).count('1') for i in range(len(data))), single.hashes)
+
+    def test_contains(self):
+        for name in self.names:
+            self.assertIn(name, self.bloom)
+        self.assertIn(u'ZURICH', self.bloom)
+        self.assertIn(u'muller', self.bloom)
+        self.assertIn(u'pena', self.bloom)
+        self.assertNotIn(1, self.bloom)
+        self.assertEqual(self.bloom.count, 5)
+        with self.assertRaises(TypeError):
+            self.bloom.add(1)
+
+        level3 = unicode_bloom_filter(100, 0.01, comparison_level=3)
+        level3.add(u'Zürich')
+        self.assertIn(u'Zürich', level3)
+        self.assertEqual(level3.comparison_level, 3)
+
+    def test_error_rate(self):
+        bloom = unicode_bloom_filter(1000, 0.01)
+        words = [u'word%d' % i for i in range(1000)]
+        bloom.update(words)
+        for word in words:
+            self.assertIn(word, bloom)
+        misses = sum(1 for i in range(10000) if u'other%d' % i in bloom)
+        self.assertLess(misses, 300)
+        self.assertLess(bloom.error_rate, 0.02)
+        with self.assertRaises(ValueError):
+            unicode_bloom_filter(0)
+        with self.assertRaises(ValueError):
+            unicode_bloom_filter(10, 1.5)
+
+    def test_from_set(self):
+        data = unicode_set(self.names, comparison_level=1)
+        bloom = unicode_bloom_filter.from_set(data)
+        self.assertEqual(bloom.comparison_level, 1)
+        for name in self.names:
+            self.assertIn(name.upper(), bloom)
+
+    def test_serialization(self):
+        data = self.bloom.to_bytes()
+        bloom = unicode_bloom_filter.from_bytes(data)
+        self.assertEqual(bloom.to_bytes(), data)
+        self.assertIn(u'ZURICH', bloom)
+        self.assertEqual(bloom.count, 5)
+
+        bloom = pickle.loads(pickle.dumps(self.bloom))
+        self.assertEqual(bloom.to_bytes(), data)
+
+        buf = bytearray(data)
+        bloom = unicode_bloom_filter.from_bytes(buf)
+        bloom.add(u'Aarau')
+        self.assertIn(u'aarau', bloom)
+        self.assertIn(u'ZURICH', bloom)
+        self.assertEqual(buf, bytearray(data))
+
+        with self.assertRaises(ValueError):
+            unicode_bloom_filter.from_bytes(b'X' + data[1:])
+        with self.assertRaises(ValueError):
+            unicode_bloom_filter.from_bytes(data[:-1])
+
+    def test_mmap(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'names.bloom')
+            with open(path, 'wb') as fp:
+                fp.write(self.bloom.to_bytes())
+            with open(path, 'rb') as fp:
+                mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+                bloom = unicode_bloom_filter.from_bytes(mapped)
+                self.assertIn(u'muller', bloom)
+                del bloom
+                mapped.close()
+        finally:
+            shutil.rmtree(tmpdir)
+
+### MAIN ###
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import unittest
+from unicode_col import unicode_lru_cache, unicode_lru_cached
+
+class fake_timer(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+class TestUnicodeLruCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = unicode_lru_cache(3)
+
+    def test_collation(self):
+        self.cache[u'Zürich'] = 1
+        self.assertEqual(self.cache[u'zurich'], 1)
+        self.assertEqual(self.cache[u'ZURICH'], 1)
+        self.cache[u'zurich'] = 2
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(list(self.cache), [u'zurich'])
+        cache = unicode_lru_cache(comparison_level=3)
+        cache[u'Zürich'] = 1
+        self.assertNotIn(u'Zurich', cache)
+
+    def test_eviction(self):
+        for i, key in enumerate([u'a', u'b', u'c']):
+            self.cache[key] = i
+        self.assertEqual(self.cache[u'A'], 0)
+        self.cache[u'd'] = 3
+        self.assertEqual(list(self.cache), [u'c', u'a', u'd'])
+        self.assertNotIn(u'b', self.cache)
+        self.assertEqual(self.cache.get(u'b'), None)
+        info = self.cache.cache_info()
+        self.assertEqual((info.hits, info.misses, info.evictions, info.currsize), (1, 1, 1, 3))
+        self.assertEqual(self.cache.hit_rate, 0.5)
+        del self.cache[u'C']
+        self.assertEqual(len(self.cache), 2)
+        with self.assertRaises(KeyError):
+            del self.cache[u'c']
+
+    def test_ttl(self):
+        timer = fake_timer()
+        cache = unicode_lru_cache(None, ttl=10, timer=timer)
+        cache[u'a'] = 1
+        timer.now = 5
+        cache[u'b'] = 2
+        self.assertEqual(cache[u'a'], 1)
+        timer.now = 10
+        self.assertNotIn(u'a', cache)
+        with self.assertRaises(KeyError):
+            cache[u'a']
+        self.assertEqual(cache[u'b'], 2)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(list(cache), [u'b'])
+        info = cache.cache_info()
+        self.assertEqual(cache.items(), [(u'b', 2)])
+        self.assertEqual(cache.values(), [2])
+        self.assertEqual(cache.cache_info()[:3], info[:3])
+        timer.now = 20
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.items(), [])
+        cache.expire()
+        self.assertEqual(len(cache), 0)
+
+    def test_items(self):
+        self.cache[u'a'] = 1
+        self.cache[u'b'] = 2
+        self.assertEqual(self.cache.items(), [(u'a', 1), (u'b', 2)])
+        self.assertEqual(self.cache.keys(), [u'a', u'b'])
+        self.assertEqual(self.cache.cache_info().hits, 0)
+        # Reading the items doesn't change the order of eviction
+        self.cache[u'A']
+        self.assertEqual(self.cache.keys(), [u'b', u'a'])
+
+    def test_expire_order(self):
+        timer = fake_timer()
+        cache = unicode_lru_cache(2, ttl=10, timer=timer)
+        cache[u'a'] = 1
+        timer.now = 5
+        cache[u'b'] = 2
+        timer.now = 8
+        cache[u'A'] = 3
+        cache[u'c'] = 4
+        self.assertEqual(cache.keys(), [u'A', u'c'])
+        timer.now = 17
+        self.assertEqual(len(cache), 2)
+        timer.now = 18
+        self.assertEqual(len(cache), 0)
+        cache[u'd'] = 5
+        del cache[u'd']
+        timer.now = 30
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.currbytes, 0)
+
+    def test_maxbytes(self):
+        cache = unicode_lru_cache(None, maxbytes=10, sizeof=len)
+        cache[u'a'] = u'xxxx'
+        cache[u'b'] = u'yyyy'
+        self.assertEqual(cache.currbytes, 8)
+        cache[u'c'] = u'zzzz'
+        self.assertEqual(list(cache), [u'b', u'c'])
+        cache[u'b'] = u'y'
+        self.assertEqual(cache.currbytes, 5)
+        cache[u'd'] = u'w' * 20
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.currbytes, 0)
+
+    def test_decorator(self):
+        calls = []
+        @unicode_lru_cached(maxsize=2)
+        def lookup(name, suffix=u''):
+            calls.append(name)
+            return name.upper() + suffix
+        self.assertEqual(lookup(u'Zürich'), u'ZÜRICH')
+        self.assertEqual(lookup(u'zurich'), u'ZÜRICH')
+        self.assertEqual(lookup(u'zurich', suffix=u'!'), u'ZURICH!')
+        self.assertEqual(lookup(u'ZURICH', suffix=u'!'), u'ZURICH!')
+        self.assertEqual(calls, [u'Zürich', u'zurich'])
+        self.assertEqual(lookup.cache.cache_info().hits, 2)
+        self.assertEqual(lookup.__name__, 'lookup')
+
+### MAIN ###
+if __name__ == '__main__':
+    unittest.main()
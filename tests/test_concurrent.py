@@ -0,0 +1,101 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import threading
+import unittest
+from unicode_col import concurrent_unicode_dict, unicode_dict
+
+class TestConcurrentUnicodeDict(unittest.TestCase):
+    def setUp(self):
+        self.data = concurrent_unicode_dict({u'ábc':1, u'd':2}, shards=4)
+
+    def test_dict(self):
+        self.assertEqual(self.data.shards, 4)
+        self.assertEqual(len(self.data), 2)
+        self.assertEqual(self.data[u'ABC'], 1)
+        self.assertIn(u'D', self.data)
+        self.assertEqual(self.data.get(u'e'), None)
+        self.data[u'abc'] = 3
+        self.assertEqual(len(self.data), 2)
+        self.assertEqual(set(self.data), set([u'abc', u'd']))
+        del self.data[u'D']
+        self.assertNotIn(u'd', self.data)
+        with self.assertRaises(KeyError):
+            self.data[u'd']
+        with self.assertRaises(KeyError):
+            del self.data[u'd']
+
+    def test_collations(self):
+        data = concurrent_unicode_dict({u'ábc':1, u'abc':2}, comparison_level=3)
+        self.assertEqual(len(data), 2)
+        self.assertEqual(data.comparison_level, 3)
+        data = concurrent_unicode_dict(unicode_dict({u'ábc':1}, case_sensitive=True))
+        self.assertTrue(data.case_sensitive)
+        self.assertNotIn(u'ÁBC', data)
+
+    def test_atomic_operations(self):
+        self.assertEqual(self.data.setdefault(u'ABC', 5), 1)
+        self.assertEqual(self.data.setdefault(u'e', 5), 5)
+        self.assertEqual(self.data.compute_if_absent(u'E', lambda k: 6), 5)
+        self.assertEqual(self.data.compute_if_absent(u'f', len), 1)
+        self.assertEqual(self.data.pop(u'F'), 1)
+        self.assertEqual(self.data.pop(u'f', 7), 7)
+        with self.assertRaises(KeyError):
+            self.data.pop(u'f')
+        self.data.update([(u'g', 1), (u'ABC', 2)], h=3)
+        self.assertEqual(self.data[u'abc'], 2)
+        self.assertEqual(self.data[u'H'], 3)
+        self.assertEqual(len(self.data), 5)
+
+    def test_snapshot(self):
+        test = self.data.to_unicode_dict()
+        self.assertEqual(test, unicode_dict({u'ábc':1, u'd':2}))
+        test = self.data.copy()
+        test[u'e'] = 3
+        self.assertNotIn(u'e', self.data)
+        self.assertEqual(dict(self.data.iteritems()), {u'ábc':1, u'd':2})
+        self.assertEqual(sorted(self.data.values()), [1, 2])
+        items = []
+        for item in self.data.items():
+            self.data.clear()
+            items.append(item)
+        self.assertEqual(dict(items), {u'ábc':1, u'd':2})
+        self.assertEqual(len(self.data), 0)
+        with self.assertRaises(KeyError):
+            self.data.popitem()
+
+    def test_update_stored(self):
+        self.data.update(unicode_dict({u'ABC':3, u'e':4}))
+        self.assertEqual(self.data.to_unicode_dict(), unicode_dict({u'ABC':3, u'd':2, u'e':4}))
+        test = concurrent_unicode_dict(shards=2)
+        test.update(self.data)
+        self.assertEqual(test.to_unicode_dict(), self.data.to_unicode_dict())
+        self.assertEqual(test[u'abc'], 3)
+        test = concurrent_unicode_dict(comparison_level=3)
+        test.update(self.data)
+        self.assertNotIn(u'abc', test)
+        self.assertEqual(test[u'ABC'], 3)
+
+    def test_threads(self):
+        data = concurrent_unicode_dict(shards=4)
+        def worker(n):
+            for i in range(200):
+                key = u'key%d' % (i % 50)
+                data.compute_if_absent(key, lambda k: [])
+                data[key].append(n)
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(data), 50)
+        self.assertEqual(sum(len(v) for _,v in data.iteritems()), 800)
+
+    def test_pickling(self):
+        import pickle
+        test = pickle.loads(pickle.dumps(self.data))
+        self.assertEqual(test.shards, 4)
+        self.assertEqual(test.to_unicode_dict(), self.data.to_unicode_dict())
+
+### MAIN ###
+if __name__ == '__main__':
+    unittest.main()
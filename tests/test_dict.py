@@ -1,7 +1,7 @@
 #!/usr/bin/python
 # -*- coding: utf8 -*-
 import unittest
-from unicode_col import unicode_dict, unicode_defaultdict
+from unicode_col import unicode_dict, unicode_defaultdict, unicode_frozendict, unicode_counter, unicode_set, UnicodeStrFactory
 
 class TestUnicodeDict(unittest.TestCase):
     def setUp(self):
@@ -52,12 +52,52 @@ class TestUnicodeDict(unittest.TestCase):
         test = unicode_dict({'abc':1, 'd':2})
         self.assertEqual(test, self.withdata)
 
+    def test_equality_values(self):
+        test = unicode_dict({'abc':1, 'd':3})
+        self.assertNotEqual(test, self.withdata)
+        test = unicode_dict({'abc':1, 'e':2})
+        self.assertNotEqual(test, self.withdata)
+        test = unicode_dict({'abc':1, 'd':2, 'e':3})
+        self.assertNotEqual(test, self.withdata)
+        self.assertNotEqual(self.withdata, test)
+        del test['e']
+        self.assertEqual(test, self.withdata)
+        self.assertNotEqual(self.withdata, {'ábc':1, 'd':2})
+
     def test_copy_constructor(self):
         test = unicode_dict(self.compdata,comparison_level=self.withdata.comparison_level)
         self.assertNotEqual(self.compdata, test)
         self.assertEqual(self.withdata, test)
         self.assertIn('abc', test)
-        
+
+    def test_merge(self):
+        # same collation: the collation keys are reused
+        test = unicode_dict(self.withdata)
+        self.assertEqual(set(id(i) for i in test.iter_sort_keys()),
+            set(id(i) for i in self.withdata.iter_sort_keys()))
+        test = unicode_dict({u'e':3})
+        test.update(self.withdata)
+        self.assertEqual(len(test), 3)
+        self.assertEqual(test['abc'], 1)
+
+        test = self.withdata | unicode_dict({'ABC':3, 'e':4})
+        self.assertEqual(len(test), 3)
+        self.assertEqual(test['abc'], 3)
+        self.assertEqual(len(self.withdata), 2)
+        test = self.withdata | {'e':4}
+        self.assertEqual(test['e'], 4)
+        test = self.withdata | self.compdata
+        self.assertEqual(len(test), 2)
+
+        test = unicode_dict()
+        test |= self.compdata
+        self.assertEqual(test, self.withdata)
+        test.update(e=5, d=6)
+        self.assertEqual(test['E'], 5)
+        self.assertEqual(test['d'], 6)
+        test.update()
+        self.assertEqual(len(test), 3)
+
 
     def test_iterators(self):
         tupl = [('ábc',1), ('d',2)]
@@ -69,6 +109,65 @@ class TestUnicodeDict(unittest.TestCase):
         self.assertEqual(set(self.withdata.items()), set(i for i in tupl))
         self.assertEqual(set(self.withdata.iteritems()), set(i for i in tupl))
 
+    def test_views(self):
+        keys = self.withdata.viewkeys()
+        values = self.withdata.viewvalues()
+        items = self.withdata.viewitems()
+        self.assertIn('abc', keys)
+        self.assertNotIn('e', keys)
+        self.assertIn(2, values)
+        self.assertIn(('abc', 1), items)
+        self.assertNotIn(('abc', 2), items)
+        self.assertNotIn(('e', 2), items)
+
+        # the views are live
+        self.withdata['e'] = 3
+        self.assertEqual(len(keys), 3)
+        self.assertIn('e', keys)
+        self.assertIn(3, values)
+        self.assertIn(('e', 3), items)
+        self.assertEqual(set(values), set([1, 2, 3]))
+
+    def test_keys_set_operations(self):
+        keys = self.withdata.viewkeys()
+        other = unicode_dict({'abc':5, 'e':6}).viewkeys()
+
+        test = keys & other
+        self.assertEqual(len(test), 1)
+        self.assertIn('ábc', test)
+        self.assertEqual(test.comparison_level, self.withdata.comparison_level)
+        self.assertEqual(len(keys | other), 3)
+        self.assertEqual(len(keys - other), 1)
+        self.assertIn('d', keys - other)
+        self.assertEqual(len(keys ^ other), 2)
+        self.assertEqual(len(keys & ['abc', 'x']), 1)
+        self.assertEqual(len(['ABC', 'x'] - keys), 1)
+        self.assertFalse(keys.isdisjoint(['ABC']))
+        self.assertTrue(keys.isdisjoint(other - keys))
+
+        self.assertEqual(len(self.compdata.viewkeys() & ['abc', 'd']), 1)
+
+        # The smaller operand is probed, the elements are the keys of the view
+        self.assertEqual(list(keys & ['ABC']), ['ábc'])
+        self.assertEqual(list(keys & ['ABC', 'x', 'y', 'z']), ['ábc'])
+        self.assertEqual(sorted(keys | ['ABC', 'x']), sorted(['ábc', 'd', 'x']))
+        self.assertEqual(sorted(keys ^ ['ABC', 'x']), ['d', 'x'])
+        self.assertTrue(keys.isdisjoint(['x', 'y', 'z', 'w', 'v']))
+
+        # The stored collation keys are reused
+        stored = set(id(i) for i in self.withdata.iter_sort_keys())
+        self.assertTrue(set(id(i) for i in (keys & other).iter_sort_keys()) <= stored)
+        self.assertTrue(set(id(i) for i in (keys - other).iter_sort_keys()) <= stored)
+
+        # With another collation the keys of the other view are compared again
+        comp = self.compdata.viewkeys()
+        self.assertEqual(len(other & comp), 1)
+        self.assertEqual(len(comp - other), 2)
+        self.assertFalse(other.isdisjoint(comp))
+        with self.assertRaises(TypeError):
+            keys | unicode_set(['x'], keys_only=True)
+        self.assertEqual(len(keys & unicode_set(['ABC'], keys_only=True)), 1)
+
     def test_pickling(self) :
         import pickle
 
@@ -156,6 +255,167 @@ class TestUnicodeDict(unittest.TestCase):
 
         self.assertTrue(cidata['abc'] == 1 or cidata['abc'] == 4) # casting down doesn't guarantee the result
 
+    def test_from_items(self):
+        test = unicode_dict.from_items([('ábc',1), ('d',2)])
+        self.assertEqual(test, self.withdata)
+        test = unicode_dict.from_items([('ábc',1), ('abc',3), ('d',2)], comparison_level=3)
+        self.assertEqual(len(test), 3)
+        self.assertEqual(test.comparison_level, 3)
+
+        keys = [self.compdata.sort_key(k) for k in ('ábc', 'd')]
+        test = unicode_dict.from_items([('ábc',1), ('d',2)], keys, comparison_level=3)
+        self.assertEqual(test, self.compdata)
+        self.assertNotIn('abc', test)
+        with self.assertRaises(ValueError):
+            unicode_dict.from_items([('ábc',1), ('d',2)], keys[:1], comparison_level=3)
+        with self.assertRaises(ValueError):
+            unicode_dict.from_items([('ábc',1)], keys, comparison_level=3)
+
+    def test_fromkeys(self):
+        test = unicode_dict.fromkeys(['ábc', 'abc', 'd'], 0)
+        self.assertEqual(len(test), 2)
+        self.assertEqual(test['abc'], 0)
+        test = unicode_dict.fromkeys(['ábc', 'abc', 'd'], comparison_level=3)
+        self.assertEqual(len(test), 3)
+        self.assertEqual(test['abc'], None)
+
+    def test_unicode_str_keys(self):
+        key = UnicodeStrFactory(locale='en_US')(u'ABC')
+        # the key computed by the string is reused
+        self.assertIs(self.withdata.sort_key(key), key.sort_key())
+        self.assertEqual(self.withdata[key], 1)
+        self.assertNotEqual(self.compdata.sort_key(key), key.sort_key())
+        self.assertNotIn(key, self.compdata)
+
+        key = UnicodeStrFactory(locale='en_US', comparison_level=3)(u'abc')
+        self.assertIs(self.compdata.sort_key(key), key.sort_key())
+        self.assertNotIn(key, self.compdata)
+        self.assertIn(key, self.withdata)
+
+    def test_iter_unicode_str(self):
+        compdata = unicode_dict({u'ábc':1, u'd':2},comparison_level=3)
+        keys = list(compdata.iter_unicode_str())
+        self.assertEqual(set(unicode(i) for i in keys), set([u'ábc', u'd']))
+        for key in keys:
+            self.assertIs(key._factory, compdata.str_factory)
+            self.assertEqual(key.sort_key(), compdata.sort_key(key))
+
+#UnicodeFrozenDict
+class TestUnicodeFrozenDict(unittest.TestCase):
+    def setUp(self):
+        self.withdata = unicode_dict({u'ábc':1, u'd':2})
+        self.frozen = unicode_frozendict({u'ábc':1, u'd':2})
+
+    def test_create(self):
+        self.assertEqual(self.frozen[u'ABC'], 1)
+        self.assertEqual(self.frozen, self.withdata)
+        self.assertEqual(self.withdata, self.frozen)
+        frozen = unicode_frozendict(unicode_dict({u'ábc':1, u'abc':2}, comparison_level=3))
+        self.assertEqual(frozen.comparison_level, 3)
+        self.assertEqual(len(frozen), 2)
+        frozen = unicode_frozendict.fromkeys([u'ábc', u'abc'])
+        self.assertEqual(len(frozen), 1)
+
+    def test_immutable(self):
+        with self.assertRaises(TypeError):
+            self.frozen[u'e'] = 3
+        with self.assertRaises(TypeError):
+            del self.frozen[u'd']
+        with self.assertRaises(TypeError):
+            self.frozen.update({u'e':3})
+        with self.assertRaises(TypeError):
+            self.frozen.pop(u'd')
+        with self.assertRaises(TypeError):
+            self.frozen.setdefault(u'e', 3)
+        self.assertEqual(len(self.frozen), 2)
+        self.assertIs(self.frozen.copy(), self.frozen)
+
+    def test_hash(self):
+        other = unicode_frozendict({u'ABC':1, u'D':2})
+        self.assertEqual(hash(other), hash(self.frozen))
+        self.assertEqual({self.frozen:1}[other], 1)
+        self.assertNotEqual(hash(unicode_frozendict({u'abc':2, u'd':2})), hash(self.frozen))
+        with self.assertRaises(TypeError):
+            hash(unicode_frozendict({u'abc':[]}))
+
+    def test_pickle(self):
+        import pickle
+        frozen = pickle.loads(pickle.dumps(self.frozen))
+        self.assertIsInstance(frozen, unicode_frozendict)
+        self.assertEqual(frozen, self.frozen)
+
+#UnicodeCounter
+class TestUnicodeCounter(unittest.TestCase):
+    def setUp(self):
+        self.words = [u'Zürich', u'zurich', u'Bern', u'ZURICH', u'bern', u'Genève']
+        self.counter = unicode_counter(self.words)
+
+    def test_count(self):
+        self.assertEqual(len(self.counter), 3)
+        self.assertEqual(self.counter[u'zurich'], 3)
+        self.assertEqual(self.counter[u'BERN'], 2)
+        self.assertEqual(self.counter[u'Basel'], 0)
+        self.assertNotIn(u'Basel', self.counter)
+        self.assertEqual(set(self.counter), set([u'Zürich', u'Bern', u'Genève']))
+        self.assertEqual(self.counter.increment(u'geneve'), 2)
+        self.assertEqual(self.counter.increment(u'Basel', 5), 5)
+        self.assertEqual(self.counter[u'basel'], 5)
+        with self.assertRaises(NotImplementedError):
+            unicode_counter.fromkeys(self.words)
+
+    def test_update(self):
+        self.counter.update([u'bern', u'Lugano'])
+        self.counter.update({u'ZÜRICH':2}, lugano=1)
+        self.assertEqual(self.counter[u'zurich'], 5)
+        self.assertEqual(self.counter[u'Bern'], 3)
+        self.assertEqual(self.counter[u'lugano'], 2)
+        self.counter.subtract([u'bern', u'bern'])
+        self.assertEqual(self.counter[u'Bern'], 1)
+        self.assertEqual(sorted(self.counter.elements()), [u'Bern', u'Genève', u'Lugano', u'Lugano'] + [u'Zürich'] * 5)
+
+    def test_most_common(self):
+        self.assertEqual(self.counter.most_common(1), [(u'Zürich', 3)])
+        self.assertEqual(self.counter.most_common(), [(u'Zürich', 3), (u'Bern', 2), (u'Genève', 1)])
+        self.assertEqual(self.counter.most_common(0), [])
+
+    def test_merge(self):
+        other = unicode_counter([u'zürich', u'Basel'])
+        merged = self.counter + other
+        self.assertEqual(merged[u'zurich'], 4)
+        self.assertEqual(merged[u'basel'], 1)
+        self.assertEqual(self.counter[u'zurich'], 3)
+        self.counter += unicode_counter([u'Zurich'], comparison_level=3)
+        self.assertEqual(self.counter[u'zurich'], 4)
+        counter3 = unicode_counter(self.words, comparison_level=3)
+        self.assertEqual(len(counter3), 6)
+        self.assertEqual(unicode_counter(counter3).comparison_level, 3)
+
+    def test_positive(self):
+        # Like collections.Counter: + and | keep only the positive counts, | the largest
+        other = unicode_counter([u'zurich'])
+        other.subtract([u'bern', u'bern', u'basel'])
+        merged = self.counter + other
+        self.assertEqual(merged[u'zurich'], 4)
+        self.assertNotIn(u'bern', merged)
+        self.assertNotIn(u'basel', merged)
+        union = self.counter | other
+        self.assertEqual(union[u'zurich'], 3)
+        self.assertEqual(union[u'bern'], 2)
+        self.assertNotIn(u'basel', union)
+        self.assertEqual(dict((unicode_counter([u'a', u'b', u'a']) | unicode_counter([u'A'])).iteritems()), {u'a': 2, u'b': 1})
+        self.counter |= unicode_counter([u'Genève'] * 4, comparison_level=3)
+        self.assertEqual(self.counter[u'geneve'], 4)
+        self.counter += other
+        self.assertNotIn(u'bern', self.counter)
+        with self.assertRaises(TypeError):
+            self.counter | [u'a']
+
+    def test_pickle(self):
+        import pickle
+        counter = pickle.loads(pickle.dumps(self.counter))
+        self.assertIsInstance(counter, unicode_counter)
+        self.assertEqual(counter, self.counter)
+
 #UnicodeDefaultDict
 class TestUnicodeDefaultDict(unittest.TestCase):
     def test_int(self):
@@ -180,6 +440,29 @@ class TestUnicodeDefaultDict(unittest.TestCase):
         self.assertEqual(udict['a'].val, 1)
         self.assertEqual(udict['à'].val, 1)
 
+    def test_missing(self):
+        udict = unicode_defaultdict(list, comparison_level=3)
+        udict[u'ábc'].append(1)
+        udict[u'ábc'].append(2)
+        self.assertEqual(udict.get(u'abc'), None)
+        self.assertNotIn(u'abc', udict)
+        self.assertEqual(udict.__missing__(u'abc'), [])
+        self.assertEqual(dict(udict.iteritems()), {u'ábc':[1, 2], u'abc':[]})
+        self.assertEqual(len(udict), 2)
+
+        test = udict.copy()
+        test[u'ábc'].append(3)
+        test[u'd'].append(4)
+        self.assertIsInstance(test, unicode_defaultdict)
+        self.assertEqual(test.comparison_level, 3)
+        self.assertNotIn(u'd', udict)
+
+        udict = unicode_defaultdict(None)
+        with self.assertRaises(KeyError):
+            udict[u'abc']
+        with self.assertRaises(TypeError):
+            unicode_defaultdict(1)
+
 
 ### MAIN ###
 if __name__ == '__main__':
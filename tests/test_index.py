@@ -0,0 +1,92 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import unittest
+from unicode_col import unicode_prefix_index, unicode_multilevel_index, unicode_dict, unicode_set
+
+class TestUnicodePrefixIndex(unittest.TestCase):
+    def setUp(self):
+        self.names = [u'Müller', u'Neumann', u'mutter', u'Abel', u'Mueller', u'nebel', u'Mu']
+        self.index = unicode_prefix_index(self.names)
+
+    def test_prefix(self):
+        self.assertEqual(list(self.index.iprefix(u'mu')), [u'Mu', u'Mueller', u'Müller', u'mutter'])
+        self.assertEqual(list(self.index.iprefix(u'MÜL')), [u'Müller'])
+        self.assertEqual(list(self.index.iprefix(u'ne')), [u'nebel', u'Neumann'])
+        self.assertEqual(list(self.index.iprefix(u'x')), [])
+        self.assertEqual(len(list(self.index.iprefix(u''))), 7)
+
+    def test_limit(self):
+        self.assertEqual(list(self.index.iprefix(u'mu', limit=2)), [u'Mu', u'Mueller'])
+        self.assertEqual(list(self.index.iprefix(u'mu', limit=0)), [])
+
+    def test_comparison_level(self):
+        index = unicode_prefix_index(self.names, comparison_level=3)
+        self.assertEqual(list(index.iprefix(u'Mu')), [u'Mu', u'Mueller'])
+        self.assertEqual(list(index.iprefix(u'Mü')), [u'Müller'])
+
+        index = unicode_prefix_index(self.names, case_sensitive=True)
+        self.assertEqual(list(index.iprefix(u'mu')), [u'mutter'])
+
+    def test_containers(self):
+        index = unicode_prefix_index(unicode_set(self.names, comparison_level=3))
+        self.assertEqual(index.comparison_level, 3)
+        self.assertEqual(list(index.iprefix(u'Mü')), [u'Müller'])
+
+        index = unicode_prefix_index(unicode_dict((n, 1) for n in self.names))
+        self.assertEqual(index.comparison_level, 0)
+        self.assertEqual(list(index.iprefix(u'mü')), [u'Mu', u'Mueller', u'Müller', u'mutter'])
+
+    def test_update(self):
+        self.index.add(u'Mustermann')
+        self.index.add(u'muller')
+        self.index.discard(u'Mueller')
+        self.index.discard(u'Zed')
+        self.assertEqual(len(self.index), 7)
+        self.assertIn(u'MUSTERMANN', self.index)
+        self.assertNotIn(u'Mueller', self.index)
+        self.assertEqual(list(self.index.iprefix(u'mu')), [u'Mu', u'muller', u'Mustermann', u'mutter'])
+
+    def test_pickling(self):
+        import pickle
+        index = pickle.loads(pickle.dumps(self.index))
+        self.assertEqual(list(index), list(self.index))
+        self.assertEqual(list(index.iprefix(u'mu')), list(self.index.iprefix(u'mu')))
+
+class TestUnicodeMultilevelIndex(unittest.TestCase):
+    def setUp(self):
+        self.names = [u'Muller', u'Müller', u'muller', u'MÜLLER', u'Mueller', u'Neumann']
+        self.index = unicode_multilevel_index(self.names)
+
+    def test_lookup(self):
+        self.assertEqual(len(self.index), 6)
+        self.assertEqual(self.index.comparison_level, 2)
+        self.assertEqual(self.index.lookup(u'Müller'), [u'Müller'])
+        self.assertEqual(self.index.lookup(u'Müller', 1), [u'Müller', u'MÜLLER'])
+        self.assertEqual(set(self.index.lookup(u'Müller', 0)), set([u'Muller', u'Müller', u'muller', u'MÜLLER']))
+        self.assertEqual(self.index.lookup(u'neumann', 2), [])
+        self.assertEqual(self.index.lookup(u'neumann', 0), [u'Neumann'])
+        self.assertTrue(self.index.contains(u'MULLER', 0))
+        self.assertFalse(self.index.contains(u'MULLER'))
+        self.assertIn(u'Mueller', self.index)
+        with self.assertRaises(ValueError):
+            self.index.lookup(u'Müller', 3)
+        with self.assertRaises(ValueError):
+            unicode_multilevel_index(self.names, case_sensitive=True)
+        self.assertEqual(len(unicode_multilevel_index(self.names, case_sensitive=False)), 6)
+
+    def test_update(self):
+        self.index.add(u'Mülller')
+        self.index.discard(u'Muller')
+        self.index.discard(u'muller')
+        self.assertEqual(len(self.index), 5)
+        self.assertEqual(set(self.index.lookup(u'muller', 0)), set([u'Müller', u'MÜLLER']))
+
+    def test_pickling(self):
+        import pickle
+        index = pickle.loads(pickle.dumps(self.index))
+        self.assertEqual(list(index), list(self.index))
+        self.assertEqual(index.lookup(u'Müller', 1), self.index.lookup(u'Müller', 1))
+
+### MAIN ###
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import io
+import mmap
+import os
+import shutil
+import tempfile
+import unittest
+from unicode_col import unicode_dict, unicode_set, sorted_unicode_set, mmap_unicode_dict, write_mmap_dict
+from unicode_col import unicode_data_writer, unicode_data_reader
+from unicode_col import dump_unicode_data, dumps_unicode_data, load_unicode_data, loads_unicode_data
+
+class TestMmapUnicodeDict(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'names.ucol')
+        self.data = unicode_dict({u'Müller':1, u'Neumann':[2, 3], u'Abel':{'a':4}, u'Mueller':None})
+        write_mmap_dict(self.data, self.path)
+        self.mapped = mmap_unicode_dict(self.path)
+
+    def tearDown(self):
+        self.mapped.close()
+        shutil.rmtree(self.dir)
+
+    def test_lookup(self):
+        self.assertEqual(len(self.mapped), 4)
+        self.assertEqual(self.mapped[u'muller'], 1)
+        self.assertEqual(self.mapped[u'NEUMANN'], [2, 3])
+        self.assertEqual(self.mapped[u'abel'], {'a':4})
+        self.assertEqual(self.mapped[u'Mueller'], None)
+        self.assertIn(u'Mueller', self.mapped)
+        self.assertNotIn(u'Muller ', self.mapped)
+        self.assertNotIn(1, self.mapped)
+        self.assertEqual(self.mapped.get(u'Zed', 5), 5)
+        with self.assertRaises(KeyError):
+            self.mapped[u'Zed']
+
+    def test_collation(self):
+        self.assertEqual(self.mapped.locale, self.data.locale)
+        self.assertEqual(self.mapped.comparison_level, 0)
+        self.assertFalse(self.mapped.case_sensitive)
+
+        path = os.path.join(self.dir, 'level3.ucol')
+        write_mmap_dict({u'Müller':1}, path, comparison_level=3)
+        with mmap_unicode_dict(path) as mapped:
+            self.assertEqual(mapped.comparison_level, 3)
+            self.assertIn(u'Müller', mapped)
+            self.assertNotIn(u'muller', mapped)
+
+    def test_order(self):
+        self.assertEqual(list(self.mapped), [u'Abel', u'Mueller', u'Müller', u'Neumann'])
+        self.assertEqual(list(self.mapped.irange(u'mu', u'ne')), [u'Mueller', u'Müller'])
+        self.assertEqual(list(self.mapped.irange(u'muller', None, (False, True))), [u'Neumann'])
+        self.assertEqual(list(self.mapped.irange(maximum=u'Mueller', reverse=True)), [u'Mueller', u'Abel'])
+        self.assertEqual(dict(self.mapped.iteritems()), dict(self.data.iteritems()))
+
+    def test_empty(self):
+        path = os.path.join(self.dir, 'empty.ucol')
+        write_mmap_dict(unicode_dict(), path)
+        with mmap_unicode_dict(path) as mapped:
+            self.assertEqual(len(mapped), 0)
+            self.assertNotIn(u'abc', mapped)
+            self.assertEqual(list(mapped), [])
+
+    def test_pickling(self):
+        import pickle
+        mapped = pickle.loads(pickle.dumps(self.mapped))
+        try:
+            self.assertEqual(mapped[u'muller'], 1)
+        finally:
+            mapped.close()
+
+class TestUnicodeData(unittest.TestCase):
+    def setUp(self):
+        self.set = unicode_set([u'Müller', u'Neumann', u'Abel', u'Mueller', u'muller'], comparison_level=1)
+        self.dict = unicode_dict({u'Müller':1, u'Neumann':[2, 3], u'Abel':{'a':4}, u'Mueller':None})
+
+    def test_set(self):
+        data = dumps_unicode_data(self.set)
+        test = loads_unicode_data(data)
+        self.assertIsInstance(test, unicode_set)
+        self.assertEqual(test, self.set)
+        self.assertEqual(sorted(test), sorted(self.set))
+        self.assertEqual(test.comparison_level, 1)
+        self.assertIn(u'MULLER', test)
+        test = load_unicode_data(io.BytesIO(data))
+        self.assertEqual(test, self.set)
+        self.assertEqual(loads_unicode_data(bytearray(data)), self.set)
+        self.assertEqual(sorted(loads_unicode_data(memoryview(data))), sorted(self.set))
+        self.assertEqual(sorted(test.iter_sort_keys()), sorted(self.set.iter_sort_keys()))
+
+    def test_dict(self):
+        fp = io.BytesIO()
+        dump_unicode_data(self.dict, fp)
+        for test in [loads_unicode_data(fp.getvalue()), loads_unicode_data(bytearray(fp.getvalue())),
+                load_unicode_data(io.BytesIO(fp.getvalue()))]:
+            self.assertIsInstance(test, unicode_dict)
+            self.assertEqual(test, self.dict)
+            self.assertEqual(test[u'NEUMANN'], [2, 3])
+        test = loads_unicode_data(dumps_unicode_data(unicode_dict()))
+        self.assertEqual(len(test), 0)
+        with self.assertRaises(TypeError):
+            dumps_unicode_data({u'Abel':1})
+        with self.assertRaises(TypeError):
+            dumps_unicode_data(unicode_set(self.set, keys_only=True))
+
+    def test_sorted(self):
+        data = sorted_unicode_set(self.set)
+        data.discard(u'Abel')
+        test = loads_unicode_data(dumps_unicode_data(data))
+        self.assertEqual(test, data)
+
+    def test_stream(self):
+        fp = io.BytesIO()
+        writer = unicode_data_writer(fp, True, comparison_level=3)
+        writer.write(u'Müller', 1)
+        writer.write(u'muller', 2)
+        reader = unicode_data_reader(io.BytesIO(fp.getvalue()))
+        self.assertEqual(reader.comparison_level, 3)
+        self.assertTrue(reader.values)
+        records = list(reader)
+        self.assertEqual([(k, v) for _, k, v in records], [(u'Müller', 1), (u'muller', 2)])
+        self.assertEqual(records[0][0], writer.sort_key(u'Müller'))
+        test = unicode_data_reader(io.BytesIO(fp.getvalue())).load()
+        self.assertEqual(test.comparison_level, 3)
+        self.assertEqual(len(test), 2)
+
+    def test_errors(self):
+        data = dumps_unicode_data(self.dict)
+        with self.assertRaises(ValueError):
+            loads_unicode_data(b'X' + data[1:])
+        with self.assertRaises(ValueError):
+            loads_unicode_data(data[:-1])
+        with self.assertRaises(ValueError):
+            load_unicode_data(io.BytesIO(data[:-1]))
+
+    def test_mmap(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'names.ucol')
+            with open(path, 'wb') as fp:
+                dump_unicode_data(self.dict, fp)
+            with open(path, 'rb') as fp:
+                mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+                test = loads_unicode_data(mapped)
+                mapped.close()
+            self.assertEqual(test, self.dict)
+        finally:
+            shutil.rmtree(tmpdir)
+
+### MAIN ###
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,7 @@
 #!/usr/bin/python
 # -*- coding: utf8 -*-
 import unittest
-from unicode_col import unicode_set
+from unicode_col import unicode_set, unicode_frozenset, UnicodeStrFactory
 
 class TestUnicodeSet(unittest.TestCase):
     def setUp(self):
@@ -113,6 +113,34 @@ class TestUnicodeSet(unittest.TestCase):
         for i in a_c:
             self.assertIn(i, set([u'abc', u'Straße', u'echo', u'pena']))
 
+    def test_copy_on_write(self):
+        a_c = self.a.copy()
+        a_c.discard(u'live')
+        a_c.remove(u'ECHO')
+        self.assertEqual(len(a_c), 3)
+        self.assertEqual(len(self.a), 4)
+        self.assertIn(u'echo', self.a)
+        with self.assertRaises(KeyError):
+            a_c.remove(u'echo')
+
+        a_c = self.a.copy()
+        self.a.add(u'live')
+        self.assertNotIn(u'live', a_c)
+        self.a.clear()
+        self.assertEqual(len(a_c), 4)
+        a_c.pop()
+        self.assertEqual(len(a_c), 3)
+        self.assertEqual(len(self.a), 0)
+
+        d = self.b3.difference([u'xkcd'])
+        self.assertEqual(len(d), len(self.b3) - 1)
+        self.assertIn(u'xkcd', self.b3)
+        a_c = self.b3.copy()
+        a_c -= unicode_set([u'live'], comparison_level=3)
+        a_c &= unicode_set([u'live', u'ábc', u'àbc'], comparison_level=3)
+        self.assertEqual(len(a_c), 2)
+        self.assertEqual(len(self.b3), 6)
+
     def test_equality(self):
         a_c = self.a.copy()
         # Don't use assert(Not)Equal, testing the operators
@@ -127,6 +155,11 @@ class TestUnicodeSet(unittest.TestCase):
     def test_isdisjoint(self):
         self.assertTrue(self.a.isdisjoint(['c','ech',u'traße']))
         self.assertFalse(self.a.isdisjoint(['c','echo',u'traße']))
+        self.assertTrue(self.a.isdisjoint(unicode_set(['live'])))
+        self.assertFalse(self.a.isdisjoint(self.b))
+        self.assertFalse(self.b.isdisjoint(self.a))
+        self.assertFalse(self.a.isdisjoint(self.b3))
+        self.assertTrue(self.a.isdisjoint([]))
 
     def test_subset(self):
         self.assertFalse(self.a.issubset(['äbc']))
@@ -189,14 +222,22 @@ class TestUnicodeSet(unittest.TestCase):
         for i in x:
             self.assertIn(i, [u'echo', u'pena', u'Straße', u'live', u'xkcd', u'ábc'])
 
-        with self.assertRaises(TypeError) as cm:
-            self.a | self.test_set_b
+        self.assertEqual(self.a | self.test_set_b, self.a.union(self.test_set_b))
+        self.assertEqual(self.test_set_b | self.a, self.a.union(self.test_set_b))
+        self.assertEqual(self.a | set(self.test_set_b), self.a.union(self.test_set_b))
         
         with self.assertRaises(TypeError) as cm:
             self.a | self.a3
-        
+
+        with self.assertRaises(TypeError) as cm:
+            self.a | u'abc'
+
         with self.assertRaises(TypeError) as cm:
-            self.a |= self.test_set_b
+            self.a | 1
+        
+        x = self.a.copy()
+        x |= self.test_set_b
+        self.assertEqual(x, self.a.union(self.test_set_b))
         
         with self.assertRaises(TypeError) as cm:
             self.a |= self.a3
@@ -224,18 +265,51 @@ class TestUnicodeSet(unittest.TestCase):
         for i in x:
             self.assertIn(i,[u'abc', u'Straße'])
 
-        with self.assertRaises(TypeError) as cm:
-            self.a & self.test_set_b
+        self.assertEqual(self.a & self.test_set_b, self.a.intersection(self.test_set_b))
+        self.assertEqual(self.test_set_b & self.a, self.a.intersection(self.test_set_b))
+        self.assertEqual(self.a & set(self.test_set_b), self.a.intersection(self.test_set_b))
         
         with self.assertRaises(TypeError) as cm:
             self.a & self.a3
         
-        with self.assertRaises(TypeError) as cm:
-            self.a &= self.test_set_b
+        x = self.a.copy()
+        x &= self.test_set_b
+        self.assertEqual(x, self.a.intersection(self.test_set_b))
         
         with self.assertRaises(TypeError) as cm:
             self.a &= self.a3
-        
+
+        x = self.a.intersection(self.b, self.test_set_c, self.a3)
+        self.assertEqual(list(x), [u'abc'])
+        self.assertEqual(x, self.a.intersection(self.b).intersection(self.test_set_c))
+        self.assertEqual(len(self.a.intersection(self.b, [])), 0)
+        self.assertEqual(self.a.intersection(), self.a)
+
+        x = self.a.copy()
+        x.intersection_update(self.test_set_c, self.b)
+        self.assertEqual(list(x), [u'abc'])
+        self.assertEqual(len(self.a), 4)
+
+    def test_union_all(self):
+        x = unicode_set.union_all([self.a, self.b, self.test_set_c])
+        self.assertEqual(x, self.a.union(self.b, self.test_set_c))
+        self.assertEqual(x.comparison_level, 0)
+
+        x = unicode_set.union_all(iter([self.a3, self.b3]))
+        self.assertEqual(x, self.a3 | self.b3)
+        self.assertEqual(x.comparison_level, 3)
+
+        x = unicode_set.union_all([self.test_set_a, self.test_set_b], comparison_level=3)
+        self.assertEqual(x, self.a3 | self.b3)
+
+        x = unicode_set.union_all([], comparison_level=3)
+        self.assertEqual(len(x), 0)
+        self.assertEqual(x.comparison_level, 3)
+
+        x = unicode_frozenset.union_all([self.a, self.b])
+        self.assertIsInstance(x, unicode_frozenset)
+        self.assertEqual(x, self.a | self.b)
+
     def test_difference(self):
         x = self.a.difference(self.b)
         self.assertEqual(len(x), 2)
@@ -259,14 +333,16 @@ class TestUnicodeSet(unittest.TestCase):
         for i in x:
             self.assertIn(i,[u'echo',  u'pena'])
 
-        with self.assertRaises(TypeError):
-            self.a - self.test_set_b
+        self.assertEqual(self.a - self.test_set_b, self.a.difference(self.test_set_b))
+        self.assertEqual(self.test_set_b - self.a, unicode_set(self.test_set_b).difference(self.a))
+        self.assertEqual(self.a - set(self.test_set_b), self.a.difference(self.test_set_b))
 
         with self.assertRaises(TypeError):
             self.a - self.a3
 
-        with self.assertRaises(TypeError):
-            self.a -= self.test_set_b
+        x = self.a.copy()
+        x -= self.test_set_b
+        self.assertEqual(x, self.a.difference(self.test_set_b))
 
         with self.assertRaises(TypeError):
             self.a -= self.a3
@@ -294,14 +370,24 @@ class TestUnicodeSet(unittest.TestCase):
         for i in x:
             self.assertIn(i,[u'echo',  u'pena', u'live', u'xkcd'])
 
-        with self.assertRaises(TypeError) as cm:
-            self.a ^ self.test_set_b
+        x = self.a3.symmetric_difference(self.test_set_c)
+        self.assertEqual(len(x), 7)
+        self.assertNotIn(u'abc', x)
+        x = self.a.copy()
+        x ^= x
+        self.assertEqual(len(x), 0)
+        self.assertEqual(len(self.a), 4)
+
+        self.assertEqual(self.a ^ self.test_set_b, self.a.symmetric_difference(self.test_set_b))
+        self.assertEqual(self.test_set_b ^ self.a, self.a.symmetric_difference(self.test_set_b))
+        self.assertEqual(self.a ^ set(self.test_set_b), self.a.symmetric_difference(self.test_set_b))
 
         with self.assertRaises(TypeError) as cm:
             self.a ^ self.a3
 
-        with self.assertRaises(TypeError) as cm:
-            self.a ^= self.test_set_b
+        x = self.a.copy()
+        x ^= self.test_set_b
+        self.assertEqual(x, self.a.symmetric_difference(self.test_set_b))
 
         with self.assertRaises(TypeError) as cm:
             self.a ^= self.a3
@@ -343,6 +429,157 @@ class TestUnicodeSet(unittest.TestCase):
         for i in self.b:
             self.fail()
 
+    def test_unicode_str(self):
+        factory = UnicodeStrFactory(locale='en_US', comparison_level=3)
+        words = [factory(i) for i in self.test_set_a]
+        a3 = unicode_set(words, comparison_level=3)
+        self.assertEqual(a3, self.a3)
+        self.assertIs(a3.sort_key(words[0]), words[0].sort_key())
+        self.assertIn(factory(u'peña'), a3)
+        self.assertNotIn(factory(u'Strasse'), a3)
+        self.assertIn(factory(u'Strasse'), self.a)
+
+        for i in self.a.iter_unicode_str():
+            self.assertIs(i._factory, self.a.str_factory)
+            self.assertEqual(i.sort_key(), self.a.sort_key(i))
+            self.assertIn(unicode(i), set([u'abc', u'Straße', u'echo', u'pena']))
+        for i in a3.iter_unicode_str():
+            self.assertIs(i._factory, factory)
+
+    def test_keys_only(self):
+        import pickle
+        k = unicode_set(self.test_set_a, keys_only=True)
+        self.assertTrue(k.keys_only)
+        self.assertEqual(len(k), len(self.a))
+        self.assertEqual(k, self.a)
+        for i in self.test_set_a:
+            self.assertIn(i, k)
+        self.assertIn(u'STRAßE', k)
+        self.assertNotIn(u'xkcd', k)
+        self.assertEqual(sorted(k), sorted(self.a.iter_sort_keys()))
+
+        k.add(u'xkcd')
+        self.assertIn(u'XKCD', k)
+        self.assertNotIn(u'xkcd', list(k))
+        k.remove(u'xkcd')
+        self.assertEqual(k, self.a)
+
+        self.assertEqual(k | self.b, self.a | self.b)
+        self.assertEqual(k & self.b, self.a & self.b)
+        self.assertEqual(k - self.test_set_b, self.a - self.test_set_b)
+        self.assertEqual(k ^ self.b, self.a ^ self.b)
+        self.assertTrue((k | self.b).keys_only)
+        self.assertTrue((self.test_set_b - k).keys_only)
+        self.assertTrue(k.copy().keys_only)
+        self.assertTrue(unicode_set(k).keys_only)
+        x = k.copy()
+        x ^= self.b
+        for i in x:
+            self.assertIn(i, set(x.iter_sort_keys()))
+
+        self.assertEqual(unicode_set.from_iterable(self.test_set_a, keys_only=True), k)
+        self.assertEqual(pickle.loads(pickle.dumps(k)), k)
+        self.assertTrue(pickle.loads(pickle.dumps(k)).keys_only)
+        f = unicode_frozenset(k)
+        self.assertTrue(f.keys_only)
+        self.assertEqual(pickle.loads(pickle.dumps(f)), f)
+
+        with self.assertRaises(TypeError):
+            unicode_set(k, comparison_level=3)
+        with self.assertRaises(TypeError):
+            self.a3.update(k)
+        with self.assertRaises(TypeError):
+            self.a | k
+        with self.assertRaises(TypeError):
+            self.a ^ k
+        with self.assertRaises(TypeError):
+            unicode_set(k, keys_only=False)
+        with self.assertRaises(TypeError):
+            self.a3.isdisjoint(k)
+        with self.assertRaises(TypeError):
+            self.a3.issuperset(k)
+        self.assertFalse(self.a.isdisjoint(k))
+        self.assertTrue(self.a.issuperset(k))
+        with self.assertRaises(TypeError):
+            list(k.iter_unicode_str())
+
+    def test_from_iterable(self):
+        a = unicode_set.from_iterable(self.test_set_a)
+        self.assertEqual(a, self.a)
+        a3 = unicode_set.from_iterable(self.test_set_a, comparison_level=3)
+        self.assertEqual(a3, self.a3)
+
+        keys = [self.a3.sort_key(i) for i in self.test_set_a]
+        a3 = unicode_set.from_iterable(self.test_set_a, keys, comparison_level=3)
+        self.assertEqual(a3, self.a3)
+        self.assertIn(u'peña', a3)
+        self.assertNotIn(u'Strasse', a3)
+        with self.assertRaises(ValueError):
+            unicode_set.from_iterable(self.test_set_a, keys[:1], comparison_level=3)
+        with self.assertRaises(ValueError):
+            unicode_set.from_iterable(self.test_set_a[:2], keys, comparison_level=3)
+        with self.assertRaises(ValueError):
+            unicode_set.from_iterable(self.test_set_a, keys[:1], comparison_level=3, keys_only=True)
+
+class TestUnicodeFrozenSet(unittest.TestCase):
+    def setUp(self):
+        self.test_set_a = [u'ábc', u'abc', u'Straße', u'echo', u'peña', u'pena']
+        self.a = unicode_set(self.test_set_a)
+        self.fa = unicode_frozenset(self.test_set_a)
+
+    def test_create(self):
+        self.assertEqual(len(self.fa), 4)
+        self.assertIn(u'Strasse', self.fa)
+        self.assertEqual(self.fa, self.a)
+        self.assertEqual(self.a, self.fa)
+        fa3 = unicode_frozenset(unicode_set(self.test_set_a, comparison_level=3))
+        self.assertEqual(fa3.comparison_level, 3)
+        self.assertEqual(len(fa3), 6)
+
+    def test_immutable(self):
+        with self.assertRaises(TypeError):
+            self.fa.add(u'live')
+        with self.assertRaises(TypeError):
+            self.fa.discard(u'abc')
+        with self.assertRaises(TypeError):
+            self.fa.update([u'live'])
+        with self.assertRaises(TypeError):
+            self.fa.clear()
+        self.assertEqual(len(self.fa), 4)
+        self.assertIs(self.fa.copy(), self.fa)
+
+    def test_hash(self):
+        fb = unicode_frozenset([u'ABC', u'strasse', u'Echo', u'pena'])
+        self.assertEqual(fb, self.fa)
+        self.assertEqual(hash(fb), hash(self.fa))
+        data = {self.fa:1}
+        self.assertEqual(data[fb], 1)
+        with self.assertRaises(TypeError):
+            hash(self.a)
+
+    def test_operations(self):
+        other = unicode_set([u'ABC', u'live'])
+        union = self.fa | other
+        self.assertIsInstance(union, unicode_frozenset)
+        self.assertEqual(len(union), 5)
+        self.assertEqual(self.fa & other, unicode_set([u'abc']))
+        self.assertIsInstance(self.fa - other, unicode_frozenset)
+        self.assertEqual(len(self.fa - other), 3)
+        self.assertEqual(len(self.fa ^ other), 4)
+        self.assertEqual(len(self.fa), 4)
+
+        fa = self.fa
+        fa |= other
+        self.assertEqual(len(fa), 5)
+        self.assertEqual(len(self.fa), 4)
+
+    def test_pickle(self):
+        import pickle
+        fa = pickle.loads(pickle.dumps(self.fa))
+        self.assertIsInstance(fa, unicode_frozenset)
+        self.assertEqual(fa, self.fa)
+        self.assertEqual(hash(fa), hash(self.fa))
+
 ### MAIN ###
 if __name__ == '__main__':
     unittest.main()
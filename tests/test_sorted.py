@@ -0,0 +1,217 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import unittest
+from unicode_col import sorted_unicode_dict, sorted_unicode_set, unicode_set
+from unicode_col.unicode_sorted import _sorted_key_list
+
+class small_key_list(_sorted_key_list):
+    _load = 2
+
+class TestSortedKeyList(unittest.TestCase):
+    def test_chunks(self):
+        keys = small_key_list()
+        for i in [5, 3, 9, 1, 7, 2, 8, 6, 4, 0]:
+            keys.add(i)
+        self.assertEqual(list(keys), list(range(10)))
+        self.assertEqual(list(reversed(keys)), list(range(9, -1, -1)))
+        self.assertEqual(len(keys), 10)
+        self.assertEqual(keys[0], 0)
+        self.assertEqual(keys[-1], 9)
+        self.assertEqual(keys[3:6], [3, 4, 5])
+        self.assertEqual(keys.bisect_left(4), 4)
+        self.assertEqual(keys.bisect_right(4), 5)
+        self.assertEqual(list(keys.irange(3, 6)), [3, 4, 5, 6])
+        self.assertEqual(list(keys.irange(3, 6, (False, False))), [4, 5])
+        self.assertEqual(list(keys.irange(3, 6, reverse=True)), [6, 5, 4, 3])
+
+        keys.remove(4)
+        keys.remove(0)
+        self.assertEqual(list(keys), [1, 2, 3, 5, 6, 7, 8, 9])
+        self.assertEqual(keys[3], 5)
+        with self.assertRaises(ValueError):
+            keys.remove(4)
+
+class TestSortedUnicodeDict(unittest.TestCase):
+    def setUp(self):
+        self.names = [u'Müller', u'Neumann', u'Abel', u'Mueller', u'nebel', u'Zoë', u'muller']
+        self.data = sorted_unicode_dict((n, i) for i, n in enumerate(self.names))
+
+    def test_len(self):
+        # Müller and muller are the same key at comparison level 0,
+        # the last one inserted is kept
+        self.assertEqual(len(self.data), 6)
+        self.assertIn(u'muller', list(self.data.keys()))
+        self.assertEqual(self.data[u'MULLER'], 6)
+
+    def test_order(self):
+        self.assertEqual(list(self.data.keys()),
+            [u'Abel', u'Mueller', u'muller', u'nebel', u'Neumann', u'Zoë'])
+        self.assertEqual(list(self.data.values()), [2, 3, 6, 4, 1, 5])
+        self.assertEqual(list(self.data.items())[0], (u'Abel', 2))
+        self.assertEqual(list(reversed(self.data))[0], u'Zoë')
+
+    def test_irange(self):
+        self.assertEqual(list(self.data.irange(u'Mü', u'Ne')), [u'Mueller', u'muller'])
+        self.assertEqual(list(self.data.irange(u'Muller', None, (False, True))), [u'nebel', u'Neumann', u'Zoë'])
+        self.assertEqual(list(self.data.irange(maximum=u'Mueller', reverse=True)), [u'Mueller', u'Abel'])
+
+    def test_bisect(self):
+        self.assertEqual(self.data.bisect_left(u'muller'), 2)
+        self.assertEqual(self.data.bisect_right(u'muller'), 3)
+        self.assertEqual(self.data.index(u'Zoe'), 5)
+        with self.assertRaises(KeyError):
+            self.data.index(u'Zed')
+
+    def test_peekitem(self):
+        self.assertEqual(self.data.peekitem(0), (u'Abel', 2))
+        self.assertEqual(self.data.peekitem(), (u'Zoë', 5))
+        self.assertEqual(self.data.first(), u'Abel')
+        self.assertEqual(self.data.last(), u'Zoë')
+        with self.assertRaises(IndexError):
+            self.data.peekitem(6)
+
+    def test_delete(self):
+        del self.data[u'muller']
+        self.assertEqual(len(self.data), 5)
+        self.assertNotIn(u'Müller', self.data)
+        self.assertEqual(self.data.popitem(), (u'Zoë', 5))
+        self.assertEqual(self.data.pop(u'abel'), 2)
+        self.assertEqual(list(self.data.keys()), [u'Mueller', u'nebel', u'Neumann'])
+        with self.assertRaises(KeyError):
+            del self.data[u'Abel']
+        self.data.clear()
+        self.assertEqual(list(self.data), [])
+        with self.assertRaises(KeyError):
+            self.data.popitem()
+
+    def test_copy(self):
+        test = self.data.copy()
+        self.assertEqual(test, self.data)
+        self.assertEqual(list(test.keys()), list(self.data.keys()))
+        test[u'Bach'] = 7
+        self.assertEqual(test.index(u'bach'), 1)
+        self.assertNotIn(u'Bach', self.data)
+
+    def test_update(self):
+        self.data.update(sorted_unicode_dict([(u'Bach', 7), (u'ABEL', 8)]))
+        self.data.update([(u'Zed', 9)], Aaron=10)
+        self.assertEqual(list(self.data.keys()),
+            [u'Aaron', u'ABEL', u'Bach', u'Mueller', u'muller', u'nebel', u'Neumann', u'Zed', u'Zoë'])
+        test = self.data | {u'Ada': 11}
+        self.assertEqual(test.index(u'ada'), 2)
+        self.assertNotIn(u'Ada', self.data)
+
+    def test_from_items(self):
+        test = sorted_unicode_dict.from_items((n, i) for i, n in enumerate(self.names))
+        self.assertEqual(list(test.keys()), list(self.data.keys()))
+        test = sorted_unicode_dict.fromkeys(self.names, comparison_level=3)
+        self.assertEqual(len(test), 7)
+        self.assertEqual(test.peekitem(0), (u'Abel', None))
+
+    def test_pickling(self):
+        import pickle
+        test = pickle.loads(pickle.dumps(self.data))
+        self.assertEqual(test, self.data)
+        self.assertEqual(list(test.keys()), list(self.data.keys()))
+        test[u'Bach'] = 7
+        self.assertEqual(test.index(u'bach'), 1)
+
+class TestSortedUnicodeSet(unittest.TestCase):
+    def setUp(self):
+        self.names = [u'Müller', u'Neumann', u'Abel', u'Mueller', u'nebel', u'Zoë', u'muller']
+        self.data = sorted_unicode_set(self.names)
+
+    def test_order(self):
+        self.assertEqual(len(self.data), 6)
+        self.assertEqual(list(self.data),
+            [u'Abel', u'Mueller', u'muller', u'nebel', u'Neumann', u'Zoë'])
+        self.assertEqual(list(reversed(self.data))[0], u'Zoë')
+        self.assertEqual(self.data, unicode_set(self.names))
+
+    def test_positions(self):
+        self.assertEqual(self.data[0], u'Abel')
+        self.assertEqual(self.data[-1], u'Zoë')
+        self.assertEqual(self.data[1:3], [u'Mueller', u'muller'])
+        self.assertEqual(self.data.index(u'MÜLLER'), 2)
+        self.assertEqual(self.data.bisect_left(u'muller'), 2)
+        self.assertEqual(self.data.bisect_right(u'muller'), 3)
+        self.assertEqual(self.data.first(), u'Abel')
+        self.assertEqual(self.data.last(), u'Zoë')
+        with self.assertRaises(KeyError):
+            self.data.index(u'Zed')
+        with self.assertRaises(IndexError):
+            self.data[6]
+
+    def test_neighbors(self):
+        self.assertEqual(self.data.successor(u'muller'), u'nebel')
+        self.assertEqual(self.data.successor(u'Bach'), u'Mueller')
+        self.assertEqual(self.data.predecessor(u'muller'), u'Mueller')
+        self.assertEqual(self.data.predecessor(u'Bach'), u'Abel')
+        with self.assertRaises(KeyError):
+            self.data.successor(u'Zoe')
+        with self.assertRaises(KeyError):
+            self.data.predecessor(u'Abel')
+
+    def test_irange(self):
+        self.assertEqual(list(self.data.irange(u'Mü', u'Ne')), [u'Mueller', u'muller'])
+        self.assertEqual(list(self.data.irange(u'Muller', None, (False, True))), [u'nebel', u'Neumann', u'Zoë'])
+        self.assertEqual(list(self.data.irange(maximum=u'Mueller', reverse=True)), [u'Mueller', u'Abel'])
+        self.assertEqual(list(self.data.islice(1, 3)), [u'Mueller', u'muller'])
+
+    def test_changes(self):
+        self.data.add(u'Bach')
+        self.assertEqual(self.data.index(u'bach'), 1)
+        self.data.remove(u'MULLER')
+        self.assertNotIn(u'muller', self.data)
+        self.data.discard(u'Zed')
+        self.assertEqual(self.data.pop(), u'Zoë')
+        self.assertEqual(self.data.pop(0), u'Abel')
+        self.assertEqual(list(self.data), [u'Bach', u'Mueller', u'nebel', u'Neumann'])
+        self.data.update([u'Ada', u'Zed'])
+        self.assertEqual(list(self.data), [u'Ada', u'Bach', u'Mueller', u'nebel', u'Neumann', u'Zed'])
+        self.data -= [u'bach', u'zed']
+        self.assertEqual(list(self.data), [u'Ada', u'Mueller', u'nebel', u'Neumann'])
+        self.data &= [u'ada', u'NEBEL', u'Zoë']
+        self.assertEqual(list(self.data), [u'Ada', u'nebel'])
+        self.data ^= [u'Ada', u'Abel']
+        self.assertEqual(list(self.data), [u'Abel', u'nebel'])
+        self.data.clear()
+        self.assertEqual(list(self.data), [])
+        with self.assertRaises(KeyError):
+            self.data.pop()
+
+    def test_operations(self):
+        test = self.data | [u'Bach']
+        self.assertIsInstance(test, sorted_unicode_set)
+        self.assertEqual(test.index(u'bach'), 1)
+        self.assertNotIn(u'Bach', self.data)
+        test = [u'Bach', u'Abel'] - self.data
+        self.assertIsInstance(test, sorted_unicode_set)
+        self.assertEqual(list(test), [u'Bach'])
+        test = self.data.copy()
+        test.add(u'Aaron')
+        self.assertEqual(test[0], u'Aaron')
+        self.assertEqual(self.data[0], u'Abel')
+
+    def test_pickling(self):
+        import pickle
+        test = pickle.loads(pickle.dumps(self.data))
+        self.assertEqual(test, self.data)
+        self.assertEqual(list(test), list(self.data))
+
+    def test_keys_only(self):
+        import pickle
+        data = sorted_unicode_set(self.names, keys_only=True)
+        self.assertEqual(data, self.data)
+        self.assertEqual(list(data), list(data.iter_sort_keys()))
+        data.add(u'Bach')
+        self.assertEqual(data.index(u'bach'), 1)
+        self.assertEqual(data.pop(0), data.sort_key(u'Abel'))
+        self.assertEqual(data.successor(u'Bach'), data.sort_key(u'Mueller'))
+        test = pickle.loads(pickle.dumps(data))
+        self.assertTrue(test.keys_only)
+        self.assertEqual(test, data)
+
+### MAIN ###
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,187 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import unittest
+try:
+    import resource
+except ImportError:
+    resource = None
+from unicode_col import group_by, count_reducer, sum_reducer, first_reducer, dedupe, external_sort, UnicodeStrFactory
+from unicode_col import unicode_stream
+
+class file_limit(object):
+    '''Lower the limit of open files (where it can be set) and the number of
+    files merged at the same time
+    '''
+
+    def __init__(self, limit=128, max_open_runs=None):
+        self.limit = limit
+        self.max_open_runs = max_open_runs
+
+    def __enter__(self):
+        self.old_runs = unicode_stream._MAX_OPEN_RUNS
+        if self.max_open_runs is not None:
+            unicode_stream._MAX_OPEN_RUNS = self.max_open_runs
+        if resource is not None:
+            self.old_limit = resource.getrlimit(resource.RLIMIT_NOFILE)
+            resource.setrlimit(resource.RLIMIT_NOFILE, (min(self.limit, self.old_limit[0]), self.old_limit[1]))
+
+    def __exit__(self, *args):
+        unicode_stream._MAX_OPEN_RUNS = self.old_runs
+        if resource is not None:
+            resource.setrlimit(resource.RLIMIT_NOFILE, self.old_limit)
+
+class TestGroupBy(unittest.TestCase):
+    def setUp(self):
+        self.records = [
+            {'city': u'Zürich', 'n': 1},
+            {'city': u'Bern', 'n': 2},
+            {'city': u'ZURICH', 'n': 3},
+            {'city': u'Genève', 'n': 4},
+            {'city': u'bern', 'n': 5},
+            {'city': u'zurich', 'n': 6},
+            ]
+
+    def test_unsorted(self):
+        groups = list(group_by(self.records, 'city'))
+        self.assertEqual([k for k, _ in groups], [u'Bern', u'Genève', u'Zürich'])
+        self.assertEqual([r['n'] for r in groups[2][1]], [1, 3, 6])
+
+    def test_reducers(self):
+        self.assertEqual(list(group_by(self.records, 'city', count_reducer())),
+            [(u'Bern', 2), (u'Genève', 1), (u'Zürich', 3)])
+        self.assertEqual(list(group_by(self.records, 'city', sum_reducer('n'))),
+            [(u'Bern', 7), (u'Genève', 4), (u'Zürich', 10)])
+        self.assertEqual([r['n'] for _, r in group_by(self.records, lambda r: r['city'], first_reducer())],
+            [2, 4, 1])
+
+    def test_collation(self):
+        groups = list(group_by(self.records, 'city', count_reducer(), case_sensitive=True))
+        self.assertEqual(len(groups), 6)
+        groups = list(group_by(self.records, 'city', count_reducer(), comparison_level=1))
+        self.assertEqual(groups, [(u'Bern', 2), (u'Genève', 1), (u'ZURICH', 2), (u'Zürich', 1)])
+
+    def test_presorted(self):
+        records = sorted(self.records, key=lambda r: r['city'].lower().replace(u'ü', u'u').replace(u'è', u'e'))
+        groups = group_by(records, 'city', sum_reducer('n'), presorted=True)
+        self.assertEqual(next(groups), (u'Bern', 7))
+        self.assertEqual(list(groups), [(u'Genève', 4), (u'Zürich', 10)])
+
+    def test_spill(self):
+        records = [(u'key%d' % (i % 7), i) for i in range(100)]
+        expected = list(group_by(records, 0, sum_reducer(1)))
+        self.assertEqual(list(group_by(records, 0, sum_reducer(1), max_groups=3)), expected)
+        groups = dict(group_by(records, 0, max_groups=2))
+        self.assertEqual([i for _, i in groups[u'key3']], list(range(3, 100, 7)))
+        firsts = list(group_by(records, 0, first_reducer(), max_groups=2))
+        self.assertEqual(sorted(i for _, (_, i) in firsts), list(range(7)))
+
+    def test_many_spills(self):
+        records = [(u'key%d' % (i % 1000), i) for i in range(3000)]
+        expected = list(group_by(records, 0, sum_reducer(1)))
+        with file_limit():
+            self.assertEqual(list(group_by(records, 0, sum_reducer(1), max_groups=10)), expected)
+        with file_limit(max_open_runs=3):
+            self.assertEqual(list(group_by(records, 0, sum_reducer(1), max_groups=10)), expected)
+            groups = list(group_by(records, 0, max_groups=10))
+        self.assertEqual([i for _, i in dict(groups)[u'key7']], [7, 1007, 2007])
+
+class TestDedupe(unittest.TestCase):
+    def setUp(self):
+        self.names = [u'Zürich', u'Bern', u'ZURICH', u'Genève', u'bern', u'zurich', u'Basel', u'geneve']
+
+    def test_first(self):
+        self.assertEqual(list(dedupe(self.names)), [u'Zürich', u'Bern', u'Genève', u'Basel'])
+        self.assertEqual(list(dedupe(self.names, comparison_level=3)), self.names)
+        self.assertEqual(list(dedupe(self.names + [u'Zurich'], case_sensitive=True)), self.names)
+
+    def test_last(self):
+        self.assertEqual(list(dedupe(self.names, keep='last')), [u'bern', u'zurich', u'Basel', u'geneve'])
+        with self.assertRaises(ValueError):
+            dedupe(self.names, keep='any')
+
+    def test_lazy(self):
+        def names():
+            for name in self.names[:3]:
+                yield name
+            raise AssertionError('read too far')
+        found = dedupe(names())
+        self.assertEqual(next(found), u'Zürich')
+        self.assertEqual(next(found), u'Bern')
+
+    def test_key(self):
+        records = [{'city': name, 'n': i} for i, name in enumerate(self.names)]
+        self.assertEqual([r['n'] for r in dedupe(records, 'city')], [0, 1, 3, 6])
+        self.assertEqual([r['n'] for r in dedupe(records, lambda r: r['city'], keep='last')], [4, 5, 6, 7])
+
+    def test_spill(self):
+        names = self.names * 3 + [u'Luzern', u'LUZERN', u'Lugano']
+        for max_keys in [1, 2, 3]:
+            for partitions in [1, 3]:
+                self.assertEqual(list(dedupe(names, max_keys=max_keys, partitions=partitions)),
+                    list(dedupe(names)))
+                self.assertEqual(list(dedupe(names, keep='last', max_keys=max_keys, partitions=partitions)),
+                    list(dedupe(names, keep='last')))
+        self.assertEqual(list(dedupe(names, max_keys=2)),
+            [u'Zürich', u'Bern', u'Genève', u'Basel', u'Luzern', u'Lugano'])
+        for max_keys in [0, -1]:
+            with self.assertRaises(ValueError):
+                dedupe(names, max_keys=max_keys)
+
+    def test_many_keys(self):
+        records = [(u'key%d' % (i % 1500), i) for i in range(3000)]
+        with file_limit(max_open_runs=3):
+            self.assertEqual([i for _, i in dedupe(records, 0, max_keys=5, partitions=2)],
+                list(range(1500)))
+            self.assertEqual([i for _, i in dedupe(records, 0, keep='last', max_keys=5, partitions=4)],
+                list(range(1500, 3000)))
+
+class TestExternalSort(unittest.TestCase):
+    def setUp(self):
+        self.names = [u'Zürich', u'Bern', u'ZURICH', u'Genève', u'bern', u'zurich', u'Basel', u'geneve', u'Aarau']
+
+    def test_sort(self):
+        expected = [u'Aarau', u'Basel', u'Bern', u'bern', u'Genève', u'geneve', u'Zürich', u'ZURICH', u'zurich']
+        self.assertEqual(list(external_sort(self.names)), expected)
+        for max_records in [1, 2, 4]:
+            self.assertEqual(list(external_sort(self.names, max_records=max_records)), expected)
+        self.assertEqual(list(external_sort([])), [])
+        with self.assertRaises(ValueError):
+            external_sort(self.names, max_records=0)
+
+    def test_collation(self):
+        self.assertEqual(list(external_sort(self.names, comparison_level=3)),
+            sorted(self.names, key=self.sort_key(comparison_level=3)))
+        self.assertEqual(list(external_sort(self.names, max_records=2, case_sensitive=True)),
+            sorted(self.names, key=self.sort_key(case_sensitive=True)))
+
+    def sort_key(self, **kwargs):
+        factory = UnicodeStrFactory(kwargs.get('locale', 'en_US'),
+            kwargs.get('comparison_level', 0), kwargs.get('case_sensitive', False))
+        return lambda name: factory(name).sort_key()
+
+    def test_records(self):
+        records = [{'city': name, 'n': i} for i, name in enumerate(self.names)]
+        expected = [r['n'] for r in external_sort(records, 'city')]
+        self.assertEqual(expected, [8, 6, 1, 4, 3, 7, 0, 2, 5])
+        self.assertEqual([r['n'] for r in external_sort(records, 'city', max_records=2)], expected)
+        self.assertEqual([r[1] for r in external_sort(list(zip(self.names, range(9))), 0, max_records=3)],
+            expected)
+
+    def test_many_runs(self):
+        records = [(u'name%d' % (i % 700), i) for i in range(3000)]
+        expected = list(external_sort(records, 0))
+        with file_limit():
+            self.assertEqual(list(external_sort(records, 0, max_records=10)), expected)
+        with file_limit(max_open_runs=3):
+            self.assertEqual(list(external_sort(records, 0, max_records=10)), expected)
+            self.assertEqual(list(external_sort(records, 0, max_records=7)), expected)
+
+    def test_processes(self):
+        expected = list(external_sort(self.names))
+        self.assertEqual(list(external_sort(self.names, max_records=2, processes=2)), expected)
+        records = [(name, i) for i, name in enumerate(self.names)]
+        self.assertEqual([r[0] for r in external_sort(records, 0, max_records=3, processes=2)], expected)
+
+### MAIN ###
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import unittest
+from unicode_col3 import unicode_lru_cache, unicode_lru_cached
+
+class fake_timer(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+class TestUnicodeLruCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = unicode_lru_cache(3)
+
+    def test_collation(self):
+        self.cache['Zürich'] = 1
+        self.assertEqual(self.cache['zurich'], 1)
+        self.assertEqual(self.cache['ZURICH'], 1)
+        self.cache['zurich'] = 2
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(list(self.cache), ['zurich'])
+        cache = unicode_lru_cache(comparison_level=3)
+        cache['Zürich'] = 1
+        self.assertNotIn('Zurich', cache)
+
+    def test_eviction(self):
+        for i, key in enumerate(['a', 'b', 'c']):
+            self.cache[key] = i
+        self.assertEqual(self.cache['A'], 0)
+        self.cache['d'] = 3
+        self.assertEqual(list(self.cache), ['c', 'a', 'd'])
+        self.assertNotIn('b', self.cache)
+        self.assertEqual(self.cache.get('b'), None)
+        info = self.cache.cache_info()
+        self.assertEqual((info.hits, info.misses, info.evictions, info.currsize), (1, 1, 1, 3))
+        self.assertEqual(self.cache.hit_rate, 0.5)
+        del self.cache['C']
+        self.assertEqual(len(self.cache), 2)
+        with self.assertRaises(KeyError):
+            del self.cache['c']
+
+    def test_ttl(self):
+        timer = fake_timer()
+        cache = unicode_lru_cache(None, ttl=10, timer=timer)
+        cache['a'] = 1
+        timer.now = 5
+        cache['b'] = 2
+        self.assertEqual(cache['a'], 1)
+        timer.now = 10
+        self.assertNotIn('a', cache)
+        with self.assertRaises(KeyError):
+            cache['a']
+        self.assertEqual(cache['b'], 2)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(list(cache), ['b'])
+        info = cache.cache_info()
+        self.assertEqual(list(cache.items()), [('b', 2)])
+        self.assertEqual(list(cache.values()), [2])
+        self.assertEqual(cache.cache_info()[:3], info[:3])
+        timer.now = 20
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(list(cache.items()), [])
+        cache.expire()
+        self.assertEqual(len(cache), 0)
+
+    def test_items(self):
+        self.cache['a'] = 1
+        self.cache['b'] = 2
+        self.assertEqual(list(self.cache.items()), [('a', 1), ('b', 2)])
+        self.assertEqual(list(self.cache.keys()), ['a', 'b'])
+        self.assertEqual(self.cache.cache_info().hits, 0)
+        # Reading the items doesn't change the order of eviction
+        self.cache['A']
+        self.assertEqual(list(self.cache.keys()), ['b', 'a'])
+
+    def test_expire_order(self):
+        timer = fake_timer()
+        cache = unicode_lru_cache(2, ttl=10, timer=timer)
+        cache['a'] = 1
+        timer.now = 5
+        cache['b'] = 2
+        timer.now = 8
+        cache['A'] = 3
+        cache['c'] = 4
+        self.assertEqual(list(cache.keys()), ['A', 'c'])
+        timer.now = 17
+        self.assertEqual(len(cache), 2)
+        timer.now = 18
+        self.assertEqual(len(cache), 0)
+        cache['d'] = 5
+        del cache['d']
+        timer.now = 30
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.currbytes, 0)
+
+    def test_maxbytes(self):
+        cache = unicode_lru_cache(None, maxbytes=10, sizeof=len)
+        cache['a'] = 'xxxx'
+        cache['b'] = 'yyyy'
+        self.assertEqual(cache.currbytes, 8)
+        cache['c'] = 'zzzz'
+        self.assertEqual(list(cache), ['b', 'c'])
+        cache['b'] = 'y'
+        self.assertEqual(cache.currbytes, 5)
+        cache['d'] = 'w' * 20
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.currbytes, 0)
+
+    def test_decorator(self):
+        calls = []
+        @unicode_lru_cached(maxsize=2)
+        def lookup(name, suffix=''):
+            calls.append(name)
+            return name.upper() + suffix
+        self.assertEqual(lookup('Zürich'), 'ZÜRICH')
+        self.assertEqual(lookup('zurich'), 'ZÜRICH')
+        self.assertEqual(lookup('zurich', suffix='!'), 'ZURICH!')
+        self.assertEqual(lookup('ZURICH', suffix='!'), 'ZURICH!')
+        self.assertEqual(calls, ['Zürich', 'zurich'])
+        self.assertEqual(lookup.cache.cache_info().hits, 2)
+        self.assertEqual(lookup.__name__, 'lookup')
+
+### MAIN ###
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import threading
+import unittest
+from unicode_col3 import concurrent_unicode_dict, unicode_dict
+
+class TestConcurrentUnicodeDict(unittest.TestCase):
+    def setUp(self):
+        self.data = concurrent_unicode_dict({'ábc':1, 'd':2}, shards=4)
+
+    def test_dict(self):
+        self.assertEqual(self.data.shards, 4)
+        self.assertEqual(len(self.data), 2)
+        self.assertEqual(self.data['ABC'], 1)
+        self.assertIn('D', self.data)
+        self.assertEqual(self.data.get('e'), None)
+        self.data['abc'] = 3
+        self.assertEqual(len(self.data), 2)
+        self.assertEqual(set(self.data), set(['abc', 'd']))
+        del self.data['D']
+        self.assertNotIn('d', self.data)
+        with self.assertRaises(KeyError):
+            self.data['d']
+        with self.assertRaises(KeyError):
+            del self.data['d']
+
+    def test_collations(self):
+        data = concurrent_unicode_dict({'ábc':1, 'abc':2}, comparison_level=3)
+        self.assertEqual(len(data), 2)
+        self.assertEqual(data.comparison_level, 3)
+        data = concurrent_unicode_dict(unicode_dict({'ábc':1}, case_sensitive=True))
+        self.assertTrue(data.case_sensitive)
+        self.assertNotIn('ÁBC', data)
+
+    def test_atomic_operations(self):
+        self.assertEqual(self.data.setdefault('ABC', 5), 1)
+        self.assertEqual(self.data.setdefault('e', 5), 5)
+        self.assertEqual(self.data.compute_if_absent('E', lambda k: 6), 5)
+        self.assertEqual(self.data.compute_if_absent('f', len), 1)
+        self.assertEqual(self.data.pop('F'), 1)
+        self.assertEqual(self.data.pop('f', 7), 7)
+        with self.assertRaises(KeyError):
+            self.data.pop('f')
+        self.data.update([('g', 1), ('ABC', 2)], h=3)
+        self.assertEqual(self.data['abc'], 2)
+        self.assertEqual(self.data['H'], 3)
+        self.assertEqual(len(self.data), 5)
+
+    def test_snapshot(self):
+        test = self.data.to_unicode_dict()
+        self.assertEqual(test, unicode_dict({'ábc':1, 'd':2}))
+        test = self.data.copy()
+        test['e'] = 3
+        self.assertNotIn('e', self.data)
+        self.assertEqual(dict(iter(self.data.items())), {'ábc':1, 'd':2})
+        self.assertEqual(sorted(self.data.values()), [1, 2])
+        items = []
+        for item in list(self.data.items()):
+            self.data.clear()
+            items.append(item)
+        self.assertEqual(dict(items), {'ábc':1, 'd':2})
+        self.assertEqual(len(self.data), 0)
+        with self.assertRaises(KeyError):
+            self.data.popitem()
+
+    def test_update_stored(self):
+        self.data.update(unicode_dict({'ABC':3, 'e':4}))
+        self.assertEqual(self.data.to_unicode_dict(), unicode_dict({'ABC':3, 'd':2, 'e':4}))
+        test = concurrent_unicode_dict(shards=2)
+        test.update(self.data)
+        self.assertEqual(test.to_unicode_dict(), self.data.to_unicode_dict())
+        self.assertEqual(test['abc'], 3)
+        test = concurrent_unicode_dict(comparison_level=3)
+        test.update(self.data)
+        self.assertNotIn('abc', test)
+        self.assertEqual(test['ABC'], 3)
+
+    def test_threads(self):
+        data = concurrent_unicode_dict(shards=4)
+        def worker(n):
+            for i in range(200):
+                key = 'key%d' % (i % 50)
+                data.compute_if_absent(key, lambda k: [])
+                data[key].append(n)
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(data), 50)
+        self.assertEqual(sum(len(v) for _,v in data.items()), 800)
+
+    def test_pickling(self):
+        import pickle
+        test = pickle.loads(pickle.dumps(self.data))
+        self.assertEqual(test.shards, 4)
+        self.assertEqual(test.to_unicode_dict(), self.data.to_unicode_dict())
+
+### MAIN ###
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import unittest
+from unicode_col3 import unicode_prefix_index, unicode_multilevel_index, unicode_dict, unicode_set
+
+class TestUnicodePrefixIndex(unittest.TestCase):
+    def setUp(self):
+        self.names = ['Müller', 'Neumann', 'mutter', 'Abel', 'Mueller', 'nebel', 'Mu']
+        self.index = unicode_prefix_index(self.names)
+
+    def test_prefix(self):
+        self.assertEqual(list(self.index.iprefix('mu')), ['Mu', 'Mueller', 'Müller', 'mutter'])
+        self.assertEqual(list(self.index.iprefix('MÜL')), ['Müller'])
+        self.assertEqual(list(self.index.iprefix('ne')), ['nebel', 'Neumann'])
+        self.assertEqual(list(self.index.iprefix('x')), [])
+        self.assertEqual(len(list(self.index.iprefix(''))), 7)
+
+    def test_limit(self):
+        self.assertEqual(list(self.index.iprefix('mu', limit=2)), ['Mu', 'Mueller'])
+        self.assertEqual(list(self.index.iprefix('mu', limit=0)), [])
+
+    def test_comparison_level(self):
+        index = unicode_prefix_index(self.names, comparison_level=3)
+        self.assertEqual(list(index.iprefix('Mu')), ['Mu', 'Mueller'])
+        self.assertEqual(list(index.iprefix('Mü')), ['Müller'])
+
+        index = unicode_prefix_index(self.names, case_sensitive=True)
+        self.assertEqual(list(index.iprefix('mu')), ['mutter'])
+
+    def test_containers(self):
+        index = unicode_prefix_index(unicode_set(self.names, comparison_level=3))
+        self.assertEqual(index.comparison_level, 3)
+        self.assertEqual(list(index.iprefix('Mü')), ['Müller'])
+
+        index = unicode_prefix_index(unicode_dict((n, 1) for n in self.names))
+        self.assertEqual(index.comparison_level, 0)
+        self.assertEqual(list(index.iprefix('mü')), ['Mu', 'Mueller', 'Müller', 'mutter'])
+
+    def test_update(self):
+        self.index.add('Mustermann')
+        self.index.add('muller')
+        self.index.discard('Mueller')
+        self.index.discard('Zed')
+        self.assertEqual(len(self.index), 7)
+        self.assertIn('MUSTERMANN', self.index)
+        self.assertNotIn('Mueller', self.index)
+        self.assertEqual(list(self.index.iprefix('mu')), ['Mu', 'muller', 'Mustermann', 'mutter'])
+
+    def test_pickling(self):
+        import pickle
+        index = pickle.loads(pickle.dumps(self.index))
+        self.assertEqual(list(index), list(self.index))
+        self.assertEqual(list(index.iprefix('mu')), list(self.index.iprefix('mu')))
+
+class TestUnicodeMultilevelIndex(unittest.TestCase):
+    def setUp(self):
+        self.names = ['Muller', 'Müller', 'muller', 'MÜLLER', 'Mueller', 'Neumann']
+        self.index = unicode_multilevel_index(self.names)
+
+    def test_lookup(self):
+        self.assertEqual(len(self.index), 6)
+        self.assertEqual(self.index.comparison_level, 2)
+        self.assertEqual(self.index.lookup('Müller'), ['Müller'])
+        self.assertEqual(self.index.lookup('Müller', 1), ['Müller', 'MÜLLER'])
+        self.assertEqual(set(self.index.lookup('Müller', 0)), set(['Muller', 'Müller', 'muller', 'MÜLLER']))
+        self.assertEqual(self.index.lookup('neumann', 2), [])
+        self.assertEqual(self.index.lookup('neumann', 0), ['Neumann'])
+        self.assertTrue(self.index.contains('MULLER', 0))
+        self.assertFalse(self.index.contains('MULLER'))
+        self.assertIn('Mueller', self.index)
+        with self.assertRaises(ValueError):
+            self.index.lookup('Müller', 3)
+        with self.assertRaises(ValueError):
+            unicode_multilevel_index(self.names, case_sensitive=True)
+        self.assertEqual(len(unicode_multilevel_index(self.names, case_sensitive=False)), 6)
+
+    def test_update(self):
+        self.index.add('Mülller')
+        self.index.discard('Muller')
+        self.index.discard('muller')
+        self.assertEqual(len(self.index), 5)
+        self.assertEqual(set(self.index.lookup('muller', 0)), set(['Müller', 'MÜLLER']))
+
+    def test_pickling(self):
+        import pickle
+        index = pickle.loads(pickle.dumps(self.index))
+        self.assertEqual(list(index), list(self.index))
+        self.assertEqual(index.lookup('Müller', 1), self.index.lookup('Müller', 1))
+
+### MAIN ###
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import io
+import mmap
+import os
+import shutil
+import tempfile
+import unittest
+from unicode_col3 import unicode_dict, unicode_set, sorted_unicode_set, mmap_unicode_dict, write_mmap_dict
+from unicode_col3 import unicode_data_writer, unicode_data_reader
+from unicode_col3 import dump_unicode_data, dumps_unicode_data, load_unicode_data, loads_unicode_data
+
+class TestMmapUnicodeDict(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'names.ucol')
+        self.data = unicode_dict({'Müller':1, 'Neumann':[2, 3], 'Abel':{'a':4}, 'Mueller':None})
+        write_mmap_dict(self.data, self.path)
+        self.mapped = mmap_unicode_dict(self.path)
+
+    def tearDown(self):
+        self.mapped.close()
+        shutil.rmtree(self.dir)
+
+    def test_lookup(self):
+        self.assertEqual(len(self.mapped), 4)
+        self.assertEqual(self.mapped['muller'], 1)
+        self.assertEqual(self.mapped['NEUMANN'], [2, 3])
+        self.assertEqual(self.mapped['abel'], {'a':4})
+        self.assertEqual(self.mapped['Mueller'], None)
+        self.assertIn('Mueller', self.mapped)
+        self.assertNotIn('Muller ', self.mapped)
+        self.assertNotIn(1, self.mapped)
+        self.assertEqual(self.mapped.get('Zed', 5), 5)
+        with self.assertRaises(KeyError):
+            self.mapped['Zed']
+
+    def test_collation(self):
+        self.assertEqual(self.mapped.locale, self.data.locale)
+        self.assertEqual(self.mapped.comparison_level, 0)
+        self.assertFalse(self.mapped.case_sensitive)
+
+        path = os.path.join(self.dir, 'level3.ucol')
+        write_mmap_dict({'Müller':1}, path, comparison_level=3)
+        with mmap_unicode_dict(path) as mapped:
+            self.assertEqual(mapped.comparison_level, 3)
+            self.assertIn('Müller', mapped)
+            self.assertNotIn('muller', mapped)
+
+    def test_order(self):
+        self.assertEqual(list(self.mapped), ['Abel', 'Mueller', 'Müller', 'Neumann'])
+        self.assertEqual(list(self.mapped.irange('mu', 'ne')), ['Mueller', 'Müller'])
+        self.assertEqual(list(self.mapped.irange('muller', None, (False, True))), ['Neumann'])
+        self.assertEqual(list(self.mapped.irange(maximum='Mueller', reverse=True)), ['Mueller', 'Abel'])
+        self.assertEqual(dict(iter(self.mapped.items())), dict(iter(self.data.items())))
+
+    def test_empty(self):
+        path = os.path.join(self.dir, 'empty.ucol')
+        write_mmap_dict(unicode_dict(), path)
+        with mmap_unicode_dict(path) as mapped:
+            self.assertEqual(len(mapped), 0)
+            self.assertNotIn('abc', mapped)
+            self.assertEqual(list(mapped), [])
+
+    def test_pickling(self):
+        import pickle
+        mapped = pickle.loads(pickle.dumps(self.mapped))
+        try:
+            self.assertEqual(mapped['muller'], 1)
+        finally:
+            mapped.close()
+
+class TestUnicodeData(unittest.TestCase):
+    def setUp(self):
+        self.set = unicode_set(['Müller', 'Neumann', 'Abel', 'Mueller', 'muller'], comparison_level=1)
+        self.dict = unicode_dict({'Müller':1, 'Neumann':[2, 3], 'Abel':{'a':4}, 'Mueller':None})
+
+    def test_set(self):
+        data = dumps_unicode_data(self.set)
+        test = loads_unicode_data(data)
+        self.assertIsInstance(test, unicode_set)
+        self.assertEqual(test, self.set)
+        self.assertEqual(sorted(test), sorted(self.set))
+        self.assertEqual(test.comparison_level, 1)
+        self.assertIn('MULLER', test)
+        test = load_unicode_data(io.BytesIO(data))
+        self.assertEqual(test, self.set)
+        self.assertEqual(loads_unicode_data(bytearray(data)), self.set)
+        self.assertEqual(sorted(loads_unicode_data(memoryview(data))), sorted(self.set))
+        self.assertEqual(sorted(test.iter_sort_keys()), sorted(self.set.iter_sort_keys()))
+
+    def test_dict(self):
+        fp = io.BytesIO()
+        dump_unicode_data(self.dict, fp)
+        for test in [loads_unicode_data(fp.getvalue()), loads_unicode_data(bytearray(fp.getvalue())),
+                load_unicode_data(io.BytesIO(fp.getvalue()))]:
+            self.assertIsInstance(test, unicode_dict)
+            self.assertEqual(test, self.dict)
+            self.assertEqual(test['NEUMANN'], [2, 3])
+        test = loads_unicode_data(dumps_unicode_data(unicode_dict()))
+        self.assertEqual(len(test), 0)
+        with self.assertRaises(TypeError):
+            dumps_unicode_data({'Abel':1})
+        with self.assertRaises(TypeError):
+            dumps_unicode_data(unicode_set(self.set, keys_only=True))
+
+    def test_sorted(self):
+        data = sorted_unicode_set(self.set)
+        data.discard('Abel')
+        test = loads_unicode_data(dumps_unicode_data(data))
+        self.assertEqual(test, data)
+
+    def test_stream(self):
+        fp = io.BytesIO()
+        writer = unicode_data_writer(fp, True, comparison_level=3)
+        writer.write('Müller', 1)
+        writer.write('muller', 2)
+        reader = unicode_data_reader(io.BytesIO(fp.getvalue()))
+        self.assertEqual(reader.comparison_level, 3)
+        self.assertTrue(reader.values)
+        records = list(reader)
+        self.assertEqual([(k, v) for _, k, v in records], [('Müller', 1), ('muller', 2)])
+        self.assertEqual(records[0][0], writer.sort_key('Müller'))
+        test = unicode_data_reader(io.BytesIO(fp.getvalue())).load()
+        self.assertEqual(test.comparison_level, 3)
+        self.assertEqual(len(test), 2)
+
+    def test_errors(self):
+        data = dumps_unicode_data(self.dict)
+        with self.assertRaises(ValueError):
+            loads_unicode_data(b'X' + data[1:])
+        with self.assertRaises(ValueError):
+            loads_unicode_data(data[:-1])
+        with self.assertRaises(ValueError):
+            load_unicode_data(io.BytesIO(data[:-1]))
+
+    def test_mmap(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'names.ucol')
+            with open(path, 'wb') as fp:
+                dump_unicode_data(self.dict, fp)
+            with open(path, 'rb') as fp:
+                mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+                test = loads_unicode_data(mapped)
+                mapped.close()
+            self.assertEqual(test, self.dict)
+        finally:
+            shutil.rmtree(tmpdir)
+
+### MAIN ###
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,217 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import unittest
+from unicode_col3 import sorted_unicode_dict, sorted_unicode_set, unicode_set
+from unicode_col3.unicode_sorted import _sorted_key_list
+
+class small_key_list(_sorted_key_list):
+    _load = 2
+
+class TestSortedKeyList(unittest.TestCase):
+    def test_chunks(self):
+        keys = small_key_list()
+        for i in [5, 3, 9, 1, 7, 2, 8, 6, 4, 0]:
+            keys.add(i)
+        self.assertEqual(list(keys), list(range(10)))
+        self.assertEqual(list(reversed(keys)), list(range(9, -1, -1)))
+        self.assertEqual(len(keys), 10)
+        self.assertEqual(keys[0], 0)
+        self.assertEqual(keys[-1], 9)
+        self.assertEqual(keys[3:6], [3, 4, 5])
+        self.assertEqual(keys.bisect_left(4), 4)
+        self.assertEqual(keys.bisect_right(4), 5)
+        self.assertEqual(list(keys.irange(3, 6)), [3, 4, 5, 6])
+        self.assertEqual(list(keys.irange(3, 6, (False, False))), [4, 5])
+        self.assertEqual(list(keys.irange(3, 6, reverse=True)), [6, 5, 4, 3])
+
+        keys.remove(4)
+        keys.remove(0)
+        self.assertEqual(list(keys), [1, 2, 3, 5, 6, 7, 8, 9])
+        self.assertEqual(keys[3], 5)
+        with self.assertRaises(ValueError):
+            keys.remove(4)
+
+class TestSortedUnicodeDict(unittest.TestCase):
+    def setUp(self):
+        self.names = ['Müller', 'Neumann', 'Abel', 'Mueller', 'nebel', 'Zoë', 'muller']
+        self.data = sorted_unicode_dict((n, i) for i, n in enumerate(self.names))
+
+    def test_len(self):
+        # Müller and muller are the same key at comparison level 0,
+        # the last one inserted is kept
+        self.assertEqual(len(self.data), 6)
+        self.assertIn('muller', list(self.data.keys()))
+        self.assertEqual(self.data['MULLER'], 6)
+
+    def test_order(self):
+        self.assertEqual(list(self.data.keys()),
+            ['Abel', 'Mueller', 'muller', 'nebel', 'Neumann', 'Zoë'])
+        self.assertEqual(list(self.data.values()), [2, 3, 6, 4, 1, 5])
+        self.assertEqual(list(self.data.items())[0], ('Abel', 2))
+        self.assertEqual(list(reversed(self.data))[0], 'Zoë')
+
+    def test_irange(self):
+        self.assertEqual(list(self.data.irange('Mü', 'Ne')), ['Mueller', 'muller'])
+        self.assertEqual(list(self.data.irange('Muller', None, (False, True))), ['nebel', 'Neumann', 'Zoë'])
+        self.assertEqual(list(self.data.irange(maximum='Mueller', reverse=True)), ['Mueller', 'Abel'])
+
+    def test_bisect(self):
+        self.assertEqual(self.data.bisect_left('muller'), 2)
+        self.assertEqual(self.data.bisect_right('muller'), 3)
+        self.assertEqual(self.data.index('Zoe'), 5)
+        with self.assertRaises(KeyError):
+            self.data.index('Zed')
+
+    def test_peekitem(self):
+        self.assertEqual(self.data.peekitem(0), ('Abel', 2))
+        self.assertEqual(self.data.peekitem(), ('Zoë', 5))
+        self.assertEqual(self.data.first(), 'Abel')
+        self.assertEqual(self.data.last(), 'Zoë')
+        with self.assertRaises(IndexError):
+            self.data.peekitem(6)
+
+    def test_delete(self):
+        del self.data['muller']
+        self.assertEqual(len(self.data), 5)
+        self.assertNotIn('Müller', self.data)
+        self.assertEqual(self.data.popitem(), ('Zoë', 5))
+        self.assertEqual(self.data.pop('abel'), 2)
+        self.assertEqual(list(self.data.keys()), ['Mueller', 'nebel', 'Neumann'])
+        with self.assertRaises(KeyError):
+            del self.data['Abel']
+        self.data.clear()
+        self.assertEqual(list(self.data), [])
+        with self.assertRaises(KeyError):
+            self.data.popitem()
+
+    def test_copy(self):
+        test = self.data.copy()
+        self.assertEqual(test, self.data)
+        self.assertEqual(list(test.keys()), list(self.data.keys()))
+        test['Bach'] = 7
+        self.assertEqual(test.index('bach'), 1)
+        self.assertNotIn('Bach', self.data)
+
+    def test_update(self):
+        self.data.update(sorted_unicode_dict([('Bach', 7), ('ABEL', 8)]))
+        self.data.update([('Zed', 9)], Aaron=10)
+        self.assertEqual(list(self.data.keys()),
+            ['Aaron', 'ABEL', 'Bach', 'Mueller', 'muller', 'nebel', 'Neumann', 'Zed', 'Zoë'])
+        test = self.data | {'Ada': 11}
+        self.assertEqual(test.index('ada'), 2)
+        self.assertNotIn('Ada', self.data)
+
+    def test_from_items(self):
+        test = sorted_unicode_dict.from_items((n, i) for i, n in enumerate(self.names))
+        self.assertEqual(list(test.keys()), list(self.data.keys()))
+        test = sorted_unicode_dict.fromkeys(self.names, comparison_level=3)
+        self.assertEqual(len(test), 7)
+        self.assertEqual(test.peekitem(0), ('Abel', None))
+
+    def test_pickling(self):
+        import pickle
+        test = pickle.loads(pickle.dumps(self.data))
+        self.assertEqual(test, self.data)
+        self.assertEqual(list(test.keys()), list(self.data.keys()))
+        test['Bach'] = 7
+        self.assertEqual(test.index('bach'), 1)
+
+class TestSortedUnicodeSet(unittest.TestCase):
+    def setUp(self):
+        self.names = ['Müller', 'Neumann', 'Abel', 'Mueller', 'nebel', 'Zoë', 'muller']
+        self.data = sorted_unicode_set(self.names)
+
+    def test_order(self):
+        self.assertEqual(len(self.data), 6)
+        self.assertEqual(list(self.data),
+            ['Abel', 'Mueller', 'muller', 'nebel', 'Neumann', 'Zoë'])
+        self.assertEqual(list(reversed(self.data))[0], 'Zoë')
+        self.assertEqual(self.data, unicode_set(self.names))
+
+    def test_positions(self):
+        self.assertEqual(self.data[0], 'Abel')
+        self.assertEqual(self.data[-1], 'Zoë')
+        self.assertEqual(self.data[1:3], ['Mueller', 'muller'])
+        self.assertEqual(self.data.index('MÜLLER'), 2)
+        self.assertEqual(self.data.bisect_left('muller'), 2)
+        self.assertEqual(self.data.bisect_right('muller'), 3)
+        self.assertEqual(self.data.first(), 'Abel')
+        self.assertEqual(self.data.last(), 'Zoë')
+        with self.assertRaises(KeyError):
+            self.data.index('Zed')
+        with self.assertRaises(IndexError):
+            self.data[6]
+
+    def test_neighbors(self):
+        self.assertEqual(self.data.successor('muller'), 'nebel')
+        self.assertEqual(self.data.successor('Bach'), 'Mueller')
+        self.assertEqual(self.data.predecessor('muller'), 'Mueller')
+        self.assertEqual(self.data.predecessor('Bach'), 'Abel')
+        with self.assertRaises(KeyError):
+            self.data.successor('Zoe')
+        with self.assertRaises(KeyError):
+            self.data.predecessor('Abel')
+
+    def test_irange(self):
+        self.assertEqual(list(self.data.irange('Mü', 'Ne')), ['Mueller', 'muller'])
+        self.assertEqual(list(self.data.irange('Muller', None, (False, True))), ['nebel', 'Neumann', 'Zoë'])
+        self.assertEqual(list(self.data.irange(maximum='Mueller', reverse=True)), ['Mueller', 'Abel'])
+        self.assertEqual(list(self.data.islice(1, 3)), ['Mueller', 'muller'])
+
+    def test_changes(self):
+        self.data.add('Bach')
+        self.assertEqual(self.data.index('bach'), 1)
+        self.data.remove('MULLER')
+        self.assertNotIn('muller', self.data)
+        self.data.discard('Zed')
+        self.assertEqual(self.data.pop(), 'Zoë')
+        self.assertEqual(self.data.pop(0), 'Abel')
+        self.assertEqual(list(self.data), ['Bach', 'Mueller', 'nebel', 'Neumann'])
+        self.data.update(['Ada', 'Zed'])
+        self.assertEqual(list(self.data), ['Ada', 'Bach', 'Mueller', 'nebel', 'Neumann', 'Zed'])
+        self.data -= ['bach', 'zed']
+        self.assertEqual(list(self.data), ['Ada', 'Mueller', 'nebel', 'Neumann'])
+        self.data &= ['ada', 'NEBEL', 'Zoë']
+        self.assertEqual(list(self.data), ['Ada', 'nebel'])
+        self.data ^= ['Ada', 'Abel']
+        self.assertEqual(list(self.data), ['Abel', 'nebel'])
+        self.data.clear()
+        self.assertEqual(list(self.data), [])
+        with self.assertRaises(KeyError):
+            self.data.pop()
+
+    def test_operations(self):
+        test = self.data | ['Bach']
+        self.assertIsInstance(test, sorted_unicode_set)
+        self.assertEqual(test.index('bach'), 1)
+        self.assertNotIn('Bach', self.data)
+        test = ['Bach', 'Abel'] - self.data
+        self.assertIsInstance(test, sorted_unicode_set)
+        self.assertEqual(list(test), ['Bach'])
+        test = self.data.copy()
+        test.add('Aaron')
+        self.assertEqual(test[0], 'Aaron')
+        self.assertEqual(self.data[0], 'Abel')
+
+    def test_pickling(self):
+        import pickle
+        test = pickle.loads(pickle.dumps(self.data))
+        self.assertEqual(test, self.data)
+        self.assertEqual(list(test), list(self.data))
+
+    def test_keys_only(self):
+        import pickle
+        data = sorted_unicode_set(self.names, keys_only=True)
+        self.assertEqual(data, self.data)
+        self.assertEqual(list(data), list(data.iter_sort_keys()))
+        data.add('Bach')
+        self.assertEqual(data.index('bach'), 1)
+        self.assertEqual(data.pop(0), data.sort_key('Abel'))
+        self.assertEqual(data.successor('Bach'), data.sort_key('Mueller'))
+        test = pickle.loads(pickle.dumps(data))
+        self.assertTrue(test.keys_only)
+        self.assertEqual(test, data)
+
+### MAIN ###
+if __name__ == '__main__':
+    unittest.main()
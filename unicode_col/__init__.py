@@ -1,6 +1,13 @@
-from .unicode_dict import unicode_dict, unicode_defaultdict
+from .unicode_dict import unicode_dict, unicode_defaultdict, unicode_frozendict, unicode_counter
 from .unicode_str  import UnicodeStrFactory
-from .unicode_set  import unicode_set
+from .unicode_set  import unicode_set, unicode_frozenset
+from .unicode_sorted import sorted_unicode_dict, sorted_unicode_set
+from .unicode_index import unicode_prefix_index, unicode_multilevel_index
+from .unicode_io import mmap_unicode_dict, write_mmap_dict, unicode_data_writer, unicode_data_reader, dump_unicode_data, dumps_unicode_data, load_unicode_data, loads_unicode_data
+from .unicode_concurrent import concurrent_unicode_dict
+from .unicode_cache import unicode_lru_cache, unicode_lru_cached
+from .unicode_bloom import unicode_bloom_filter
+from .unicode_stream import group_by, dedupe, external_sort, reducer, list_reducer, count_reducer, sum_reducer, first_reducer
 
 utf8_unicode_ci = UnicodeStrFactory(locale="en_US", comparison_level=0, case_sensitive=False)
 utf8_unicode_cs = UnicodeStrFactory(locale="en_US", comparison_level=0, case_sensitive=True)
\ No newline at end of file
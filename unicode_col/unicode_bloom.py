@@ -0,0 +1,201 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+from icu import Collator, Locale, UCollAttribute, UCollAttributeValue, ICU_VERSION
+import hashlib
+import math
+import struct
+
+##
+# unicode_bloom_filter serialization format (little endian):
+#   header: magic, version, comparison_level, case_sensitive, number of hashes,
+#           number of bits, elements added, length of the metadata
+#   metadata: locale and icu version, utf8, separated by \n
+#   bits: the bit array
+_BLOOM_MAGIC = b'UCOLBLOM'
+_BLOOM_VERSION = 3
+_BLOOM_HEADER = struct.Struct('<8sHBBBQQH')
+_BLOOM_HASH = struct.Struct('<QQ')
+# The items of a memoryview are ints only in python 3
+_VIEW_BYTES = isinstance(memoryview(b'\0')[0], int)
+
+class unicode_bloom_filter(object):
+    '''Compact probabilistic set of strings, compared with the collation.
+    A string that was added is always found, a string that wasn't is found
+    with probability error_rate. The filter stores a few bits for each string
+    instead of the string and its collation key, so it can answer the misses of
+    a huge set from a fraction of the memory, and it can be serialized
+    (to_bytes) and loaded by other processes (from_bytes).
+    '''
+
+    def __init__(self, capacity, error_rate=0.01, **kwargs):
+        '''Initialize an empty filter sized for capacity strings with the given
+        false positive rate. The number of bits is rounded up to a power of 2.
+        The kwargs set the comparison details.
+        '''
+        if capacity < 1:
+            raise ValueError('capacity must be at least 1')
+        if not 0 < error_rate < 1:
+            raise ValueError('error_rate must be between 0 and 1')
+        bits = int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        bits = 1 << (bits - 1).bit_length()
+        hashes = max(1, int(round(float(bits) / capacity * math.log(2))))
+        self.__init(bits, hashes, 0, bytearray((bits + 7) // 8), **kwargs)
+
+    def __init(self, bits, hashes, count, data, locale='en_US', comparison_level=0, case_sensitive=False):
+        self.__locale = Locale(locale)
+        self.__collator = Collator.createInstance(self.__locale)
+        self.__collator.setStrength(max(0,min(3,comparison_level)))
+        self.__collator.setAttribute(UCollAttribute.CASE_LEVEL,
+            UCollAttributeValue.ON if case_sensitive else UCollAttributeValue.OFF)
+        self.__bits = bits
+        self.__hashes = hashes
+        self.__count = count
+        self.__data = data
+        self.__shared = not isinstance(data, bytearray) # data is a view of a buffer
+
+    @classmethod
+    def from_set(cls, data, error_rate=0.01):
+        '''Build a filter with the elements of a unicode_set (or the keys of a
+        unicode_dict), reusing the collation keys already stored.
+        '''
+        ret = cls(max(1, len(data)), error_rate,
+            locale = data.locale,
+            comparison_level = data.comparison_level,
+            case_sensitive = data.case_sensitive)
+        add = ret.__add
+        for sort_key in data.iter_sort_keys():
+            add(sort_key)
+        return ret
+
+    @property
+    def locale(self):
+        return self.__locale.getName()
+
+    @property
+    def comparison_level(self):
+        return self.__collator.getStrength()
+
+    @property
+    def case_sensitive(self):
+        return self.__collator.getAttribute(UCollAttribute.CASE_LEVEL) == UCollAttributeValue.ON
+
+    @property
+    def bits(self):
+        return self.__bits
+
+    @property
+    def hashes(self):
+        return self.__hashes
+
+    @property
+    def count(self):
+        '''Number of strings added (the strings added twice are counted twice)
+        '''
+        return self.__count
+
+    @property
+    def error_rate(self):
+        '''Expected false positive rate for the strings added so far
+        '''
+        return (1 - math.exp(-float(self.__hashes) * self.__count / self.__bits)) ** self.__hashes
+
+    def sort_key(self, val):
+        '''Return the collation key used to store val in the filter
+        '''
+        if not isinstance(val,basestring):
+            raise TypeError('unicode_bloom_filter only supports strings')
+        return self.__collator.getSortKey(val)
+
+    def __positions(self, sort_key):
+        # Double hashing: the positions are h1 + i * h2, from a stable hash of
+        # the collation key so that the filter is valid in every process. The
+        # number of bits is a power of 2, so an odd step is coprime with it and
+        # the positions are distinct
+        h1, h2 = _BLOOM_HASH.unpack(hashlib.md5(sort_key).digest())
+        mask = self.__bits - 1
+        h2 |= 1
+        return [(h1 + i * h2) & mask for i in xrange(self.__hashes)]
+
+    def __add(self, sort_key):
+        if self.__shared:
+            # Copy on write: the filter loaded from a buffer never changes it
+            self.__data = bytearray(self.__data)
+            self.__shared = False
+        data = self.__data
+        for pos in self.__positions(sort_key):
+            data[pos >> 3] |= 1 << (pos & 7)
+        self.__count += 1
+
+    def add(self, val):
+        '''Add a string to the filter
+        '''
+        self.__add(self.sort_key(val))
+
+    def update(self, iterable):
+        '''Add all the strings of iterable to the filter
+        '''
+        add = self.__add
+        sort_key = self.sort_key
+        for val in iterable:
+            add(sort_key(val))
+
+    def __contains__(self, val):
+        '''Return False if val was never added, True if it probably was
+        '''
+        if not isinstance(val,basestring):
+            return False
+        data = self.__data
+        for pos in self.__positions(self.__collator.getSortKey(val)):
+            if not data[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def to_bytes(self):
+        '''Return the filter serialized in a compact binary format
+        '''
+        meta = (u'%s\n%s' % (self.locale, ICU_VERSION)).encode('utf8')
+        return _BLOOM_HEADER.pack(_BLOOM_MAGIC, _BLOOM_VERSION, self.comparison_level,
+            self.case_sensitive, self.__hashes, self.__bits, self.__count, len(meta)) + \
+            meta + bytes(self.__data)
+
+    @classmethod
+    def from_bytes(cls, data):
+        '''Load a filter serialized by to_bytes.
+        data can be any buffer, e.g. a file mapped in memory: the bits are read
+        in place, through a memoryview, until a string is added to the filter.
+        '''
+        magic, version, comparison_level, case_sensitive, hashes, bits, count, meta_len = \
+            _BLOOM_HEADER.unpack_from(data, 0)
+        if magic != _BLOOM_MAGIC or version != _BLOOM_VERSION or bits & (bits - 1):
+            raise ValueError('not a unicode_bloom_filter')
+        start = _BLOOM_HEADER.size
+        locale, icu_version = bytes(data[start:start + meta_len]).decode('utf8').split(u'\n')
+        if icu_version != ICU_VERSION:
+            raise ValueError('the filter was built with icu %s, the collation keys are not valid with icu %s' % \
+                (icu_version, ICU_VERSION))
+        start += meta_len
+        if _VIEW_BYTES:
+            bit_array = memoryview(data)[start:start + (bits + 7) // 8]
+        else:
+            # The items of a memoryview of python 2 are strings: the bits are copied
+            bit_array = bytearray(data[start:start + (bits + 7) // 8])
+        if len(bit_array) != (bits + 7) // 8:
+            raise ValueError('truncated unicode_bloom_filter')
+        ret = cls.__new__(cls)
+        ret.__init(bits, hashes, count, bit_array,
+            locale = locale,
+            comparison_level = comparison_level,
+            case_sensitive = bool(case_sensitive))
+        return ret
+
+    def __repr__(self):
+        return '%s(bits=%d, hashes=%d, count=%d)' % (self.__class__.__name__,
+            self.__bits, self.__hashes, self.__count)
+
+    def __reduce__(self):
+        return (unicode_bloom_filter_from_bytes, (self.to_bytes(),))
+
+##
+# Helper for pickle
+def unicode_bloom_filter_from_bytes(data):
+    return unicode_bloom_filter.from_bytes(data)
@@ -0,0 +1,252 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+from icu import Collator, Locale, UCollAttribute, UCollAttributeValue
+from collections import MutableMapping, OrderedDict, namedtuple
+from functools import wraps
+import sys
+import time
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+class unicode_lru_cache(MutableMapping):
+    '''Bounded mapping that evicts the least recently used keys, comparing the
+    keys with the collation (e.g. Zürich, zurich and ZURICH are the same entry).
+    The entries are kept in an OrderedDict by collation key, so get, set and
+    eviction cost O(1). With a ttl the collation keys are also kept in the order
+    they expire, so the expired entries are removed (by len, the iteration and
+    expire) in O(1) amortized time.
+    '''
+
+    def __init__(self, maxsize=128, ttl=None, maxbytes=None, sizeof=sys.getsizeof,
+        timer=time.time, **kwargs):
+        '''Initialize an empty cache.
+        maxsize is the maximum number of entries (None for no limit), ttl the
+        seconds an entry stays valid after it is set (None for no expiration),
+        maxbytes the maximum of the sum of sizeof(value) (None for no limit).
+        The kwargs set the comparison details, like unicode_dict.
+        '''
+        self.__maxsize = maxsize
+        self.__ttl = ttl
+        self.__maxbytes = maxbytes
+        self.__sizeof = sizeof
+        self.__timer = timer
+        locale = kwargs.pop('locale','en_US')
+        comparison_level = max(0,min(3,kwargs.pop('comparison_level',0)))
+        case_sensitive = kwargs.pop('case_sensitive', False)
+        self.__locale = Locale(locale)
+        self.__collator = Collator.createInstance(self.__locale)
+        self.__collator.setStrength(comparison_level)
+        self.__collator.setAttribute(UCollAttribute.CASE_LEVEL,
+            UCollAttributeValue.ON if case_sensitive else UCollAttributeValue.OFF)
+        # collation key -> (key, value, expiration time, size), least recently used first
+        self.__entries = OrderedDict()
+        # collation keys in the order they were set, so in the order they expire (with ttl)
+        self.__expiry = OrderedDict()
+        self.__bytes = 0
+        self.__hits = self.__misses = self.__evictions = 0
+
+    @property
+    def locale(self):
+        return self.__locale.getName()
+
+    @property
+    def comparison_level(self):
+        return self.__collator.getStrength()
+
+    @property
+    def case_sensitive(self):
+        return self.__collator.getAttribute(UCollAttribute.CASE_LEVEL) == UCollAttributeValue.ON
+
+    @property
+    def maxsize(self):
+        return self.__maxsize
+
+    @property
+    def ttl(self):
+        return self.__ttl
+
+    @property
+    def maxbytes(self):
+        return self.__maxbytes
+
+    @property
+    def currbytes(self):
+        return self.__bytes
+
+    def sort_key(self, key):
+        '''Return the collation key used to store key in the cache
+        '''
+        return self.__collator.getSortKey(key) if isinstance(key,basestring) else key
+
+    def __lookup(self, key):
+        '''Return the entry of key, moving it to the most recently used end.
+        Expired entries are removed. Raise KeyError if the key is missing.
+        '''
+        sort_key = self.sort_key(key)
+        entries = self.__entries
+        entry = entries.pop(sort_key)
+        if entry[2] is not None and entry[2] <= self.__timer():
+            del self.__expiry[sort_key]
+            self.__bytes -= entry[3]
+            raise KeyError(key)
+        entries[sort_key] = entry
+        return entry
+
+    def __getitem__(self, key):
+        try:
+            entry = self.__lookup(key)
+        except KeyError:
+            self.__misses += 1
+            raise KeyError(key)
+        self.__hits += 1
+        return entry[1]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        sort_key = self.sort_key(key)
+        entries = self.__entries
+        old = entries.pop(sort_key, None)
+        if old is not None:
+            self.__bytes -= old[3]
+        size = self.__sizeof(value) if self.__maxbytes is not None else 0
+        if self.__ttl is not None:
+            expire = self.__timer() + self.__ttl
+            self.__expiry.pop(sort_key, None)
+            self.__expiry[sort_key] = None
+        else:
+            expire = None
+        entries[sort_key] = (key, value, expire, size)
+        self.__bytes += size
+        self.__evict()
+
+    def __evict(self):
+        entries = self.__entries
+        maxsize, maxbytes = self.__maxsize, self.__maxbytes
+        while entries and ((maxsize is not None and len(entries) > maxsize) or \
+            (maxbytes is not None and self.__bytes > maxbytes)):
+            sort_key, entry = entries.popitem(last=False)
+            self.__expiry.pop(sort_key, None)
+            self.__bytes -= entry[3]
+            self.__evictions += 1
+
+    def __delitem__(self, key):
+        sort_key = self.sort_key(key)
+        try:
+            entry = self.__entries.pop(sort_key)
+        except KeyError:
+            raise KeyError(key)
+        self.__expiry.pop(sort_key, None)
+        self.__bytes -= entry[3]
+
+    def __contains__(self, key):
+        '''Check if key is in the cache without changing its position
+        '''
+        entry = self.__entries.get(self.sort_key(key))
+        return entry is not None and (entry[2] is None or entry[2] > self.__timer())
+
+    def __live_entries(self):
+        '''Iterate over the entries not expired, from the least to the most
+        recently used, without changing their position or the statistics
+        '''
+        self.expire()
+        return iter(self.__entries.values())
+
+    def __len__(self):
+        self.expire()
+        return len(self.__entries)
+
+    def __iter__(self):
+        '''Iterate over the keys from the least to the most recently used
+        '''
+        for entry in self.__live_entries():
+            yield entry[0]
+
+    def keys(self):
+        return [entry[0] for entry in self.__live_entries()]
+
+    def values(self):
+        return [entry[1] for entry in self.__live_entries()]
+
+    def items(self):
+        return [(entry[0], entry[1]) for entry in self.__live_entries()]
+
+    def iterkeys(self):
+        return iter(self)
+
+    def itervalues(self):
+        for entry in self.__live_entries():
+            yield entry[1]
+
+    def iteritems(self):
+        for entry in self.__live_entries():
+            yield entry[0], entry[1]
+
+    def clear(self):
+        self.__entries.clear()
+        self.__expiry.clear()
+        self.__bytes = 0
+
+    def expire(self):
+        '''Remove all the expired entries, in the order they expire: the cost is
+        proportional to the entries removed
+        '''
+        if self.__ttl is None:
+            return
+        now = self.__timer()
+        entries = self.__entries
+        expiry = self.__expiry
+        while expiry:
+            sort_key = next(iter(expiry))
+            entry = entries[sort_key]
+            if entry[2] > now:
+                break
+            del expiry[sort_key]
+            del entries[sort_key]
+            self.__bytes -= entry[3]
+
+    def cache_info(self):
+        '''Return the hits, misses and evictions so far and the size of the cache
+        '''
+        return CacheInfo(self.__hits, self.__misses, self.__evictions, self.__maxsize, len(self))
+
+    @property
+    def hit_rate(self):
+        lookups = self.__hits + self.__misses
+        return float(self.__hits) / lookups if lookups else 0.0
+
+    def __repr__(self):
+        return '%s(maxsize=%r, ttl=%r, %r)' % (self.__class__.__name__, self.__maxsize, self.__ttl,
+            dict((entry[0],entry[1]) for entry in self.__entries.values()))
+
+def unicode_lru_cached(maxsize=128, ttl=None, **kwargs):
+    '''Decorator that memoizes a function in a unicode_lru_cache.
+    The string arguments are compared with the collation, so f(u'Zürich') and
+    f(u'ZURICH') share the same entry. The other arguments must be hashable.
+    The cache is available as the attribute cache of the decorated function.
+    '''
+    cache = unicode_lru_cache(maxsize, ttl, **kwargs)
+    sort_key = cache.sort_key
+
+    def decorator(function):
+        marker = object()
+
+        @wraps(function)
+        def wrapper(*args, **kw):
+            key = tuple(sort_key(i) for i in args)
+            if kw:
+                key += (marker,) + tuple(sorted((k,sort_key(v)) for k,v in kw.items()))
+            try:
+                return cache[key]
+            except KeyError:
+                pass
+            ret = cache[key] = function(*args, **kw)
+            return ret
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
@@ -0,0 +1,304 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+from icu import Collator, Locale, UCollAttribute, UCollAttributeValue
+from collections import Mapping, MutableMapping
+import threading
+
+from unicode_dict import unicode_dict
+
+class concurrent_unicode_dict(MutableMapping):
+    '''unicode_dict that can be updated from many threads.
+    The items are split in shards by the hash of their collation key and every
+    shard has its own lock, so threads working on different keys rarely wait
+    for each other. The collation keys are computed outside the locks, with a
+    collator for each thread.
+    '''
+    _shards = 16
+
+    def __init__(self, *args, **kwargs):
+        '''Initialize the dict like a unicode_dict. The kwarg shards sets the
+        number of shards (default 16).
+        '''
+        if len(args) > 1:
+            raise TypeError('expected at most 1 arguments, got %d' % len(args))
+
+        shards = kwargs.pop('shards', self._shards)
+        if shards < 1:
+            raise ValueError('shards must be at least 1')
+        if len(args) == 1 and isinstance(args[0],(unicode_dict, concurrent_unicode_dict)):
+            locale = args[0].locale if 'locale' not in kwargs else kwargs.pop('locale')
+            comparison_level = args[0].comparison_level if 'comparison_level' \
+                not in kwargs else kwargs.pop('comparison_level')
+            case_sensitive = args[0].case_sensitive if 'case_sensitive' \
+                not in kwargs else kwargs.pop('case_sensitive')
+        else:
+            locale = kwargs.pop('locale','en_US')
+            comparison_level = max(0,min(3,kwargs.pop('comparison_level',0)))
+            case_sensitive = kwargs.pop('case_sensitive', False)
+        self.__locale = Locale(locale)
+        self.__comparison_level = comparison_level
+        self.__case_sensitive = case_sensitive
+        self.__local = threading.local()
+        # Every shard maps collation key -> (key, value), like unicode_dict
+        self.__locks = [threading.RLock() for _ in xrange(shards)]
+        self.__shards = [{} for _ in xrange(shards)]
+        if len(args) == 1:
+            self.update(args[0])
+
+    @property
+    def locale(self):
+        return self.__locale.getName()
+
+    @property
+    def comparison_level(self):
+        return self.__collator().getStrength()
+
+    @property
+    def case_sensitive(self):
+        return self.__collator().getAttribute(UCollAttribute.CASE_LEVEL) == UCollAttributeValue.ON
+
+    @property
+    def shards(self):
+        return len(self.__shards)
+
+    def __collator(self):
+        '''Return the collator of the current thread
+        '''
+        try:
+            return self.__local.collator
+        except AttributeError:
+            collator = Collator.createInstance(self.__locale)
+            collator.setStrength(self.__comparison_level)
+            collator.setAttribute(UCollAttribute.CASE_LEVEL,
+                UCollAttributeValue.ON if self.__case_sensitive else UCollAttributeValue.OFF)
+            self.__local.collator = collator
+            return collator
+
+    def sort_key(self, key):
+        '''Return the collation key used to store key in the dict
+        '''
+        return self.__collator().getSortKey(key) if isinstance(key,basestring) else key
+
+    def __shard(self, sort_key):
+        return hash(sort_key) % len(self.__shards)
+
+    def __getitem__(self, key):
+        sort_key = self.sort_key(key)
+        i = self.__shard(sort_key)
+        with self.__locks[i]:
+            try:
+                return self.__shards[i][sort_key][1]
+            except KeyError:
+                raise KeyError(key)
+
+    def get(self, key, default=None):
+        sort_key = self.sort_key(key)
+        i = self.__shard(sort_key)
+        with self.__locks[i]:
+            try:
+                return self.__shards[i][sort_key][1]
+            except KeyError:
+                return default
+
+    def __setitem__(self, key, value):
+        sort_key = self.sort_key(key)
+        i = self.__shard(sort_key)
+        with self.__locks[i]:
+            self.__shards[i][sort_key] = (key,value)
+
+    def __delitem__(self, key):
+        sort_key = self.sort_key(key)
+        i = self.__shard(sort_key)
+        with self.__locks[i]:
+            try:
+                del self.__shards[i][sort_key]
+            except KeyError:
+                raise KeyError(key)
+
+    def __contains__(self, key):
+        sort_key = self.sort_key(key)
+        i = self.__shard(sort_key)
+        with self.__locks[i]:
+            return sort_key in self.__shards[i]
+
+    def __len__(self):
+        return sum(len(shard) for shard in self.__shards)
+
+    def __iter__(self):
+        '''Iterate over a snapshot of the keys, taken one shard at a time
+        '''
+        for key,_ in self.__items():
+            yield key
+
+    def iterkeys(self):
+        return iter(self)
+
+    def itervalues(self):
+        for _,value in self.__items():
+            yield value
+
+    def iteritems(self):
+        '''Iterate over a snapshot of the (key, value) pairs, taken one shard at a time
+        '''
+        return self.__items()
+
+    def keys(self):
+        '''Return a snapshot of the keys, taken one shard at a time
+        '''
+        return [key for key,_ in self.__items()]
+
+    def values(self):
+        '''Return a snapshot of the values, taken one shard at a time
+        '''
+        return [value for _,value in self.__items()]
+
+    def items(self):
+        '''Return a snapshot of the (key, value) pairs, taken one shard at a time
+        '''
+        return list(self.__items())
+
+    def __items(self):
+        for lock,shard in zip(self.__locks, self.__shards):
+            with lock:
+                items = list(shard.itervalues())
+            for item in items:
+                yield item
+
+    def __stored(self):
+        '''Iterate over a snapshot of the (collation key, (key, value)) pairs,
+        taken one shard at a time
+        '''
+        for lock,shard in zip(self.__locks, self.__shards):
+            with lock:
+                stored = list(shard.iteritems())
+            for item in stored:
+                yield item
+
+    def __same_collation(self, other):
+        return self.locale == other.locale and self.comparison_level == other.comparison_level and \
+            self.case_sensitive == other.case_sensitive
+
+    def setdefault(self, key, default=None):
+        '''Atomically return the value of key, setting it to default if missing
+        '''
+        sort_key = self.sort_key(key)
+        i = self.__shard(sort_key)
+        with self.__locks[i]:
+            return self.__shards[i].setdefault(sort_key,(key,default))[1]
+
+    def compute_if_absent(self, key, function):
+        '''Atomically return the value of key. If key is missing the value is
+        computed calling function(key) and stored.
+        function runs holding the lock of the shard: it must not change the dict.
+        '''
+        sort_key = self.sort_key(key)
+        i = self.__shard(sort_key)
+        with self.__locks[i]:
+            shard = self.__shards[i]
+            try:
+                return shard[sort_key][1]
+            except KeyError:
+                value = function(key)
+                shard[sort_key] = (key,value)
+                return value
+
+    __marker = object()
+
+    def pop(self, key, default=__marker):
+        '''Atomically remove key and return its value.
+        If key is missing return default or raise KeyError if it is not given.
+        '''
+        sort_key = self.sort_key(key)
+        i = self.__shard(sort_key)
+        with self.__locks[i]:
+            try:
+                return self.__shards[i].pop(sort_key)[1]
+            except KeyError:
+                if default is self.__marker:
+                    raise KeyError(key)
+                return default
+
+    def popitem(self):
+        for lock,shard in zip(self.__locks, self.__shards):
+            with lock:
+                if shard:
+                    return shard.popitem()[1]
+        raise KeyError('popitem(): dictionary is empty')
+
+    def update(self, *args, **kwargs):
+        '''Update the dict from a mapping or an iterable of (key, value) pairs
+        and from kwargs. The update is atomic: the locks of all the shards
+        involved are held while the items are stored. The collation keys of a
+        concurrent_unicode_dict or a unicode_dict with the same collation are
+        reused.
+        '''
+        if len(args) > 1:
+            raise TypeError('expected at most 1 arguments, got %d' % len(args))
+
+        stored = []
+        if args:
+            other = args[0]
+            if isinstance(other,concurrent_unicode_dict) and self.__same_collation(other):
+                stored.extend(other.__stored())
+            elif isinstance(other,unicode_dict) and self.__same_collation(other):
+                stored.extend(super(unicode_dict,other).iteritems())
+            else:
+                stored.extend(self.__to_stored(other.iteritems() if isinstance(other,Mapping) else other))
+        stored.extend(self.__to_stored(kwargs.iteritems()))
+        per_shard = {}
+        for k,item in stored:
+            per_shard.setdefault(self.__shard(k),[]).append((k,item))
+        # Locks are always taken in the order of the shards to avoid deadlocks
+        indexes = sorted(per_shard)
+        for i in indexes:
+            self.__locks[i].acquire()
+        try:
+            for i in indexes:
+                self.__shards[i].update(per_shard[i])
+        finally:
+            for i in indexes:
+                self.__locks[i].release()
+
+    def __to_stored(self, items):
+        sort_key = self.sort_key
+        return [(sort_key(key),(key,value)) for key,value in items]
+
+    def clear(self):
+        for lock,shard in zip(self.__locks, self.__shards):
+            with lock:
+                shard.clear()
+
+    def copy(self):
+        return self.__class__(self, shards=len(self.__shards))
+
+    def to_unicode_dict(self):
+        '''Return a snapshot of the dict as a unicode_dict, reusing the collation keys
+        '''
+        sort_keys = []
+        items = []
+        for lock,shard in zip(self.__locks, self.__shards):
+            with lock:
+                sort_keys.extend(shard.iterkeys())
+                items.extend(shard.itervalues())
+        return unicode_dict.from_items(items, sort_keys,
+            locale = self.locale,
+            comparison_level = self.comparison_level,
+            case_sensitive = self.case_sensitive)
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, dict(self.iteritems()))
+
+    def __reduce__(self):
+        return (concurrent_unicode_dict_from_data, ([list(self.iteritems())], {
+            'locale':self.locale,
+            'comparison_level':self.comparison_level,
+            'case_sensitive': self.case_sensitive,
+            'shards': self.shards
+            }))
+
+##
+# Helper for pickle
+def concurrent_unicode_dict_from_data(args,kwargs = None):
+    if kwargs is None:
+        kwargs = {}
+    return concurrent_unicode_dict(*args,**kwargs)
@@ -0,0 +1,277 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+from icu import Collator, Locale, UCollAttribute, UCollAttributeValue
+
+from unicode_dict import unicode_dict
+from unicode_set import unicode_set
+from unicode_sorted import _sorted_key_list
+
+def _primary(sort_key):
+    '''Return the primary weights of an icu sort key
+    The levels of a sort key are separated by \\x01 and the key ends with \\x00
+    '''
+    return _truncate(sort_key, 0)
+
+def _truncate(sort_key, level):
+    '''Return the weights of the levels 0 to level of an icu sort key
+    '''
+    end = -1
+    for _ in xrange(level + 1):
+        end = sort_key.find(b'\x01', end + 1)
+        if end < 0:
+            return sort_key[:-1]
+    return sort_key[:end]
+
+class unicode_prefix_index(object):
+    '''Index of strings that answers prefix queries using the collation
+    (e.g. at comparison level 0 the prefix mu finds Müller).
+    The strings are kept sorted by sort key: all the strings starting with a
+    prefix share the primary weights of the prefix, so they are contiguous and
+    are found with a bisection.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        '''Initialize the index from an iterable of strings. The keys of a
+        unicode_dict, a unicode_set or another index are used with their collation
+        unless the collation kwargs are given
+        '''
+        if len(args) > 1:
+            raise TypeError('expected at most 1 arguments, got %d' % len(args))
+
+        if len(args) == 1 and isinstance(args[0],(unicode_dict, unicode_set, unicode_prefix_index)):
+            locale = args[0].locale if 'locale' not in kwargs else kwargs.pop('locale')
+            comparison_level = args[0].comparison_level if 'comparison_level' \
+                not in kwargs else kwargs.pop('comparison_level')
+            case_sensitive = args[0].case_sensitive if 'case_sensitive' \
+                not in kwargs else kwargs.pop('case_sensitive')
+        else:
+            locale = kwargs.pop('locale','en_US')
+            comparison_level = max(0,min(3,kwargs.pop('comparison_level',0)))
+            case_sensitive = kwargs.pop('case_sensitive', False)
+        self.__locale = Locale(locale)
+        self.__collator = Collator.createInstance(self.__locale)
+        self.__collator.setStrength(comparison_level)
+        self.__collator.setAttribute(UCollAttribute.CASE_LEVEL,
+            UCollAttributeValue.ON if case_sensitive else UCollAttributeValue.OFF)
+        # At comparison level 0 without case the sort key is only the primary weights
+        self.__primary_only = comparison_level == 0 and not case_sensitive
+        self.__values = {}
+        if len(args) == 1:
+            get_key = self.__collator.getSortKey
+            self.__values = dict((get_key(val),val) for val in args[0])
+        self.__keys = _sorted_key_list(self.__values)
+
+    @property
+    def locale(self):
+        return self.__locale.getName()
+
+    @property
+    def comparison_level(self):
+        return self.__collator.getStrength()
+
+    @property
+    def case_sensitive(self):
+        return self.__collator.getAttribute(UCollAttribute.CASE_LEVEL) == UCollAttributeValue.ON
+
+    def add(self, val):
+        '''Add a string to the index.
+        If an equal string is already present it is replaced.
+        '''
+        key = self.__collator.getSortKey(val)
+        if key not in self.__values:
+            self.__keys.add(key)
+        self.__values[key] = val
+
+    def discard(self, val):
+        '''Remove a string from the index if it is present
+        '''
+        key = self.__collator.getSortKey(val)
+        if key in self.__values:
+            del self.__values[key]
+            self.__keys.remove(key)
+
+    def __contains__(self, val):
+        return self.__collator.getSortKey(val) in self.__values
+
+    def __len__(self):
+        return len(self.__values)
+
+    def __iter__(self):
+        '''Iterate over the strings in collation order
+        '''
+        values = self.__values
+        for key in self.__keys:
+            yield values[key]
+
+    def __startswith(self, val, key):
+        '''Check if a prefix of val collates equal to the sort key of the prefix
+        '''
+        get_key = self.__collator.getSortKey
+        for end in xrange(1, len(val) + 1):
+            if get_key(val[:end]) == key:
+                return True
+        return False
+
+    def iprefix(self, prefix, limit=None):
+        '''Iterate in collation order over the strings that start with prefix.
+        At most limit strings are returned if limit is not None.
+        '''
+        if limit is not None and limit <= 0:
+            return
+        key = self.__collator.getSortKey(prefix)
+        primary = _primary(key)
+        exact = self.__primary_only or not prefix
+        keys = self.__keys
+        values = self.__values
+        found = 0
+        for candidate in keys.islice(keys.bisect_left(primary)):
+            if not candidate.startswith(primary):
+                break
+            val = values[candidate]
+            if exact or self.__startswith(val, key):
+                yield val
+                found += 1
+                if found == limit:
+                    break
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, list(self))
+
+    def __reduce__(self):
+        return (unicode_prefix_index_from_data, ([list(self)], {
+            'locale':self.locale,
+            'comparison_level':self.comparison_level,
+            'case_sensitive': self.case_sensitive
+            }))
+
+##
+# Helper for pickle
+def unicode_prefix_index_from_data(args,kwargs = None):
+    if kwargs is None:
+        kwargs = {}
+    return unicode_prefix_index(*args,**kwargs)
+
+class unicode_multilevel_index(object):
+    '''Index of strings that answers equality queries at every comparison level
+    up to the one of the index (e.g. exact matches at level 2 and accent
+    insensitive matches at level 0 on the same strings).
+    Each string is stored once with its full sort key: the sort key at a lower
+    level is a prefix of the full one (the levels are separated by \\x01), so
+    the strings equal at that level are contiguous in the sorted keys.
+    The case level is not supported, since it would be in between the levels.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        '''Initialize the index from an iterable of strings.
+        The kwargs locale and comparison_level (default 2) set the comparison
+        details, comparison_level is the strictest level of the queries.
+        case_sensitive=True raises ValueError, the queries are case insensitive.
+        '''
+        if len(args) > 1:
+            raise TypeError('expected at most 1 arguments, got %d' % len(args))
+        if kwargs.pop('case_sensitive', False):
+            raise ValueError('unicode_multilevel_index does not support case_sensitive')
+
+        locale = kwargs.pop('locale','en_US')
+        comparison_level = max(0,min(3,kwargs.pop('comparison_level',2)))
+        self.__locale = Locale(locale)
+        self.__collator = Collator.createInstance(self.__locale)
+        self.__collator.setStrength(comparison_level)
+        self.__collator.setAttribute(UCollAttribute.CASE_LEVEL, UCollAttributeValue.OFF)
+        self.__values = {}
+        if len(args) == 1:
+            get_key = self.__collator.getSortKey
+            self.__values = dict((get_key(val),val) for val in args[0])
+        self.__keys = _sorted_key_list(self.__values)
+
+    @property
+    def locale(self):
+        return self.__locale.getName()
+
+    @property
+    def comparison_level(self):
+        return self.__collator.getStrength()
+
+    def add(self, val):
+        '''Add a string to the index.
+        If an equal string at the level of the index is present it is replaced.
+        '''
+        key = self.__collator.getSortKey(val)
+        if key not in self.__values:
+            self.__keys.add(key)
+        self.__values[key] = val
+
+    def discard(self, val):
+        '''Remove a string from the index if it is present
+        '''
+        key = self.__collator.getSortKey(val)
+        if key in self.__values:
+            del self.__values[key]
+            self.__keys.remove(key)
+
+    def __contains__(self, val):
+        return self.__collator.getSortKey(val) in self.__values
+
+    def __len__(self):
+        return len(self.__values)
+
+    def __iter__(self):
+        '''Iterate over the strings in collation order
+        '''
+        values = self.__values
+        for key in self.__keys:
+            yield values[key]
+
+    def __level(self, comparison_level):
+        if comparison_level is None:
+            return self.comparison_level
+        if not 0 <= comparison_level <= self.comparison_level:
+            raise ValueError('comparison_level must be between 0 and %d' % self.comparison_level)
+        return comparison_level
+
+    def ilookup(self, val, comparison_level=None):
+        '''Iterate in collation order over the strings equal to val at comparison_level
+        (default the level of the index).
+        '''
+        comparison_level = self.__level(comparison_level)
+        key = self.__collator.getSortKey(val)
+        if comparison_level == self.comparison_level:
+            if key in self.__values:
+                yield self.__values[key]
+            return
+        # The weights of the lower levels followed by the separator
+        prefix = _truncate(key, comparison_level) + b'\x01'
+        keys = self.__keys
+        values = self.__values
+        for candidate in keys.islice(keys.bisect_left(prefix)):
+            if not candidate.startswith(prefix):
+                break
+            yield values[candidate]
+
+    def lookup(self, val, comparison_level=None):
+        '''Return the list of the strings equal to val at comparison_level
+        '''
+        return list(self.ilookup(val, comparison_level))
+
+    def contains(self, val, comparison_level=None):
+        '''Check if a string equal to val at comparison_level is in the index
+        '''
+        for _ in self.ilookup(val, comparison_level):
+            return True
+        return False
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, list(self))
+
+    def __reduce__(self):
+        return (unicode_multilevel_index_from_data, ([list(self)], {
+            'locale':self.locale,
+            'comparison_level':self.comparison_level
+            }))
+
+##
+# Helper for pickle
+def unicode_multilevel_index_from_data(args,kwargs = None):
+    if kwargs is None:
+        kwargs = {}
+    return unicode_multilevel_index(*args,**kwargs)
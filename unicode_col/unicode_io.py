@@ -0,0 +1,461 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+from icu import Collator, Locale, UCollAttribute, UCollAttributeValue, ICU_VERSION
+from collections import Mapping
+from itertools import izip
+import cPickle as pickle
+import io
+import mmap
+import struct
+
+from unicode_dict import unicode_dict
+from unicode_set import unicode_set
+
+##
+# mmap_unicode_dict file format (little endian):
+#   header: magic, version, comparison_level, case_sensitive, count,
+#           offset of the record table, length of the metadata
+#   metadata: locale and icu version, utf8, separated by \n
+#   records: key length, original key length, value length, then the
+#            collation key, the original key (utf8) and the pickled value.
+#            The records are sorted by collation key
+#   table: offset of each record
+_MMAP_MAGIC = b'UCOLMMAP'
+_MMAP_VERSION = 1
+_MMAP_HEADER = struct.Struct('<8sHBBQQH')
+_MMAP_RECORD = struct.Struct('<III')
+_MMAP_OFFSET = struct.Struct('<Q')
+
+def write_mmap_dict(data, path, **kwargs):
+    '''Write a unicode_dict to path in the format read by mmap_unicode_dict.
+    If data is not a unicode_dict it is converted using the kwargs as comparison
+    details. The keys must be strings, the values must be picklable.
+    '''
+    if not isinstance(data, unicode_dict):
+        data = unicode_dict(data, **kwargs)
+    records = sorted(izip(data.iter_sort_keys(), data.iteritems()))
+    meta = (u'%s\n%s' % (data.locale, ICU_VERSION)).encode('utf8')
+    with open(path, 'wb') as fp:
+        fp.write(_MMAP_HEADER.pack(_MMAP_MAGIC, _MMAP_VERSION, data.comparison_level,
+            data.case_sensitive, len(records), 0, len(meta)))
+        fp.write(meta)
+        offsets = []
+        offset = _MMAP_HEADER.size + len(meta)
+        for sort_key, (key, value) in records:
+            if not isinstance(key, unicode):
+                key = key.decode('utf8')
+            key = key.encode('utf8')
+            value = pickle.dumps(value, 2)
+            fp.write(_MMAP_RECORD.pack(len(sort_key), len(key), len(value)))
+            fp.write(sort_key)
+            fp.write(key)
+            fp.write(value)
+            offsets.append(offset)
+            offset += _MMAP_RECORD.size + len(sort_key) + len(key) + len(value)
+        for i in offsets:
+            fp.write(_MMAP_OFFSET.pack(i))
+        fp.seek(0)
+        fp.write(_MMAP_HEADER.pack(_MMAP_MAGIC, _MMAP_VERSION, data.comparison_level,
+            data.case_sensitive, len(records), offset, len(meta)))
+
+class mmap_unicode_dict(Mapping):
+    '''Read-only unicode_dict backed by a file written by write_mmap_dict.
+    The file is mapped in memory and shared between processes. A lookup computes
+    the collation key of the query and bisects the sorted records: only the
+    collation keys on the search path are read and only the value found is unpickled.
+    '''
+
+    def __init__(self, path):
+        self.__file = open(path, 'rb')
+        try:
+            self.__mmap = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self.__file.close()
+            raise
+        magic, version, comparison_level, case_sensitive, self.__len, self.__table, meta_len = \
+            _MMAP_HEADER.unpack_from(self.__mmap, 0)
+        if magic != _MMAP_MAGIC or version != _MMAP_VERSION:
+            self.close()
+            raise ValueError('%s is not a mmap_unicode_dict file' % path)
+        start = _MMAP_HEADER.size
+        locale, icu_version = self.__mmap[start:start + meta_len].decode('utf8').split(u'\n')
+        if icu_version != ICU_VERSION:
+            self.close()
+            raise ValueError('%s was written with icu %s, the collation keys are not valid with icu %s' % \
+                (path, icu_version, ICU_VERSION))
+        self.__locale = Locale(locale)
+        self.__collator = Collator.createInstance(self.__locale)
+        self.__collator.setStrength(comparison_level)
+        self.__collator.setAttribute(UCollAttribute.CASE_LEVEL,
+            UCollAttributeValue.ON if case_sensitive else UCollAttributeValue.OFF)
+
+    @property
+    def locale(self):
+        return self.__locale.getName()
+
+    @property
+    def comparison_level(self):
+        return self.__collator.getStrength()
+
+    @property
+    def case_sensitive(self):
+        return self.__collator.getAttribute(UCollAttribute.CASE_LEVEL) == UCollAttributeValue.ON
+
+    def close(self):
+        self.__mmap.close()
+        self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __record(self, index):
+        '''Return the offset of the record at index and the lengths of its fields
+        '''
+        offset, = _MMAP_OFFSET.unpack_from(self.__mmap, self.__table + index * _MMAP_OFFSET.size)
+        return (offset + _MMAP_RECORD.size,) + _MMAP_RECORD.unpack_from(self.__mmap, offset)
+
+    def __sort_key(self, index):
+        start, key_len, _, _ = self.__record(index)
+        return self.__mmap[start:start + key_len]
+
+    def __key(self, index):
+        start, key_len, orig_len, _ = self.__record(index)
+        start += key_len
+        return self.__mmap[start:start + orig_len].decode('utf8')
+
+    def __value(self, index):
+        start, key_len, orig_len, value_len = self.__record(index)
+        start += key_len + orig_len
+        return pickle.loads(self.__mmap[start:start + value_len])
+
+    def __bisect(self, sort_key, right=False):
+        lo, hi = 0, self.__len
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key = self.__sort_key(mid)
+            if key < sort_key or (right and key == sort_key):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def __find(self, key):
+        '''Return the index of key or -1 if it is not present
+        '''
+        if not isinstance(key, basestring):
+            return -1
+        sort_key = self.__collator.getSortKey(key)
+        index = self.__bisect(sort_key)
+        if index < self.__len and self.__sort_key(index) == sort_key:
+            return index
+        return -1
+
+    def sort_key(self, key):
+        '''Return the collation key used to store key in the dict
+        '''
+        return self.__collator.getSortKey(key)
+
+    def __getitem__(self, key):
+        index = self.__find(key)
+        if index < 0:
+            raise KeyError(key)
+        return self.__value(index)
+
+    def get(self, key, default=None):
+        index = self.__find(key)
+        if index < 0:
+            return default
+        return self.__value(index)
+
+    def __contains__(self, key):
+        return self.__find(key) >= 0
+
+    def __len__(self):
+        return self.__len
+
+    def __iter__(self):
+        '''Iterate over the keys in collation order
+        '''
+        for i in xrange(self.__len):
+            yield self.__key(i)
+
+    def iteritems(self):
+        for i in xrange(self.__len):
+            yield self.__key(i), self.__value(i)
+
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True), reverse=False):
+        '''Iterate over the keys between minimum and maximum in collation order
+        Bounds are compared with the collation of the dict, None means unbounded.
+        '''
+        if minimum is None:
+            start = 0
+        else:
+            start = self.__bisect(self.__collator.getSortKey(minimum), not inclusive[0])
+        if maximum is None:
+            stop = self.__len
+        else:
+            stop = self.__bisect(self.__collator.getSortKey(maximum), inclusive[1])
+        indexes = xrange(start, stop)
+        if reverse:
+            indexes = reversed(indexes)
+        for i in indexes:
+            yield self.__key(i)
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self.__file.name)
+
+    def __reduce__(self):
+        # Other processes map the same file
+        return (self.__class__, (self.__file.name,))
+
+##
+# unicode_set / unicode_dict serialization format (little endian):
+#   header: magic, version, comparison_level, case_sensitive, values flag,
+#           length of the metadata
+#   metadata: locale and icu version, utf8, separated by \n
+#   records until the end of the data: collation key length, original length
+#            (and value length if the values flag is set), then the collation
+#            key, the original (utf8) and the pickled value
+_DATA_MAGIC = b'UCOLDATA'
+_DATA_VERSION = 1
+_DATA_HEADER = struct.Struct('<8sHBBBH')
+_DATA_SET_RECORD = struct.Struct('<II')
+_DATA_DICT_RECORD = struct.Struct('<III')
+
+def _data_collation(header, meta):
+    '''Check the header and the metadata of serialized data, return the
+    comparison details and the values flag
+    '''
+    magic, version, comparison_level, case_sensitive, values, _ = header
+    if magic != _DATA_MAGIC or version != _DATA_VERSION:
+        raise ValueError('not a serialized unicode_set or unicode_dict')
+    locale, icu_version = meta.decode('utf8').split(u'\n')
+    if icu_version != ICU_VERSION:
+        raise ValueError('the data was written with icu %s, the collation keys are not valid with icu %s' % \
+            (icu_version, ICU_VERSION))
+    return {
+        'locale': locale,
+        'comparison_level': comparison_level,
+        'case_sensitive': bool(case_sensitive)
+        }, bool(values)
+
+class unicode_data_writer(object):
+    '''Write the elements of a unicode_set or the items of a unicode_dict to a
+    binary file one at a time, in the format read by unicode_data_reader.
+    The collation keys are stored, so reading the data doesn't compute them.
+    '''
+
+    def __init__(self, fp, values=False, **kwargs):
+        '''Write the header to fp, a file opened in binary mode. values tells if
+        the records have values (unicode_dict) or not (unicode_set).
+        The kwargs set the comparison details.
+        '''
+        locale = kwargs.pop('locale','en_US')
+        comparison_level = max(0,min(3,kwargs.pop('comparison_level',0)))
+        case_sensitive = kwargs.pop('case_sensitive', False)
+        self.__fp = fp
+        self.__values = values
+        self.__locale = Locale(locale)
+        self.__collator = Collator.createInstance(self.__locale)
+        self.__collator.setStrength(comparison_level)
+        self.__collator.setAttribute(UCollAttribute.CASE_LEVEL,
+            UCollAttributeValue.ON if case_sensitive else UCollAttributeValue.OFF)
+        meta = (u'%s\n%s' % (self.locale, ICU_VERSION)).encode('utf8')
+        fp.write(_DATA_HEADER.pack(_DATA_MAGIC, _DATA_VERSION, comparison_level,
+            case_sensitive, values, len(meta)))
+        fp.write(meta)
+
+    @property
+    def locale(self):
+        return self.__locale.getName()
+
+    @property
+    def comparison_level(self):
+        return self.__collator.getStrength()
+
+    @property
+    def case_sensitive(self):
+        return self.__collator.getAttribute(UCollAttribute.CASE_LEVEL) == UCollAttributeValue.ON
+
+    def sort_key(self, key):
+        '''Return the collation key stored for key
+        '''
+        return self.__collator.getSortKey(key)
+
+    def write(self, key, value=None, sort_key=None):
+        '''Write a string, with its value if the records have values.
+        sort_key can provide the collation key already computed.
+        '''
+        if sort_key is None:
+            sort_key = self.__collator.getSortKey(key)
+        if not isinstance(key, unicode):
+            key = key.decode('utf8')
+        key = key.encode('utf8')
+        write = self.__fp.write
+        if self.__values:
+            value = pickle.dumps(value, 2)
+            write(_DATA_DICT_RECORD.pack(len(sort_key), len(key), len(value)))
+            write(sort_key)
+            write(key)
+            write(value)
+        else:
+            write(_DATA_SET_RECORD.pack(len(sort_key), len(key)))
+            write(sort_key)
+            write(key)
+
+class unicode_data_reader(object):
+    '''Read the records written by unicode_data_writer from a binary file one
+    at a time, as (collation key, string, value) tuples. The value is None if
+    the records have no values.
+    '''
+
+    def __init__(self, fp):
+        self.__fp = fp
+        header = _DATA_HEADER.unpack(fp.read(_DATA_HEADER.size))
+        self.__kwargs, self.__values = _data_collation(header, fp.read(header[-1]))
+
+    @property
+    def locale(self):
+        return self.__kwargs['locale']
+
+    @property
+    def comparison_level(self):
+        return self.__kwargs['comparison_level']
+
+    @property
+    def case_sensitive(self):
+        return self.__kwargs['case_sensitive']
+
+    @property
+    def values(self):
+        return self.__values
+
+    def __iter__(self):
+        read = self.__fp.read
+        record = _DATA_DICT_RECORD if self.__values else _DATA_SET_RECORD
+        while True:
+            data = read(record.size)
+            if not data:
+                return
+            if len(data) < record.size:
+                raise ValueError('truncated data')
+            lengths = record.unpack(data)
+            fields = [read(i) for i in lengths]
+            if [len(i) for i in fields] != list(lengths):
+                raise ValueError('truncated data')
+            yield fields[0], fields[1].decode('utf8'), \
+                pickle.loads(fields[2]) if self.__values else None
+
+    def load(self):
+        '''Return the remaining records as a unicode_dict or a unicode_set
+        '''
+        if self.__values:
+            stored = ((sort_key, (key, value)) for sort_key, key, value in self)
+        else:
+            stored = ((sort_key, key) for sort_key, key, _ in self)
+        return _data_build(stored, self.__values, self.__kwargs)
+
+def _data_build(stored, values, kwargs):
+    '''Return a unicode_dict or a unicode_set with the (collation key, stored
+    element) pairs of stored
+    '''
+    ret = unicode_dict(**kwargs) if values else unicode_set(**kwargs)
+    ret._update_stored(stored)
+    return ret
+
+def dump_unicode_data(data, fp):
+    '''Write a unicode_set or a unicode_dict (with string keys) to fp, a file
+    opened in binary mode, with the collation keys already stored
+    '''
+    if isinstance(data, unicode_dict):
+        writer = unicode_data_writer(fp, True,
+            locale = data.locale,
+            comparison_level = data.comparison_level,
+            case_sensitive = data.case_sensitive)
+        write = writer.write
+        for sort_key, (key, value) in izip(data.iter_sort_keys(), data.iteritems()):
+            write(key, value, sort_key)
+    elif isinstance(data, unicode_set):
+        if data.keys_only:
+            raise TypeError("can't dump a keys_only unicode_set, it has no strings")
+        writer = unicode_data_writer(fp, False,
+            locale = data.locale,
+            comparison_level = data.comparison_level,
+            case_sensitive = data.case_sensitive)
+        write = writer.write
+        for sort_key, key in izip(data.iter_sort_keys(), data):
+            write(key, None, sort_key)
+    else:
+        raise TypeError('can only dump a unicode_set or a unicode_dict')
+
+def dumps_unicode_data(data):
+    '''Return a unicode_set or a unicode_dict serialized as bytes
+    '''
+    fp = io.BytesIO()
+    dump_unicode_data(data, fp)
+    return fp.getvalue()
+
+def load_unicode_data(fp):
+    '''Read a unicode_set or a unicode_dict written by dump_unicode_data
+    '''
+    return unicode_data_reader(fp).load()
+
+def loads_unicode_data(data):
+    '''Read a unicode_set or a unicode_dict from a buffer (bytes, mmap, ...)
+    The records are parsed in place: every collation key and string is copied
+    once, from the buffer to the container.
+    '''
+    if isinstance(data, (bytes, mmap.mmap)):
+        # Their slices are already bytes
+        view = data
+        tobytes = None
+    else:
+        try:
+            view = memoryview(data)
+            tobytes = memoryview.tobytes
+        except TypeError:
+            # The old buffer interface of python 2: its slices are copied once too
+            view = data
+            tobytes = bytes
+    header = _DATA_HEADER.unpack_from(view, 0)
+    start = _DATA_HEADER.size
+    meta = view[start:start + header[-1]]
+    kwargs, values = _data_collation(header, meta if tobytes is None else tobytes(meta))
+    start += header[-1]
+    return _data_build(_data_stored(view, tobytes, start, values), values, kwargs)
+
+def _data_stored(view, tobytes, pos, values):
+    '''Parse the records from pos to the end of view in a single loop, return
+    the table of the container (collation key -> string or (string, value))
+    '''
+    record = _DATA_DICT_RECORD if values else _DATA_SET_RECORD
+    size = record.size
+    unpack = record.unpack_from
+    loads = pickle.loads
+    end = len(view)
+    stored = {}
+    while pos < end:
+        if pos + size > end:
+            raise ValueError('truncated data')
+        lengths = unpack(view, pos)
+        pos += size
+        key_end = pos + lengths[0]
+        orig_end = key_end + lengths[1]
+        value_end = orig_end + lengths[2] if values else orig_end
+        if value_end > end:
+            raise ValueError('truncated data')
+        sort_key = view[pos:key_end]
+        key = view[key_end:orig_end]
+        if tobytes is not None:
+            sort_key = tobytes(sort_key)
+            key = tobytes(key)
+        if values:
+            value = view[orig_end:value_end]
+            stored[sort_key] = (key.decode('utf8'), loads(value if tobytes is None else tobytes(value)))
+        else:
+            stored[sort_key] = key.decode('utf8')
+        pos = value_end
+    return stored
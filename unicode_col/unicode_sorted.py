@@ -0,0 +1,547 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+from bisect import bisect_left, bisect_right, insort
+
+try:
+    from thread import get_ident as _get_ident
+except ImportError:
+    from dummy_thread import get_ident as _get_ident
+
+from unicode_dict import unicode_dict
+from unicode_set import unicode_set
+
+class _sorted_key_list(object):
+    '''Sorted list of collation keys.
+    The keys are split in chunks of at most 2 * _load elements, so an insertion
+    or a deletion costs a bisection plus the shift of a single chunk instead of
+    the shift of the whole list.
+    '''
+    _load = 1000
+
+    def __init__(self, keys=()):
+        keys = sorted(keys)
+        load = self._load
+        self.__lists = [keys[i:i + load] for i in xrange(0, len(keys), load)]
+        self.__maxes = [l[-1] for l in self.__lists]
+        self.__len = len(keys)
+        self.__offsets = None # start position of each chunk, rebuilt lazily
+
+    def __len__(self):
+        return self.__len
+
+    def __iter__(self):
+        for l in self.__lists:
+            for key in l:
+                yield key
+
+    def __contains__(self, key):
+        maxes = self.__maxes
+        pos = bisect_left(maxes, key)
+        if pos == len(maxes):
+            return False
+        chunk = self.__lists[pos]
+        return chunk[bisect_left(chunk, key)] == key
+
+    def __reversed__(self):
+        for l in reversed(self.__lists):
+            for key in reversed(l):
+                yield key
+
+    def clear(self):
+        self.__lists = []
+        self.__maxes = []
+        self.__len = 0
+        self.__offsets = None
+
+    def add(self, key):
+        '''Insert key keeping the list sorted
+        '''
+        lists, maxes = self.__lists, self.__maxes
+        if not maxes:
+            lists.append([key])
+            maxes.append(key)
+        else:
+            pos = bisect_right(maxes, key)
+            if pos == len(maxes):
+                pos -= 1
+                lists[pos].append(key)
+                maxes[pos] = key
+            else:
+                insort(lists[pos], key)
+            if len(lists[pos]) > self._load * 2:
+                chunk = lists[pos]
+                half = chunk[self._load:]
+                del chunk[self._load:]
+                maxes[pos] = chunk[-1]
+                lists.insert(pos + 1, half)
+                maxes.insert(pos + 1, half[-1])
+        self.__len += 1
+        self.__offsets = None
+
+    def remove(self, key):
+        '''Remove key from the list. Raise ValueError if it is not present.
+        '''
+        lists, maxes = self.__lists, self.__maxes
+        pos = bisect_left(maxes, key)
+        if pos == len(maxes):
+            raise ValueError(key)
+        chunk = lists[pos]
+        idx = bisect_left(chunk, key)
+        if chunk[idx] != key:
+            raise ValueError(key)
+        del chunk[idx]
+        if chunk:
+            maxes[pos] = chunk[-1]
+        else:
+            del lists[pos]
+            del maxes[pos]
+        self.__len -= 1
+        self.__offsets = None
+
+    def __chunk_offsets(self):
+        offsets = self.__offsets
+        if offsets is None:
+            offsets = [0]
+            for l in self.__lists:
+                offsets.append(offsets[-1] + len(l))
+            self.__offsets = offsets
+        return offsets
+
+    def __loc(self, index):
+        '''Convert a position in the list to a (chunk, position in chunk) pair
+        '''
+        offsets = self.__chunk_offsets()
+        pos = bisect_right(offsets, index) - 1
+        return pos, index - offsets[pos]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.__len)
+            if step == 1:
+                return list(self.islice(start, stop))
+            return [self[i] for i in xrange(start, stop, step)]
+        if index < 0:
+            index += self.__len
+        if not 0 <= index < self.__len:
+            raise IndexError("list index out of range")
+        pos, idx = self.__loc(index)
+        return self.__lists[pos][idx]
+
+    def bisect_left(self, key):
+        '''Return the position where key would be inserted, before any equal key
+        '''
+        pos = bisect_left(self.__maxes, key)
+        if pos == len(self.__maxes):
+            return self.__len
+        return self.__chunk_offsets()[pos] + bisect_left(self.__lists[pos], key)
+
+    def bisect_right(self, key):
+        '''Return the position where key would be inserted, after any equal key
+        '''
+        pos = bisect_right(self.__maxes, key)
+        if pos == len(self.__maxes):
+            return self.__len
+        return self.__chunk_offsets()[pos] + bisect_right(self.__lists[pos], key)
+
+    def islice(self, start=None, stop=None, reverse=False):
+        '''Iterate over the keys between the positions start and stop
+        '''
+        start, stop, _ = slice(start, stop).indices(self.__len)
+        if start >= stop:
+            return iter(())
+        start_pos, start_idx = self.__loc(start)
+        stop_pos, stop_idx = self.__loc(stop - 1)
+        return self.__islice(start_pos, start_idx, stop_pos, stop_idx + 1, reverse)
+
+    def __islice(self, start_pos, start_idx, stop_pos, stop_idx, reverse):
+        lists = self.__lists
+        positions = xrange(start_pos, stop_pos + 1)
+        if reverse:
+            positions = reversed(positions)
+        for pos in positions:
+            chunk = lists[pos]
+            lo = start_idx if pos == start_pos else 0
+            hi = stop_idx if pos == stop_pos else len(chunk)
+            if reverse:
+                for i in xrange(hi - 1, lo - 1, -1):
+                    yield chunk[i]
+            else:
+                for i in xrange(lo, hi):
+                    yield chunk[i]
+
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True), reverse=False):
+        '''Iterate over the keys between minimum and maximum
+        None means unbounded on that side.
+        '''
+        if minimum is None:
+            start = 0
+        elif inclusive[0]:
+            start = self.bisect_left(minimum)
+        else:
+            start = self.bisect_right(minimum)
+        if maximum is None:
+            stop = self.__len
+        elif inclusive[1]:
+            stop = self.bisect_right(maximum)
+        else:
+            stop = self.bisect_left(maximum)
+        return self.islice(start, stop, reverse)
+
+class sorted_unicode_dict(unicode_dict):
+    '''unicode_dict that keeps its keys ordered by collation.
+    Iteration follows the collation order and range queries cost O(log n).
+    Keys must be strings, because only collation keys can be ordered.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super(sorted_unicode_dict,self).__init__(*args,**kwargs)
+        self.__keys = _sorted_key_list(dict.keys(self))
+
+    @classmethod
+    def from_items(cls, items, sort_keys=None, **kwargs):
+        '''Build a dict from an iterable of (key, value) pairs.
+        The keys are sorted once at the end instead of one insertion at a time.
+        '''
+        ret = super(sorted_unicode_dict,cls).from_items(items, sort_keys, **kwargs)
+        ret.__keys = _sorted_key_list(dict.keys(ret))
+        return ret
+
+    def __setitem__(self, key, value):
+        sort_key = self.sort_key(key)
+        if not dict.__contains__(self, sort_key):
+            self.__keys.add(sort_key)
+        dict.__setitem__(self, sort_key, (key,value))
+
+    def _update_stored(self, stored):
+        keys = self.__keys
+        contains = dict.__contains__
+        setitem = dict.__setitem__
+        for sort_key,item in stored:
+            if not contains(self, sort_key):
+                keys.add(sort_key)
+            setitem(self, sort_key, item)
+
+    def __delitem__(self, key):
+        sort_key = self.sort_key(key)
+        try:
+            dict.__delitem__(self, sort_key)
+        except KeyError:
+            raise KeyError(key)
+        self.__keys.remove(sort_key)
+
+    def __iter__(self):
+        for i,_ in self.__stored(self.__keys):
+            yield i
+
+    def __reversed__(self):
+        for i,_ in self.__stored(reversed(self.__keys)):
+            yield i
+
+    def __stored(self, sort_keys):
+        getitem = dict.__getitem__
+        for sort_key in sort_keys:
+            yield getitem(self, sort_key)
+
+    def clear(self):
+        super(sorted_unicode_dict,self).clear()
+        self.__keys.clear()
+
+    def iter_sort_keys(self):
+        return iter(self.__keys)
+
+    def _iter_values(self):
+        for _,i in self.__stored(self.__keys):
+            yield i
+
+    def _iter_items(self):
+        return self.__stored(self.__keys)
+
+    def popitem(self, index=-1):
+        '''Remove and return the (key, value) pair at index (default last)
+        Raise KeyError if the dict is empty.
+        '''
+        if not self:
+            raise KeyError('popitem(): dictionary is empty')
+        sort_key = self.__keys[index]
+        self.__keys.remove(sort_key)
+        return dict.pop(self, sort_key)
+
+    def peekitem(self, index=-1):
+        '''Return the (key, value) pair at index (default last) in collation order
+        Raise IndexError if index is out of range.
+        '''
+        return dict.__getitem__(self, self.__keys[index])
+
+    def first(self):
+        '''Return the first key in collation order
+        '''
+        if not self:
+            raise KeyError('first(): dictionary is empty')
+        return self.peekitem(0)[0]
+
+    def last(self):
+        '''Return the last key in collation order
+        '''
+        if not self:
+            raise KeyError('last(): dictionary is empty')
+        return self.peekitem(-1)[0]
+
+    def bisect_left(self, key):
+        '''Return the index where key would be inserted, before any equal key
+        '''
+        return self.__keys.bisect_left(self.sort_key(key))
+
+    def bisect_right(self, key):
+        '''Return the index where key would be inserted, after any equal key
+        '''
+        return self.__keys.bisect_right(self.sort_key(key))
+
+    def index(self, key):
+        '''Return the position of key in collation order
+        Raise KeyError if key is not present.
+        '''
+        sort_key = self.sort_key(key)
+        if not dict.__contains__(self, sort_key):
+            raise KeyError(key)
+        return self.__keys.bisect_left(sort_key)
+
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True), reverse=False):
+        '''Iterate over the keys between minimum and maximum in collation order
+        Bounds are compared with the collation of the dict, None means unbounded.
+        '''
+        if minimum is not None:
+            minimum = self.sort_key(minimum)
+        if maximum is not None:
+            maximum = self.sort_key(maximum)
+        sort_keys = self.__keys.irange(minimum, maximum, inclusive, reverse)
+        for i,_ in self.__stored(sort_keys):
+            yield i
+
+    def __repr__(self, _repr_running={}):
+        call_key = id(self), _get_ident()
+        if call_key in _repr_running:
+            return '...'
+        _repr_running[call_key] = 1
+        try:
+            if not self:
+                return '%s()' % (self.__class__.__name__,)
+            return '%s(%r)' % (self.__class__.__name__, list(self.iteritems()))
+        finally:
+            del _repr_running[call_key]
+
+    def __reduce__(self):
+        items = list(self.iteritems())
+        inst_dict = vars(self).copy()
+        for k in vars(sorted_unicode_dict()):
+            inst_dict.pop(k, None)
+        inst_dict.update({
+            'locale':self.locale,
+            'comparison_level':self.comparison_level,
+            'case_sensitive': self.case_sensitive
+            })
+        return (sorted_unicode_dict_from_data, ([items],inst_dict))
+
+##
+# Helper for pickle
+def sorted_unicode_dict_from_data(args,kwargs = None):
+    if kwargs is None:
+        kwargs = {}
+    fwd_kwargs = {i:kwargs.pop(i) for i in ('locale', 'comparison_level', 'case_sensitive') if i in kwargs}
+    r = sorted_unicode_dict(*args,**fwd_kwargs)
+    for i,v in kwargs.iteritems():
+        setattr(r,i,v)
+    return r
+
+class sorted_unicode_set(unicode_set):
+    '''unicode_set that keeps its elements ordered by collation.
+    Iteration follows the collation order; positions, neighbors and range
+    queries cost O(log n). Adding or removing a single element keeps the order
+    up to date, the bulk removals sort the elements again at the next query.
+    Elements must be strings, because only collation keys can be ordered.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        self.__keys = None # _sorted_key_list, None until the next ordered query
+        super(sorted_unicode_set,self).__init__(*args,**kwargs)
+
+    def __sorted_keys(self):
+        keys = self.__keys
+        if keys is None:
+            keys = self.__keys = _sorted_key_list(super(sorted_unicode_set,self).iter_sort_keys())
+        return keys
+
+    def __stored(self, sort_keys):
+        table = self._table(self)
+        for sort_key in sort_keys:
+            yield table[sort_key]
+
+    def _update_stored(self, stored):
+        keys = self.__keys
+        if keys is not None:
+            stored = stored.items() if isinstance(stored, dict) else list(stored)
+            if len(stored) > len(keys):
+                # Cheaper to sort all the elements again
+                self.__keys = None
+            else:
+                for sort_key,_ in stored:
+                    if sort_key not in keys:
+                        keys.add(sort_key)
+        super(sorted_unicode_set,self)._update_stored(stored)
+
+    def add(self, val):
+        sort_key = self.sort_key(val)
+        self._update_stored(((sort_key, sort_key if self.keys_only else val),))
+
+    def remove(self, val):
+        super(sorted_unicode_set,self).remove(val)
+        if self.__keys is not None:
+            self.__keys.remove(self.sort_key(val))
+
+    def pop(self, index=-1):
+        '''Remove and return the element at index (default last)
+        Raise KeyError if the set is empty.
+        '''
+        if not self:
+            raise KeyError('pop from an empty set')
+        keys = self.__sorted_keys()
+        sort_key = keys[index]
+        keys.remove(sort_key)
+        return self._remove_stored(sort_key)
+
+    def clear(self):
+        super(sorted_unicode_set,self).clear()
+        self.__keys = None
+
+    def difference_update(self, *args):
+        super(sorted_unicode_set,self).difference_update(*args)
+        self.__keys = None
+
+    def intersection_update(self, *args):
+        super(sorted_unicode_set,self).intersection_update(*args)
+        self.__keys = None
+
+    def symmetric_difference_update(self, other):
+        super(sorted_unicode_set,self).symmetric_difference_update(other)
+        self.__keys = None
+
+    def __iter__(self):
+        return self.__stored(self.__sorted_keys())
+
+    def __reversed__(self):
+        return self.__stored(reversed(self.__sorted_keys()))
+
+    def iter_sort_keys(self):
+        return iter(self.__sorted_keys())
+
+    def __getitem__(self, index):
+        '''Return the element at index in collation order, or a list for a slice
+        '''
+        keys = self.__sorted_keys()[index]
+        if isinstance(index, slice):
+            return list(self.__stored(keys))
+        return self._table(self)[keys]
+
+    def first(self):
+        '''Return the first element in collation order
+        '''
+        if not self:
+            raise KeyError('first(): set is empty')
+        return self[0]
+
+    def last(self):
+        '''Return the last element in collation order
+        '''
+        if not self:
+            raise KeyError('last(): set is empty')
+        return self[-1]
+
+    def bisect_left(self, val):
+        '''Return the index where val would be inserted, before any equal element
+        '''
+        return self.__sorted_keys().bisect_left(self.sort_key(val))
+
+    def bisect_right(self, val):
+        '''Return the index where val would be inserted, after any equal element
+        '''
+        return self.__sorted_keys().bisect_right(self.sort_key(val))
+
+    def index(self, val):
+        '''Return the position of val in collation order
+        Raise KeyError if val is not present.
+        '''
+        sort_key = self.sort_key(val)
+        keys = self.__sorted_keys()
+        if sort_key not in keys:
+            raise KeyError(val)
+        return keys.bisect_left(sort_key)
+
+    def successor(self, val):
+        '''Return the first element that follows val in collation order
+        val doesn't need to be in the set. Raise KeyError if there is none.
+        '''
+        pos = self.bisect_right(val)
+        if pos == len(self):
+            raise KeyError(val)
+        return self[pos]
+
+    def predecessor(self, val):
+        '''Return the last element that precedes val in collation order
+        val doesn't need to be in the set. Raise KeyError if there is none.
+        '''
+        pos = self.bisect_left(val)
+        if pos == 0:
+            raise KeyError(val)
+        return self[pos - 1]
+
+    def islice(self, start=None, stop=None, reverse=False):
+        '''Iterate over the elements between the positions start and stop
+        '''
+        return self.__stored(self.__sorted_keys().islice(start, stop, reverse))
+
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True), reverse=False):
+        '''Iterate over the elements between minimum and maximum in collation order
+        Bounds are compared with the collation of the set, None means unbounded.
+        '''
+        if minimum is not None:
+            minimum = self.sort_key(minimum)
+        if maximum is not None:
+            maximum = self.sort_key(maximum)
+        return self.__stored(self.__sorted_keys().irange(minimum, maximum, inclusive, reverse))
+
+    def __repr__(self, _repr_running={}):
+        call_key = id(self), _get_ident()
+        if call_key in _repr_running:
+            return '...'
+        _repr_running[call_key] = 1
+        try:
+            if not self:
+                return '%s()' % (self.__class__.__name__,)
+            return '%s(%r)' % (self.__class__.__name__, list(self))
+        finally:
+            del _repr_running[call_key]
+
+    def __reduce__(self):
+        inst_dict = vars(self).copy()
+        for k in vars(sorted_unicode_set()):
+            inst_dict.pop(k, None)
+        inst_dict.update({
+            'locale':self.locale,
+            'comparison_level':self.comparison_level,
+            'case_sensitive': self.case_sensitive,
+            'keys_only': self.keys_only
+            })
+        return (sorted_unicode_set_from_data, ([list(self)],inst_dict))
+
+##
+# Helper for pickle
+def sorted_unicode_set_from_data(args,kwargs = None):
+    if kwargs is None:
+        kwargs = {}
+    fwd_kwargs = {i:kwargs.pop(i) for i in ('locale', 'comparison_level', 'case_sensitive', 'keys_only') if i in kwargs}
+    if fwd_kwargs.get('keys_only'):
+        r = sorted_unicode_set.from_iterable(args[0], args[0], **fwd_kwargs)
+    else:
+        r = sorted_unicode_set(*args,**fwd_kwargs)
+    for i,v in kwargs.iteritems():
+        setattr(r,i,v)
+    return r
\ No newline at end of file
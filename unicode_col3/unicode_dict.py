@@ -4,9 +4,12 @@ try:
 except ImportError:
     from _dummy_thread import get_ident as _get_ident
 
-from .unicode_set import unicode_set
+from .unicode_set import unicode_set, _zip_sort_keys
+from .unicode_str import UnicodeStrFactory, unicode_str_base
 
-from collections import Mapping, Callable
+from collections import Mapping, Callable, KeysView, ValuesView, ItemsView
+from operator import itemgetter
+import heapq
 
 class unicode_dict(dict):
     '''Dictionary that support unicode comparison as defined by icu (UCA)
@@ -20,7 +23,7 @@ class unicode_dict(dict):
         if len(args) > 1:
             raise TypeError('expected at most 1 arguments, got %d' % len(args))
 
-        if len(args) == 1 and isinstance(args[0],self.__class__):
+        if len(args) == 1 and isinstance(args[0],unicode_dict):
             locale = args[0].locale if 'locale' not in kwargs else kwargs.pop('locale')
             comparison_level = args[0].comparison_level if 'comparison_level' \
                 not in kwargs else kwargs.pop('comparison_level')
@@ -35,13 +38,37 @@ class unicode_dict(dict):
         self.__collator.setStrength(comparison_level)
         self.__collator.setAttribute(UCollAttribute.CASE_LEVEL,
             UCollAttributeValue.ON if case_sensitive else UCollAttributeValue.OFF)
+        self.__str_factories = {} # UnicodeStrFactory -> same collation of the dict
+        self.__str_factory = None
         if len(args) == 1:
-            if isinstance(args[0],Mapping):
-                vals = list(args[0].items())
+            if isinstance(args[0],unicode_dict) and self.__same_collation(args[0]):
+                # Same collation: copy the stored collation keys
+                super(unicode_dict,self).update(iter(super(unicode_dict,args[0]).items()))
             else:
-                vals = args[0]
-            for key,val in vals:
-                self.__setitem__(key,val)
+                if isinstance(args[0],Mapping):
+                    vals = list(args[0].items())
+                else:
+                    vals = args[0]
+                self.__update_items(vals)
+
+    @classmethod
+    def from_items(cls, items, sort_keys=None, **kwargs):
+        '''Build a dict from an iterable of (key, value) pairs.
+        The collation keys are computed in a single pass, sort_keys can provide
+        them already computed (in the same order of items, ValueError if the
+        lengths differ).
+        The kwargs set the comparison details.
+        '''
+        ret = cls(**kwargs)
+        ret.__update_items(items, sort_keys)
+        return ret
+
+    @classmethod
+    def fromkeys(cls, keys, value=None, sort_keys=None, **kwargs):
+        '''Build a dict with keys from an iterable and values set to value.
+        sort_keys and kwargs are the same of from_items.
+        '''
+        return cls.from_items(((key,value) for key in keys), sort_keys, **kwargs)
 
     @property
     def locale(self):
@@ -56,8 +83,72 @@ class unicode_dict(dict):
         return self.__collator.getAttribute(UCollAttribute.CASE_LEVEL) == UCollAttributeValue.ON
 
     def __in_key(self,key):
+        if isinstance(key,unicode_str_base) and self.__same_factory(key._factory):
+            return key.sort_key()
         return self.__collator.getSortKey(key) if isinstance(key,str) else key
 
+    def __same_factory(self,factory):
+        try:
+            return self.__str_factories[factory]
+        except KeyError:
+            same = self.__str_factories[factory] = factory.locale == self.locale and \
+                factory.comparison_level == self.comparison_level and \
+                factory.case_sensitive == self.case_sensitive
+            return same
+
+    @property
+    def str_factory(self):
+        '''UnicodeStrFactory with the same collation of the dict
+        '''
+        if self.__str_factory is None:
+            self.__str_factory = UnicodeStrFactory(self.locale,self.comparison_level,self.case_sensitive)
+            self.__str_factories[self.__str_factory] = True
+        return self.__str_factory
+
+    def iter_unicode_str(self):
+        '''Iterate over the keys as unicode_str, reusing the stored collation keys.
+        Keys that are not strings are returned unchanged.
+        '''
+        factory = self.str_factory
+        for sort_key,(key,_) in super(unicode_dict,self).items():
+            if isinstance(key,unicode_str_base) and self.__same_factory(key._factory):
+                yield key
+            elif isinstance(key,str):
+                yield factory.from_sort_key(key,sort_key)
+            else:
+                yield key
+
+    def sort_key(self, key):
+        '''Return the collation key used to store key in the dict
+        '''
+        return self.__in_key(key)
+
+    def iter_sort_keys(self):
+        '''Iterate over the collation keys of the dict, in the same order of the keys
+        '''
+        return iter(super(unicode_dict,self).keys())
+
+    def __to_stored(self, items, sort_keys=None):
+        '''Convert (key, value) pairs to the stored (collation key, (key, value)) pairs
+        '''
+        if sort_keys is None:
+            in_key = self.__in_key
+            return ((in_key(key),(key,val)) for key,val in items)
+        return ((sort_key,(key,val)) for sort_key,(key,val) in _zip_sort_keys(sort_keys,items))
+
+    def __update_items(self, items, sort_keys=None):
+        super(unicode_dict,self).update(self.__to_stored(items, sort_keys))
+
+    def __same_collation(self, other):
+        return self.locale == other.locale and self.comparison_level == other.comparison_level and \
+            self.case_sensitive == other.case_sensitive
+
+    def _update_stored(self, stored):
+        '''Store an iterable of (collation key, (key, value)) pairs.
+        Subclasses that keep other structures in sync with the keys override this.
+        '''
+        super(unicode_dict,self).update(stored)
+
     def __setitem__(self, key, value):
         super(unicode_dict,self).__setitem__(self.__in_key(key),(key,value))
 
@@ -68,10 +159,9 @@ class unicode_dict(dict):
             raise KeyError(key)
 
     def get(self, key, default = None):
-        try:
-            return super(unicode_dict,self).__getitem__(self.__in_key(key))[1]
-        except KeyError:
-            return default
+        # dict.get doesn't call __missing__ of the subclasses
+        stored = super(unicode_dict,self).get(self.__in_key(key))
+        return default if stored is None else stored[1]
     
     def __delitem__(self, key):
         try:
@@ -90,38 +180,76 @@ class unicode_dict(dict):
         super(unicode_dict,self).clear()
     
     def keys(self):
-        return list(self)
+        '''D.keys() -> a set-like live view of the keys of D
+        '''
+        return unicode_dict_keys(self)
 
     def values(self):
-        return [i for _,i in super(unicode_dict,self).values()]
+        '''D.values() -> a live view of the values of D
+        '''
+        return unicode_dict_values(self)
 
     def items(self):
-        return [i for i in super(unicode_dict,self).values()]
-    
+        '''D.items() -> a set-like live view of the (key, value) pairs of D
+        '''
+        return unicode_dict_items(self)
+
+    viewkeys = keys
+    viewvalues = values
+    viewitems = items
+
     def iterkeys(self):
         return iter(self)
 
     def itervalues(self):
-        for _,i in super(unicode_dict,self).values():
-            yield i
+        return self._iter_values()
 
     def iteritems(self):
-        for i in super(unicode_dict,self).values():
+        return self._iter_items()
+
+    def _iter_values(self):
+        for _,i in super(unicode_dict,self).values():
             yield i
 
+    def _iter_items(self):
+        # The (key, value) pairs are stored as they are returned
+        return iter(super(unicode_dict,self).values())
+
     def update(self, *args,**kwargs):
+        '''Update the dict from a mapping or an iterable of (key, value) pairs and from kwargs.
+        The collation keys of a unicode_dict with the same collation are reused.
+        '''
         if len(args) > 1:
             raise TypeError('expected at most 1 arguments, got %d' % len(args))
-        
-        if isinstance(args[0],Mapping):
-            vals = list(args[0].items())
-        else:
-            vals = args[0]
-        for key,val in vals:
-            self.__setitem__(key,val)
 
-        for key,val in kwargs:
-            self.__setitem__(key,val)
+        if args:
+            if isinstance(args[0],unicode_dict) and self.__same_collation(args[0]):
+                self._update_stored(iter(super(unicode_dict,args[0]).items()))
+            else:
+                if isinstance(args[0],Mapping):
+                    vals = list(args[0].items())
+                else:
+                    vals = args[0]
+                self._update_stored(self.__to_stored(vals))
+
+        if kwargs:
+            self._update_stored(self.__to_stored(list(kwargs.items())))
+
+    def __or__(self, other):
+        '''x.__or__(y) <==> x|y
+        Return a copy of x updated with y
+        '''
+        if not isinstance(other,Mapping):
+            return NotImplemented
+        ret = self.copy()
+        ret.update(other)
+        return ret
+
+    def __ior__(self, other):
+        '''x.__ior__(y) <==> x|=y
+        '''
+        self.update(other)
+        return self
 
     __marker = object()
 
@@ -176,16 +304,157 @@ class unicode_dict(dict):
         unicode_dict are equal only with themselves
 
         '''
-        if not isinstance(other,self.__class__):
+        if not isinstance(other,unicode_dict) or len(self) != len(other):
             return False
-        return self.locale == other.locale and self.comparison_level == other.comparison_level and \
-            self.case_sensitive == other.case_sensitive and \
-            unicode_set(iter(self.keys())) == unicode_set(iter(other.keys())) and \
-            all(self[k] == other[k] for k in self)
+        if not self.__same_collation(other):
+            return False
+        # Same collation: compare the stored values by collation key
+        marker = self.__marker
+        other_get = super(unicode_dict,other).get
+        for sort_key,(_,val) in super(unicode_dict,self).items():
+            stored = other_get(sort_key,marker)
+            if stored is marker or stored[1] != val:
+                return False
+        return True
 
     def __ne__(self, other):
         return not self == other
 
+class unicode_dict_keys(KeysView):
+    '''Live view of the keys of a unicode_dict.
+    Membership uses the collation of the dict. The set operations return a
+    unicode_set with the same collation: they probe the stored collation keys
+    of the dict, and of the other operand when it is the keys view of a
+    unicode_dict with the same collation, without computing them again.
+    '''
+
+    def __new_set(self):
+        mapping = self._mapping
+        return unicode_set(
+            locale = mapping.locale,
+            comparison_level = mapping.comparison_level,
+            case_sensitive = mapping.case_sensitive)
+
+    def __table(self, other, ret, elements=False):
+        '''Return the collation key -> key table of other with the collation of
+        ret. If elements is True the elements of other are added to ret.
+        '''
+        if isinstance(other,unicode_dict_keys):
+            mapping = other._mapping
+            if mapping.locale == ret.locale and mapping.comparison_level == ret.comparison_level \
+                    and mapping.case_sensitive == ret.case_sensitive:
+                return _stored_keys(mapping)
+        elif elements and isinstance(other,unicode_set) and other.keys_only:
+            raise TypeError('a keys_only unicode_set has no strings to add to a unicode_set')
+        return ret._table(other)
+
+    def isdisjoint(self, other):
+        mine = _stored_keys(self._mapping)
+        theirs = self.__table(other, self.__new_set())
+        if len(theirs) < len(mine):
+            mine, theirs = theirs, mine
+        for sort_key in mine:
+            if sort_key in theirs:
+                return False
+        return True
+
+    def __and__(self, other):
+        ret = self.__new_set()
+        mine = _stored_keys(self._mapping)
+        theirs = self.__table(other, ret)
+        if len(theirs) < len(mine):
+            ret._update_stored((k,mine[k]) for k in theirs if k in mine)
+        else:
+            ret._update_stored((k,key) for k,key in mine.items() if k in theirs)
+        return ret
+
+    def __or__(self, other):
+        ret = self.__new_set()
+        mine = _stored_keys(self._mapping)
+        theirs = self.__table(other, ret, True)
+        ret._update_stored(iter(mine.items()))
+        ret._update_stored((k,key) for k,key in theirs.items() if k not in mine)
+        return ret
+
+    def __sub__(self, other):
+        ret = self.__new_set()
+        mine = _stored_keys(self._mapping)
+        theirs = self.__table(other, ret)
+        ret._update_stored((k,key) for k,key in mine.items() if k not in theirs)
+        return ret
+
+    def __xor__(self, other):
+        ret = self.__new_set()
+        mine = _stored_keys(self._mapping)
+        theirs = self.__table(other, ret, True)
+        ret._update_stored((k,key) for k,key in mine.items() if k not in theirs)
+        ret._update_stored((k,key) for k,key in theirs.items() if k not in mine)
+        return ret
+
+    def __rsub__(self, other):
+        ret = self.__new_set()
+        mine = _stored_keys(self._mapping)
+        theirs = self.__table(other, ret, True)
+        ret._update_stored((k,key) for k,key in theirs.items() if k not in mine)
+        return ret
+
+    __rand__ = __and__
+    __ror__ = __or__
+    __rxor__ = __xor__
+
+class _stored_keys(object):
+    '''Read-only collation key -> key table of a unicode_dict, over its storage
+    '''
+
+    def __init__(self, mapping):
+        self.__mapping = mapping
+
+    def __len__(self):
+        return len(self.__mapping)
+
+    def __contains__(self, sort_key):
+        return dict.__contains__(self.__mapping, sort_key)
+
+    def __iter__(self):
+        return dict.__iter__(self.__mapping)
+
+    def __getitem__(self, sort_key):
+        return dict.__getitem__(self.__mapping, sort_key)[0]
+
+    def iteritems(self):
+        for sort_key,(key,_) in super(unicode_dict,self.__mapping).items():
+            yield sort_key, key
+
+    items = iteritems
+
+class unicode_dict_values(ValuesView):
+    '''Live view of the values of a unicode_dict
+    '''
+
+    def __iter__(self):
+        return self._mapping._iter_values()
+
+    def __contains__(self, value):
+        for i in self:
+            if i is value or i == value:
+                return True
+        return False
+
+class unicode_dict_items(ItemsView):
+    '''Live view of the (key, value) pairs of a unicode_dict.
+    Membership uses the collation of the dict for the keys.
+    '''
+
+    __marker = object()
+
+    def __iter__(self):
+        return self._mapping._iter_items()
+
+    def __contains__(self, item):
+        key, value = item
+        stored = self._mapping.get(key, self.__marker)
+        return stored is not self.__marker and (stored is value or stored == value)
+
 ##
 # Helper for pickle
 def unicode_dict_from_data(args,kwargs = None):
@@ -197,6 +466,236 @@ def unicode_dict_from_data(args,kwargs = None):
         setattr(r,i,v)
     return r
 
+class unicode_counter(unicode_dict):
+    '''unicode_dict that counts equal strings, like collections.Counter.
+    A missing key counts 0. Each counted key costs a single collation key
+    computation; the key stored is the first one counted.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        '''Initialize a counter from an iterable of keys or from a mapping of counts.
+        The kwargs set the comparison details.
+        '''
+        if len(args) > 1:
+            raise TypeError('expected at most 1 arguments, got %d' % len(args))
+        if len(args) == 1 and isinstance(args[0],unicode_dict):
+            for i in ('locale', 'comparison_level', 'case_sensitive'):
+                kwargs.setdefault(i, getattr(args[0], i))
+        super(unicode_counter,self).__init__(**kwargs)
+        if len(args) == 1:
+            self.update(args[0])
+
+    @classmethod
+    def fromkeys(cls, keys, value=None, sort_keys=None, **kwargs):
+        # Like collections.Counter: counter(keys) counts the keys
+        raise NotImplementedError('unicode_counter.fromkeys() is undefined. Use unicode_counter(iterable) instead.')
+
+    def __getitem__(self, key):
+        stored = dict.get(self, self.sort_key(key))
+        return 0 if stored is None else stored[1]
+
+    def __same_collation(self, other):
+        return isinstance(other,unicode_counter) and self.locale == other.locale and \
+            self.comparison_level == other.comparison_level and \
+            self.case_sensitive == other.case_sensitive
+
+    def increment(self, key, n=1):
+        '''Add n to the count of key and return the new count
+        '''
+        sort_key = self.sort_key(key)
+        stored = dict.get(self, sort_key)
+        if stored is not None:
+            key, n = stored[0], stored[1] + n
+        dict.__setitem__(self, sort_key, (key,n))
+        return n
+
+    def __add_counts(self, counts, sign=1):
+        '''Add the counts of a collation key -> (key, count) mapping
+        '''
+        get = dict.get
+        setitem = dict.__setitem__
+        for sort_key,(key,n) in counts.items():
+            stored = get(self, sort_key)
+            if stored is None:
+                setitem(self, sort_key, (key,sign * n))
+            else:
+                setitem(self, sort_key, (stored[0],stored[1] + sign * n))
+
+    def __counts(self, arg):
+        '''Return the counts of arg as a collation key -> (key, count) mapping.
+        arg is an iterable of keys or a mapping of counts.
+        '''
+        if self.__same_collation(arg):
+            return super(unicode_dict,arg)
+        sort_key = self.sort_key
+        counts = {}
+        get = counts.get
+        if isinstance(arg,Mapping):
+            for key,n in arg.items():
+                k = sort_key(key)
+                stored = get(k)
+                counts[k] = (key,n) if stored is None else (stored[0],stored[1] + n)
+        else:
+            for key in arg:
+                k = sort_key(key)
+                stored = get(k)
+                counts[k] = (key,1) if stored is None else (stored[0],stored[1] + 1)
+        return counts
+
+    def update(self, *args, **kwargs):
+        '''Add the counts of an iterable of keys or of a mapping of counts.
+        The keys are counted in a local table first, so the counter is updated
+        once per distinct key.
+        '''
+        if len(args) > 1:
+            raise TypeError('expected at most 1 arguments, got %d' % len(args))
+        if args:
+            self.__add_counts(self.__counts(args[0]))
+        if kwargs:
+            self.__add_counts(self.__counts(kwargs))
+
+    def subtract(self, *args, **kwargs):
+        '''Subtract the counts of an iterable of keys or of a mapping of counts.
+        Counts can become zero or negative.
+        '''
+        if len(args) > 1:
+            raise TypeError('expected at most 1 arguments, got %d' % len(args))
+        if args:
+            self.__add_counts(self.__counts(args[0]), -1)
+        if kwargs:
+            self.__add_counts(self.__counts(kwargs), -1)
+
+    def most_common(self, n=None):
+        '''Return the n most common (key, count) pairs, most common first.
+        If n is None return all of them. The pairs are selected with a heap,
+        so only n of them are sorted.
+        '''
+        items = iter(super(unicode_dict,self).values())
+        if n is None:
+            return sorted(items, key=itemgetter(1), reverse=True)
+        return heapq.nlargest(n, items, key=itemgetter(1))
+
+    def elements(self):
+        '''Iterate over the keys repeating each one as many times as its count
+        '''
+        for key,n in super(unicode_dict,self).values():
+            for _ in range(n):
+                yield key
+
+    def __max_counts(self, counts):
+        '''Keep the largest count of each key of a collation key -> (key, count) mapping
+        '''
+        get = dict.get
+        setitem = dict.__setitem__
+        for sort_key,(key,n) in counts.items():
+            stored = get(self, sort_key)
+            if stored is None:
+                setitem(self, sort_key, (key,n))
+            elif n > stored[1]:
+                setitem(self, sort_key, (stored[0],n))
+
+    def __keep_positive(self):
+        for sort_key,(_,n) in list(super(unicode_dict,self).items()):
+            if n <= 0:
+                dict.__delitem__(self, sort_key)
+
+    def __add__(self, other):
+        '''Return a new counter with the sum of the counts of both counters.
+        Like collections.Counter, only the positive counts are kept.
+        '''
+        if not isinstance(other,unicode_counter):
+            return NotImplemented
+        ret = self.copy()
+        ret.update(other)
+        ret.__keep_positive()
+        return ret
+
+    def __iadd__(self, other):
+        if not isinstance(other,unicode_counter):
+            return NotImplemented
+        self.update(other)
+        self.__keep_positive()
+        return self
+
+    def __or__(self, other):
+        '''Return a new counter with the maximum of the counts of both counters.
+        Like collections.Counter, only the positive counts are kept.
+        '''
+        if not isinstance(other,unicode_counter):
+            return NotImplemented
+        ret = self.copy()
+        ret.__max_counts(ret.__counts(other))
+        ret.__keep_positive()
+        return ret
+
+    def __ior__(self, other):
+        if not isinstance(other,unicode_counter):
+            return NotImplemented
+        self.__max_counts(self.__counts(other))
+        self.__keep_positive()
+        return self
+
+    def __reduce__(self):
+        return (unicode_counter_from_data, ([dict(iter(self.items()))], {
+            'locale':self.locale,
+            'comparison_level':self.comparison_level,
+            'case_sensitive': self.case_sensitive
+            }))
+
+def unicode_counter_from_data(args,kwargs = None):
+    if kwargs is None:
+        kwargs = {}
+    return unicode_counter(*args,**kwargs)
+
+class unicode_frozendict(unicode_dict):
+    '''Immutable and hashable unicode_dict.
+    The items are fixed when the dict is built, so it can be used as a dict key
+    (if the values are hashable) or shared between threads without locks.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super(unicode_frozendict,self).__init__(*args,**kwargs)
+        self.__hash = None
+
+    def __immutable(self, *args, **kwargs):
+        raise TypeError("'%s' object is immutable" % self.__class__.__name__)
+
+    __setitem__ = __delitem__ = clear = update = pop = popitem = setdefault = __immutable
+
+    def __hash__(self):
+        # The collation keys identify the keys for the chosen collation
+        if self.__hash is None:
+            self.__hash = hash((self.locale, self.comparison_level, self.case_sensitive,
+                frozenset((sort_key,val) for sort_key,(_,val) in super(unicode_dict,self).items())))
+        return self.__hash
+
+    def copy(self):
+        '''Return self, since the dict can't change
+        '''
+        return self
+
+    def __or__(self, other):
+        if not isinstance(other,Mapping):
+            return NotImplemented
+        ret = unicode_dict(self)
+        ret.update(other)
+        return self.__class__(ret)
+
+    def __ior__(self, other):
+        return self | other
+
+    def __reduce__(self):
+        return (unicode_frozendict_from_data, ([list(self.items())], {
+            'locale':self.locale,
+            'comparison_level':self.comparison_level,
+            'case_sensitive': self.case_sensitive
+            }))
+
+def unicode_frozendict_from_data(args,kwargs = None):
+    if kwargs is None:
+        kwargs = {}
+    return unicode_frozendict(*args,**kwargs)
+
 class unicode_defaultdict(unicode_dict):
     def __init__(self, *args, **kwargs):
         '''Initialize a unicode dictionary.  The signature is changed because the 
@@ -211,24 +710,30 @@ class unicode_defaultdict(unicode_dict):
         else:
             self.default_factory = args[0]
             args = args[1:]
-            if not isinstance(self.default_factory, Callable):
+            if self.default_factory is not None and not isinstance(self.default_factory, Callable):
                 raise TypeError("first argument must be callable")
 
         super(unicode_defaultdict,self).__init__(*args,**kwargs)
 
     def __getitem__(self,key):
-        self.__key = key
-        try:
-            return super(unicode_defaultdict,self).__getitem__(key)
-        finally:
-            del self.__key
+        # The collation key is computed once and reused to insert the default
+        sort_key = self.sort_key(key)
+        stored = dict.get(self,sort_key)
+        if stored is None:
+            return self.__default(key,sort_key)
+        return stored[1]
 
     def __missing__(self,key):
+        return self.__default(key,self.sort_key(key))
+
+    def __default(self,key,sort_key):
         if self.default_factory is None:
             raise KeyError(key)
-        ret = self.default_factory()
-        super(unicode_defaultdict,self).__setitem__(self.__key,ret)
-        return (None,ret) # Use None because it is used by the underlying implementation
+        # If another thread inserted the key in the meantime its value is kept
+        return dict.setdefault(self,sort_key,(key,self.default_factory()))[1]
+
+    def copy(self):
+        return self.__class__(self.default_factory, self)
 
     def __reduce__(self):
         items = list(self.items())
@@ -1,6 +1,10 @@
 #!/usr/bin/python
 # -*- coding: utf8 -*-
 from icu import Collator, Locale, UCollAttribute, UCollAttributeValue
+from collections import Iterable
+
+
+from .unicode_str import UnicodeStrFactory, unicode_str_base
 try:
     from _thread import get_ident as _get_ident
 except ImportError:
@@ -14,32 +18,50 @@ class unicode_set(set):
 
     def __init__(self, *args, **kwargs):
         '''Initialize a unicode set.  The signature is changed because the 
-        kwargs are used to set the comparison details
-
+        kwargs are used to set the comparison details.
+        With keys_only=True the set stores only the collation keys of the
+        elements: membership and the set operations work the same, but the
+        iteration returns the collation keys instead of the elements.
         '''
         if len(args) > 1:
             raise TypeError('expected at most 1 arguments, got %d' % len(args))
 
-        if len(args) == 1 and isinstance(args[0],self.__class__):
+        if len(args) == 1 and isinstance(args[0],unicode_set):
             locale = args[0].locale if 'locale' not in kwargs else kwargs.pop('locale')
             comparison_level = args[0].comparison_level if 'comparison_level' \
                 not in kwargs else kwargs.pop('comparison_level')
             case_sensitive = args[0].case_sensitive if 'case_sensitive' \
                 not in kwargs else kwargs.pop('case_sensitive')
+            keys_only = args[0].keys_only if 'keys_only' not in kwargs else kwargs.pop('keys_only')
         else:
             locale = kwargs.pop('locale','en_US')
             comparison_level = max(0,min(3,kwargs.pop('comparison_level',0)))
             case_sensitive = kwargs.pop('case_sensitive', False)
+            keys_only = kwargs.pop('keys_only', False)
         self.__locale = Locale(locale)
         self.__collator = Collator.createInstance(self.__locale)
         self.__collator.setStrength(comparison_level)
         self.__collator.setAttribute(UCollAttribute.CASE_LEVEL,
             UCollAttributeValue.ON if case_sensitive else UCollAttributeValue.OFF)
         self.__values = {} # set implementation
+        self.__shared = False # __values is shared with a copy
+        self.__keys_only = keys_only # __values maps every collation key to itself
+        self.__str_factories = {} # UnicodeStrFactory -> same collation of the set
+        self.__str_factory = None
         if len(args) == 1:
-            vals = args[0]
-            for val in vals:
-                self.add(val)
+            self.__update(args)
+
+    @classmethod
+    def from_iterable(cls, iterable, sort_keys=None, **kwargs):
+        '''Build a set from an iterable.
+        The collation keys are computed in a single pass, sort_keys can provide
+        them already computed (in the same order of iterable, ValueError if
+        the lengths differ).
+        The kwargs set the comparison details.
+        '''
+        ret = cls(**kwargs)
+        ret.__update_values(iterable, sort_keys)
+        return ret
 
     @property
     def locale(self):
@@ -53,14 +75,144 @@ class unicode_set(set):
     def case_sensitive(self):
         return self.__collator.getAttribute(UCollAttribute.CASE_LEVEL) == UCollAttributeValue.ON
 
+    @property
+    def keys_only(self):
+        return self.__keys_only
+
     def __in_key(self,key):
+        if isinstance(key,unicode_str_base) and self.__same_factory(key._factory):
+            return key.sort_key()
         return self.__collator.getSortKey(key) if isinstance(key,str) else key
 
+    def __same_factory(self,factory):
+        try:
+            return self.__str_factories[factory]
+        except KeyError:
+            same = self.__str_factories[factory] = factory.locale == self.locale and \
+                factory.comparison_level == self.comparison_level and \
+                factory.case_sensitive == self.case_sensitive
+            return same
+
+    @property
+    def str_factory(self):
+        '''UnicodeStrFactory with the same collation of the set
+        '''
+        if self.__str_factory is None:
+            self.__str_factory = UnicodeStrFactory(self.locale,self.comparison_level,self.case_sensitive)
+            self.__str_factories[self.__str_factory] = True
+        return self.__str_factory
+
+    def iter_unicode_str(self):
+        '''Iterate over the elements as unicode_str, reusing the stored collation keys.
+        Elements that are not strings are returned unchanged.
+        '''
+        if self.__keys_only:
+            raise TypeError('a keys_only unicode_set has no strings')
+        factory = self.str_factory
+        for sort_key,val in self.__values.items():
+            if isinstance(val,unicode_str_base) and self.__same_factory(val._factory):
+                yield val
+            elif isinstance(val,str):
+                yield factory.from_sort_key(val,sort_key)
+            else:
+                yield val
+
+    def __update_values(self, values, sort_keys=None):
+        if sort_keys is None:
+            in_key = self.__in_key
+            if self.__keys_only:
+                values = ((k,k) for k in map(in_key,values))
+            else:
+                values = ((in_key(val),val) for val in values)
+        elif self.__keys_only:
+            values = ((k,k) for k,_ in _zip_sort_keys(sort_keys,values))
+        else:
+            values = _zip_sort_keys(sort_keys,values)
+        self._update_stored(values)
+
+    def _update_stored(self, stored):
+        '''Store the (collation key, element) pairs of stored, a table or an iterable.
+        Subclasses can extend it to follow the elements added by the updates.
+        '''
+        self.__writable().update(stored)
+
+    def sort_key(self, val):
+        '''Return the collation key used to store val in the set
+        '''
+        return self.__in_key(val)
+
+    def iter_sort_keys(self):
+        '''Iterate over the collation keys of the set, in the same order of the elements
+        '''
+        return iter(self.__values.keys())
+
+    def _with_class(self, cls):
+        '''Return an instance of cls with the collation and the elements of self.
+        The storage is shared until one of the two sets is changed.
+        '''
+        ret = cls(locale = self.locale,
+            comparison_level = self.comparison_level,
+            case_sensitive = self.case_sensitive)
+        ret.__values = self.__values
+        ret.__shared = self.__shared = True
+        ret.__keys_only = self.__keys_only
+        return ret
+
+    def __writable(self):
+        '''Return the storage, copying it first if it is shared with another set
+        '''
+        if self.__shared:
+            self.__values = dict(self.__values)
+            self.__shared = False
+        return self.__values
+
     def __in_equality(self,other):
         return self.locale == other.locale and\
             self.comparison_level == other.comparison_level and \
             self.case_sensitive == other.case_sensitive
 
+    def __same_collation(self,other):
+        return isinstance(other,unicode_set) and self.__in_equality(other)
+
+    def _table(self,other):
+        '''Return the collation key -> element table of other with the collation of self.
+        The table of a unicode_set with the same collation is returned without copying it.
+        '''
+        if other is self or self.__same_collation(other):
+            return other.__values
+        # Collation keys computed in a single pass, without a temporary set
+        in_key = self.__in_key
+        if isinstance(other,unicode_set):
+            other.__check_elements()
+            other = iter(other.__values.values())
+        return dict((in_key(i),i) for i in other)
+
+    def __check_elements(self):
+        if self.__keys_only:
+            raise TypeError("the elements of a keys_only unicode_set can't be compared with another collation")
+
+    def __check_strings(self,other):
+        '''Check that other can add its elements to self: a keys_only set has
+        only collation keys to add
+        '''
+        if isinstance(other,unicode_set) and other.__keys_only and not self.__keys_only:
+            raise TypeError('a keys_only unicode_set has no strings to add to a unicode_set')
+
+    def _remove_stored(self, sort_key):
+        '''Remove the element stored with the collation key sort_key and return it
+        '''
+        return self.__writable().pop(sort_key)
+
+    def __is_operand(self,other):
+        '''Check if other can be an operand of the set operators: a unicode_set
+        with the same collation or any iterable that is not a string
+        '''
+        if isinstance(other,unicode_set):
+            if not self.__in_equality(other):
+                raise TypeError("can only compare to a unicode_set with the same caracteristic")
+            return True
+        return isinstance(other,Iterable) and not isinstance(other,str)
+
     # LA: Code for EC
 
     # def get_stored_version(self, val):
@@ -78,24 +230,30 @@ class unicode_set(set):
         
         This has no effect if the element is already present.
         '''
-        self.__values[self.__in_key(val)] = val
+        key = self.__in_key(val)
+        self.__writable()[key] = key if self.__keys_only else val
 
     def clear(self):
         '''Remove all elements from this set.
         '''
-        self.__values.clear()
+        if self.__shared:
+            self.__values = {}
+            self.__shared = False
+        else:
+            self.__values.clear()
     
     def copy(self):
         '''Return a shallow copy of a set.
+        The copy shares the elements with the set until one of them is changed.
         '''
-        return self.__class__(self)
+        return self._with_class(self.__class__)
     
     def difference(self, *args):
         '''Return the difference of two or more sets as a new set.
         
         (i.e. all elements that are in this set but not the others.)
         '''
-        ret = self.__class__(self)
+        ret = self.copy()
         ret.difference_update(*args)
 
         return ret
@@ -108,15 +266,16 @@ class unicode_set(set):
                 self.difference_update(arg)
         else:
             arg = args[0]
-            if isinstance(arg,self.__class__) and self.__in_equality(arg):
+            if isinstance(arg,unicode_set) and self.__in_equality(arg):
                 for i in arg.__values.keys():
                     if i in self.__values:
-                        del self.__values[i]
+                        del self.__writable()[i]
             else:
+                in_key = self.__in_key
                 for i in arg:
-                    i = self.__in_key(i)
+                    i = in_key(i)
                     if i in self.__values:
-                        del self.__values[i]
+                        del self.__writable()[i]
 
     def discard(self,val):
         '''Remove an element from a set if it is a member.
@@ -133,109 +292,185 @@ class unicode_set(set):
         
         (i.e. elements that are common to all of the sets.)
         '''
-        ret = self.__class__(self)
+        ret = self.copy()
         ret.intersection_update(*args)
         
         return ret
 
     def intersection_update(self,*args):
-        '''Update a set with the intersection of itself and another.
+        '''Update a set with the intersection of itself and others.
         '''
         if len(args) > 1:
-            for arg in args:
-                self.intersection_update(arg)
-        else:
-            if isinstance(args[0],self.__class__) and self.__in_equality(args[0]):
-                arg = args[0]
+            # Intersect starting from the smallest table, so every other table
+            # is only probed with the keys still in the result
+            tables = sorted((self._table(arg) for arg in args), key=len)
+            values = self.__values
+            smallest = tables[0]
+            if len(smallest) < len(values):
+                result = dict((k,values[k]) for k in smallest if k in values)
+            else:
+                result = dict((k,v) for k,v in values.items() if k in smallest)
+            for table in tables[1:]:
+                if not result:
+                    break
+                for k in list(result.keys()):
+                    if k not in table:
+                        del result[k]
+            self.__values = result
+            self.__shared = False
+        elif args:
+            other = self._table(args[0])
+            values = self.__values
+            if len(other) < len(values):
+                # Keep the elements of self found looking up the smaller table
+                self.__values = dict((k,values[k]) for k in other if k in values)
+                self.__shared = False
             else:
-                arg = self.__class__(args[0],
-                    locale = self.locale, 
-                    case_sensitive = self.case_sensitive,
-                    comparison_level = self.comparison_level)
-            for k,v in list(self.__values.items()):
-                if v not in arg:
-                    del self.__values[k]
+                for k in list(values.keys()):
+                    if k not in other:
+                        del self.__writable()[k]
 
     def isdisjoint(self,other):
         '''Return True if two sets have a null intersection.
         '''
-        return len(self.intersection(other)) == 0
+        values = self.__values
+        if self.__same_collation(other):
+            other = other.__values
+            if len(other) < len(values):
+                values, other = other, values
+            for k in values:
+                if k in other:
+                    return False
+            return True
+        if isinstance(other,unicode_set):
+            other.__check_elements()
+        in_key = self.__in_key
+        for i in other:
+            if in_key(i) in values:
+                return False
+        return True
 
     def issubset(self,other):
         '''Report whether another set contains this set.
         '''
-        return self.__class__(other,
-            locale = self.locale, 
-            case_sensitive = self.case_sensitive, 
-            comparison_level = self.comparison_level).issuperset(self)
+        other = self._table(other)
+        if len(self.__values) > len(other):
+            return False
+        for k in self.__values:
+            if k not in other:
+                return False
+        return True
 
     def issuperset(self,other):
         '''Report whether this set contains another set.
         '''
-        return len(self.__class__(other, 
-            locale = self.locale, 
-            case_sensitive = self.case_sensitive, 
-            comparison_level = self.comparison_level)) == len(self.intersection(other))
+        values = self.__values
+        if self.__same_collation(other):
+            if len(other.__values) > len(values):
+                return False
+            for k in other.__values:
+                if k not in values:
+                    return False
+            return True
+        if isinstance(other,unicode_set):
+            other.__check_elements()
+        in_key = self.__in_key
+        for i in other:
+            if in_key(i) not in values:
+                return False
+        return True
 
 
     def pop(self):
         '''Remove and return an arbitrary set element.
         Raises KeyError if the set is empty.
         '''
-        return self.__values.popitem()[1]
+        return self.__writable().popitem()[1]
 
     def remove(self,val):
         '''Remove an element from a set; it must be a member.
         
         If the element is not a member, raise a KeyError.
         '''
-        del self.__values[self.__in_key(val)]
+        key = self.__in_key(val)
+        if key not in self.__values:
+            raise KeyError(val)
+        del self.__writable()[key]
 
     def symmetric_difference(self,other):
         '''Return the symmetric difference of two sets as a new set.
         
         (i.e. all elements that are in exactly one of the sets.)
         '''
-        ret = self.__class__(self)
-        ret.update(other)
-        ret.difference_update(self.intersection(other))
+        ret = self.copy()
+        ret.symmetric_difference_update(other)
 
         return ret
 
     def symmetric_difference_update(self,other):
         '''Update a set with the symmetric difference of itself and another.
         '''
-        bck = self.__class__(self)
-        self.update(other)
-        self.difference_update(bck.intersection(other))
+        if other is self:
+            self.clear()
+            return
+        self.__check_strings(other)
+        other = self._table(other)
+        values = self.__writable()
+        keys_only = self.__keys_only
+        for k,v in other.items():
+            if k in values:
+                del values[k]
+            else:
+                values[k] = k if keys_only else v
 
     def union(self,*others):
         '''Return the union of sets as a new set.
         
         (i.e. all elements that are in either set.)
         '''
-        ret = self.__class__(self)
+        ret = self.copy()
         ret.update(*others)
 
         return ret
 
+    @classmethod
+    def union_all(cls, sets, **kwargs):
+        '''Return the union of an iterable of sets (or iterables) as a new set.
+        The elements are added to a single table, without intermediate sets.
+        The collation is the one of the first set unless set by the kwargs.
+        '''
+        sets = iter(sets)
+        for first in sets:
+            ret = cls(first, **kwargs)
+            break
+        else:
+            return cls(**kwargs)
+        ret.__update(sets)
+        return ret
+
     def update(self,*others):
         '''Update a set with the union of itself and others.
         '''
+        self.__update(others)
+
+    def __update(self,others):
         for other in others:
-            if isinstance(other,self.__class__) and self.__in_equality(other):
-                self.__values.update(other.__values)
+            self.__check_strings(other)
+            if isinstance(other,unicode_set) and self.__in_equality(other):
+                if self.__keys_only and not other.__keys_only:
+                    self._update_stored((k,k) for k in other.__values)
+                else:
+                    self._update_stored(other.__values)
             else:
-                self.__values.update({self.__in_key(i):i for i in other})
+                if isinstance(other,unicode_set):
+                    other.__check_elements()
+                self.__update_values(other)
 
     def __and__(self,other):
         '''x.__and__(y) <==> x&y
         '''
-        if not isinstance(other,self.__class__):
-            raise TypeError("can only compare to a unicode_set")
-
-        if not self.__in_equality(other):
-            raise TypeError("can only compare to a unicode_set with the same caracteristic")
+        if not self.__is_operand(other):
+            return NotImplemented
 
         return self.intersection(other)
 
@@ -247,13 +482,18 @@ class unicode_set(set):
     def __eq__(self,other):
         '''x.__eq__(y) <==> x==y
         '''
-        return isinstance(other,self.__class__) and self.__in_equality(other) \
-            and set(self.__values.keys()) == set(other.__values.keys())
+        if not self.__same_collation(other) or len(self.__values) != len(other.__values):
+            return False
+        other = other.__values
+        for k in self.__values:
+            if k not in other:
+                return False
+        return True
 
     def __ge__(self,other):
         '''x.__ge__(y) <==> x>=y
         '''
-        if not isinstance(other,self.__class__):
+        if not isinstance(other,unicode_set):
             raise TypeError("can only compare to a unicode_set")
 
         if not self.__in_equality(other):
@@ -264,22 +504,19 @@ class unicode_set(set):
     def __gt__(self,other):
         '''x.__gt__(y) <==> x>y
         '''
-        if not isinstance(other,self.__class__):
+        if not isinstance(other,unicode_set):
             raise TypeError("can only compare to a unicode_set")
 
         if not self.__in_equality(other):
             raise TypeError("can only compare to a unicode_set with the same caracteristic")
 
-        return self.issuperset(other) and self != other
+        return len(self.__values) > len(other.__values) and self.issuperset(other)
 
     def __iand__(self,other):
         '''x.__iand__(y) <==> x&=y
         '''
-        if not isinstance(other,self.__class__):
-            raise TypeError("can only compare to a unicode_set")
-
-        if not self.__in_equality(other):
-            raise TypeError("can only compare to a unicode_set with the same caracteristic")
+        if not self.__is_operand(other):
+            return NotImplemented
 
         self.intersection_update(other)
         return self
@@ -287,22 +524,17 @@ class unicode_set(set):
     def __ior__(self,other):
         '''x.__ior__(y) <==> x|=y
         '''
-        if not isinstance(other,self.__class__):
-            raise TypeError("can only compare to a unicode_set")
+        if not self.__is_operand(other):
+            return NotImplemented
 
-        if not self.__in_equality(other):
-            raise TypeError("can only compare to a unicode_set with the same caracteristic")
         self.update(other)
         return self
 
     def __isub__(self,other):
         '''x.__isub__(y) <==> x-=y
         '''
-        if not isinstance(other,self.__class__):
-            raise TypeError("can only compare to a unicode_set")
-
-        if not self.__in_equality(other):
-            raise TypeError("can only compare to a unicode_set with the same caracteristic")
+        if not self.__is_operand(other):
+            return NotImplemented
 
         self.difference_update(other)
         return self
@@ -315,11 +547,8 @@ class unicode_set(set):
     def __ixor__(self,other):
         '''x.__ixor__(y) <==> x^=y
         '''
-        if not isinstance(other,self.__class__):
-            raise TypeError("can only compare to a unicode_set")
-
-        if not self.__in_equality(other):
-            raise TypeError("can only compare to a unicode_set with the same caracteristic")
+        if not self.__is_operand(other):
+            return NotImplemented
 
         self.symmetric_difference_update(other)
         return self
@@ -327,7 +556,7 @@ class unicode_set(set):
     def __le__(self,other):
         '''x.__le__(y) <==> x<=y
         '''
-        if not isinstance(other,self.__class__):
+        if not isinstance(other,unicode_set):
             raise TypeError("can only compare to a unicode_set")
 
         if not self.__in_equality(other):
@@ -343,13 +572,13 @@ class unicode_set(set):
     def __lt__(self,other):
         '''x.__lt__(y) <==> x<y
         '''
-        if not isinstance(other,self.__class__):
+        if not isinstance(other,unicode_set):
             raise TypeError("can only compare to a unicode_set")
 
         if not self.__in_equality(other):
             raise TypeError("can only compare to a unicode_set with the same caracteristic")
 
-        return self.issubset(other) and self != other
+        return len(self.__values) < len(other.__values) and self.issubset(other)
 
     def __ne__(self,other):
         '''x.__ne__(y) <==> x!=y
@@ -359,24 +588,18 @@ class unicode_set(set):
     def __or__(self,other):
         '''x.__or__(y) <==> x|y
         '''
-        if not isinstance(other,self.__class__):
-            raise TypeError("can only compare to a unicode_set")
-
-        if not self.__in_equality(other):
-            raise TypeError("can only compare to a unicode_set with the same caracteristic")
+        if not self.__is_operand(other):
+            return NotImplemented
 
         return self.union(other)
 
     def __rand__(self,other):
         '''x.__rand__(y) <==> y&x
         '''
-        if not isinstance(other,self.__class__):
-            raise TypeError("can only compare to a unicode_set")
-
-        if not self.__in_equality(other):
-            raise TypeError("can only compare to a unicode_set with the same caracteristic")
+        if not self.__is_operand(other):
+            return NotImplemented
 
-        return other & self
+        return self.intersection(other)
 
     def __repr__(self, _repr_running={}):
         '''x.__repr__() <==> repr(x)
@@ -395,35 +618,33 @@ class unicode_set(set):
     def __ror__(self,other):
         '''x.__ror__(y) <==> y|x
         '''
-        if not isinstance(other,self.__class__):
-            raise TypeError("can only compare to a unicode_set")
-
-        if not self.__in_equality(other):
-            raise TypeError("can only compare to a unicode_set with the same caracteristic")
+        if not self.__is_operand(other):
+            return NotImplemented
 
-        return other | self
+        return self.union(other)
 
     def __rsub__(self,other):
         '''x.__rsub__(y) <==> y-x
         '''
-        if not isinstance(other,self.__class__):
-            raise TypeError("can only compare to a unicode_set")
+        if not self.__is_operand(other):
+            return NotImplemented
 
-        if not self.__in_equality(other):
-            raise TypeError("can only compare to a unicode_set with the same caracteristic")
-
-        return other - self
+        ret = unicode_set(
+            locale = self.locale,
+            case_sensitive = self.case_sensitive,
+            comparison_level = self.comparison_level,
+            keys_only = self.keys_only)
+        ret.update(other)
+        ret.difference_update(self)
+        return ret._with_class(self.__class__)
 
     def __rxor__(self,other):
         '''x.__rxor__(y) <==> y^x
         '''
-        if not isinstance(other,self.__class__):
-            raise TypeError("can only compare to a unicode_set")
+        if not self.__is_operand(other):
+            return NotImplemented
 
-        if not self.__in_equality(other):
-            raise TypeError("can only compare to a unicode_set with the same caracteristic")
-
-        return other ^ self
+        return self.symmetric_difference(other)
 
     def __sizeof__(self):
         '''S.__sizeof__() -> size of S in memory, in bytes
@@ -433,22 +654,16 @@ class unicode_set(set):
     def __sub__(self,other):
         '''x.__sub__(y) <==> x-y
         '''
-        if not isinstance(other,self.__class__):
-            raise TypeError("can only compare to a unicode_set")
-
-        if not self.__in_equality(other):
-            raise TypeError("can only compare to a unicode_set with the same caracteristic")
+        if not self.__is_operand(other):
+            return NotImplemented
 
         return self.difference(other)
 
     def __xor__(self,other):
         '''x.__xor__(y) <==> x^y
         '''
-        if not isinstance(other,self.__class__):
-            raise TypeError("can only compare to a unicode_set")
-
-        if not self.__in_equality(other):
-            raise TypeError("can only compare to a unicode_set with the same caracteristic")
+        if not self.__is_operand(other):
+            return NotImplemented
 
         return self.symmetric_difference(other)
 
@@ -459,15 +674,113 @@ class unicode_set(set):
         inst_dict.update({
             'locale':self.locale, 
             'comparison_level':self.comparison_level,
-            'case_sensitive': self.case_sensitive
+            'case_sensitive': self.case_sensitive,
+            'keys_only': self.keys_only
             })
         return (unicode_set_from_data, ([list(self.__values.values())],inst_dict))
 
 def unicode_set_from_data(args,kwargs = None):
     if kwargs is None:
         kwargs = {}
-    fwd_kwargs = {i:kwargs.pop(i) for i in ('locale', 'comparison_level', 'case_sensitive') if i in kwargs}
-    r = unicode_set(*args,**fwd_kwargs)
+    fwd_kwargs = {i:kwargs.pop(i) for i in ('locale', 'comparison_level', 'case_sensitive', 'keys_only') if i in kwargs}
+    if fwd_kwargs.get('keys_only'):
+        # The stored elements are the collation keys
+        r = unicode_set.from_iterable(args[0], args[0], **fwd_kwargs)
+    else:
+        r = unicode_set(*args,**fwd_kwargs)
     for i,v in kwargs.items():
         setattr(r,i,v)
     return r
+
+class unicode_frozenset(unicode_set):
+    '''Immutable and hashable unicode_set.
+    The elements are fixed when the set is built, so it can be used as a dict key
+    or shared between threads without locks. The operations that return a new
+    set return a unicode_frozenset.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super(unicode_frozenset,self).__init__(*args,**kwargs)
+        self.__hash = None
+
+    def __immutable(self, *args, **kwargs):
+        raise TypeError("'%s' object is immutable" % self.__class__.__name__)
+
+    add = clear = discard = pop = remove = update = __immutable
+    difference_update = intersection_update = symmetric_difference_update = __immutable
+
+    def __hash__(self):
+        # The collation keys identify the elements for the chosen collation
+        if self.__hash is None:
+            self.__hash = hash((self.locale, self.comparison_level, self.case_sensitive,
+                frozenset(self.iter_sort_keys())))
+        return self.__hash
+
+    def copy(self):
+        '''Return self, since the set can't change
+        '''
+        return self
+
+    def __mutable(self):
+        return self._with_class(unicode_set)
+
+    def difference(self, *args):
+        ret = self.__mutable()
+        ret.difference_update(*args)
+        return ret._with_class(self.__class__)
+
+    def intersection(self, *args):
+        ret = self.__mutable()
+        ret.intersection_update(*args)
+        return ret._with_class(self.__class__)
+
+    def symmetric_difference(self, other):
+        ret = self.__mutable()
+        ret.symmetric_difference_update(other)
+        return ret._with_class(self.__class__)
+
+    def union(self, *others):
+        ret = self.__mutable()
+        ret.update(*others)
+        return ret._with_class(self.__class__)
+
+    def __iand__(self, other):
+        return self & other
+
+    def __ior__(self, other):
+        return self | other
+
+    def __isub__(self, other):
+        return self - other
+
+    def __ixor__(self, other):
+        return self ^ other
+
+    def __reduce__(self):
+        return (unicode_frozenset_from_data, ([list(self)], {
+            'locale':self.locale,
+            'comparison_level':self.comparison_level,
+            'case_sensitive': self.case_sensitive,
+            'keys_only': self.keys_only
+            }))
+
+def unicode_frozenset_from_data(args,kwargs = None):
+    if kwargs is None:
+        kwargs = {}
+    if kwargs.get('keys_only'):
+        return unicode_frozenset.from_iterable(args[0], args[0], **kwargs)
+    return unicode_frozenset(*args,**kwargs)
+
+def _zip_sort_keys(sort_keys, values):
+    '''Pair the collation keys of sort_keys with the values in the same order.
+    Raise ValueError if the two iterables don't have the same length.
+    '''
+    sort_keys = iter(sort_keys)
+    marker = object()
+    for val in values:
+        sort_key = next(sort_keys, marker)
+        if sort_key is marker:
+            raise ValueError('sort_keys has fewer items than the values')
+        yield sort_key, val
+    if next(sort_keys, marker) is not marker:
+        raise ValueError('sort_keys has more items than the values')
\ No newline at end of file
@@ -19,6 +19,11 @@ class UnicodeStrFactory(object):
             self.__base_coll.setStrength(0)
             self.__base_coll.setAttribute(UCollAttribute.CASE_LEVEL, UCollAttributeValue.OFF)
 
+        factory = self
+        class unicode_str(unicode_str_base):
+            _factory = factory
+        self.__str_class = unicode_str
+
     @property
     def locale(self):
         return self.__locale.getName()
@@ -41,13 +46,17 @@ class UnicodeStrFactory(object):
     __marker = object()
 
     def __call__(self,obj,encoding=__marker, errors='strict'):
-        class unicode_str(unicode_str_base):
-            _factory = self
-
         if encoding == self.__marker:
-            return unicode_str(obj)
+            return self.__str_class(obj)
         else:
-            return unicode_str(obj,encoding=encoding,errors=errors)
+            return self.__str_class(obj,encoding=encoding,errors=errors)
+
+    def from_sort_key(self,string,sort_key):
+        '''Create a string reusing sort_key instead of computing it again.
+        sort_key must come from a collator with the same configuration
+        (e.g. the sort_key of a unicode_dict or unicode_set with the same parameters)
+        '''
+        return self.__str_class._from_sort_key(string,sort_key)
 
     def __reduce__(self):
         inst_dict = vars(self).copy()
@@ -73,6 +82,17 @@ class unicode_str_base(str):
         #     super(unicode_str_base,self).__init__(string,encoding=encoding,errors=errors)
         self.__strKey = self._factory.collator.getSortKey(self)
 
+    @classmethod
+    def _from_sort_key(cls, string, sort_key):
+        self = cls.__new__(cls, string)
+        self.__strKey = sort_key
+        return self
+
+    def sort_key(self):
+        '''Return the collation key of the string
+        '''
+        return self.__strKey
+
     def key_for_caching(self):
         '''Only method added. Used to extract a key suitable for external caching (e.g: redis)
         return the comparison string base64 encoded without final \\n
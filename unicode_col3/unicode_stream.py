@@ -0,0 +1,521 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+from icu import Collator, Locale, UCollAttribute, UCollAttributeValue
+from collections import deque
+from itertools import groupby, islice
+from operator import itemgetter
+import pickle as pickle
+import heapq
+import multiprocessing
+import os
+import struct
+import tempfile
+
+def _make_collator(locale='en_US', comparison_level=0, case_sensitive=False):
+    '''Return a collator with the comparison details used by the containers
+    '''
+    collator = Collator.createInstance(Locale(locale))
+    collator.setStrength(max(0,min(3,comparison_level)))
+    collator.setAttribute(UCollAttribute.CASE_LEVEL,
+        UCollAttributeValue.ON if case_sensitive else UCollAttributeValue.OFF)
+    return collator
+
+def _key_function(key):
+    '''Accept a function of the record or the name (or index) of a field
+    '''
+    return key if callable(key) else itemgetter(key)
+
+class _temp_file(object):
+    '''Temporary file written once and then read back in order.
+    The file is closed when the writing is finished (finish), so the files
+    waiting to be merged don't keep a file descriptor each. Subclasses define
+    write and _read.
+    '''
+
+    def __init__(self, tmpdir=None):
+        fd, self._path = tempfile.mkstemp(dir=tmpdir)
+        self._file = os.fdopen(fd, 'wb')
+
+    def finish(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __iter__(self):
+        self.finish()
+        fp = open(self._path, 'rb')
+        try:
+            for obj in self._read(fp):
+                yield obj
+        finally:
+            fp.close()
+            self.remove()
+
+    def remove(self):
+        self.finish()
+        if self._path is not None:
+            try:
+                os.remove(self._path)
+            except OSError:
+                pass
+            self._path = None
+
+    def __del__(self):
+        self.remove()
+
+class _spill_file(_temp_file):
+    '''Temporary file of pickled objects
+    '''
+
+    def write(self, objs):
+        dump = pickle.dump
+        for obj in objs:
+            dump(obj, self._file, 2)
+
+    def append(self, obj):
+        pickle.dump(obj, self._file, 2)
+
+    def _read(self, fp):
+        load = pickle.load
+        try:
+            while True:
+                yield load(fp)
+        except EOFError:
+            pass
+
+# Temporary files read at the same time by a merge
+_MAX_OPEN_RUNS = 64
+
+def _merge_passes(files, merge, new_file):
+    '''Merge groups of consecutive files into new files until at most
+    _MAX_OPEN_RUNS are left, so that no merge opens more files than that.
+    merge returns the merged objects of a list of files, new_file returns an
+    empty temporary file.
+    '''
+    while len(files) > _MAX_OPEN_RUNS:
+        merged = []
+        for i in range(0, len(files), _MAX_OPEN_RUNS):
+            group = files[i:i + _MAX_OPEN_RUNS]
+            if len(group) == 1:
+                merged.extend(group)
+                continue
+            f = new_file()
+            f.write(merge(group))
+            f.finish()
+            merged.append(f)
+        files = merged
+    return files
+
+##
+# Run files of external_sort: a frame for each (collation key, record) pair with
+# the length of the collation key, the length and the type of the record,
+# followed by the collation key and the record (utf8 for strings, else pickled)
+_RUN_FRAME = struct.Struct('<IIB')
+_RUN_TEXT = 0
+_RUN_PICKLE = 1
+
+class _run_file(_temp_file):
+    '''Temporary file of (collation key, record) pairs
+    '''
+
+    def write(self, pairs):
+        write = self._file.write
+        pack = _RUN_FRAME.pack
+        for sort_key, record in pairs:
+            if isinstance(record, str):
+                data, kind = record.encode('utf8'), _RUN_TEXT
+            else:
+                data, kind = pickle.dumps(record, 2), _RUN_PICKLE
+            write(pack(len(sort_key), len(data), kind))
+            write(sort_key)
+            write(data)
+
+    def _read(self, fp):
+        read = fp.read
+        size = _RUN_FRAME.size
+        unpack = _RUN_FRAME.unpack
+        while True:
+            frame = read(size)
+            if not frame:
+                return
+            key_len, data_len, kind = unpack(frame)
+            sort_key = read(key_len)
+            data = read(data_len)
+            yield sort_key, data.decode('utf8') if kind == _RUN_TEXT else pickle.loads(data)
+
+##
+# Reducers: aggregate the records of a group without keeping all of them.
+# The accumulators are pickled when group_by spills to disk.
+class reducer(object):
+    '''Base reducer: subclasses define how a record is added to the accumulator
+    of a group and how two accumulators of the same group are merged.
+    '''
+
+    def initial(self):
+        raise NotImplementedError
+
+    def add(self, acc, record):
+        raise NotImplementedError
+
+    def merge(self, acc, other):
+        raise NotImplementedError
+
+    def result(self, acc):
+        return acc
+
+class list_reducer(reducer):
+    '''Keep all the records of the group in a list
+    '''
+
+    def initial(self):
+        return []
+
+    def add(self, acc, record):
+        acc.append(record)
+        return acc
+
+    def merge(self, acc, other):
+        acc.extend(other)
+        return acc
+
+class count_reducer(reducer):
+    '''Count the records of the group
+    '''
+
+    def initial(self):
+        return 0
+
+    def add(self, acc, record):
+        return acc + 1
+
+    def merge(self, acc, other):
+        return acc + other
+
+class sum_reducer(reducer):
+    '''Sum a value of the records of the group.
+    value is a function of the record or the name (or index) of a field.
+    '''
+
+    def __init__(self, value):
+        self.__value = _key_function(value)
+
+    def initial(self):
+        return 0
+
+    def add(self, acc, record):
+        return acc + self.__value(record)
+
+    def merge(self, acc, other):
+        return acc + other
+
+class first_reducer(reducer):
+    '''Keep the first record of the group
+    '''
+
+    def initial(self):
+        return ()
+
+    def add(self, acc, record):
+        return acc or (record,)
+
+    def merge(self, acc, other):
+        return acc or other
+
+    def result(self, acc):
+        return acc[0]
+
+def group_by(records, key, reducer=None, presorted=False, max_groups=None, tmpdir=None, **kwargs):
+    '''Group an iterable of records by a string, comparing the strings with the
+    collation, and yield a (key, result) pair for each group in collation order.
+    The key of a group is the first one found in the records.
+
+    key is a function of the record or the name (or index) of a field. The
+    records of a group are aggregated by reducer (default list_reducer).
+    If presorted is True the records are already sorted in collation order and
+    the groups are yielded lazily, keeping a single group at a time. Otherwise
+    at most max_groups groups are kept in memory (None means no limit): when
+    there are more, they are written sorted to a temporary file in tmpdir and
+    the files are merged at the end, at most _MAX_OPEN_RUNS at a time (in more
+    passes if there are more). The kwargs set the comparison details.
+    '''
+    key = _key_function(key)
+    if reducer is None:
+        reducer = list_reducer()
+    get_key = _make_collator(**kwargs).getSortKey
+    if presorted:
+        return _group_sorted(records, key, get_key, reducer)
+    return _group_unsorted(records, key, get_key, reducer, max_groups, tmpdir)
+
+def _group_sorted(records, key, get_key, reducer):
+    add = reducer.add
+    for _, group in groupby(records, lambda record: get_key(key(record))):
+        record = next(group)
+        first = key(record)
+        acc = add(reducer.initial(), record)
+        for record in group:
+            acc = add(acc, record)
+        yield first, reducer.result(acc)
+
+def _group_unsorted(records, key, get_key, reducer, max_groups, tmpdir):
+    add = reducer.add
+    groups = {} # collation key -> [key, accumulator]
+    runs = []
+    for record in records:
+        k = key(record)
+        sort_key = get_key(k)
+        group = groups.get(sort_key)
+        if group is None:
+            if max_groups is not None and len(groups) >= max_groups:
+                run = _spill_file(tmpdir)
+                run.write((sort_key, k, acc) for sort_key,(k, acc) in sorted(groups.items()))
+                run.finish()
+                runs.append(run)
+                groups.clear()
+            group = groups[sort_key] = [k, reducer.initial()]
+        group[1] = add(group[1], record)
+
+    last = ((sort_key, k, acc) for sort_key,(k, acc) in sorted(groups.items()))
+    if not runs:
+        for _, k, acc in last:
+            yield k, reducer.result(acc)
+        return
+
+    merge = lambda runs: _merge_groups(runs, reducer)
+    runs = _merge_passes(runs, merge, lambda: _spill_file(tmpdir))
+    for _, k, acc in merge(runs + [last]):
+        yield k, reducer.result(acc)
+
+def _merge_groups(runs, reducer):
+    '''Merge runs of (collation key, key, accumulator) sorted by collation key,
+    the earlier runs first for the same collation key
+    '''
+    def numbered(run, i):
+        for sort_key, k, acc in run:
+            yield sort_key, i, k, acc
+    merged = heapq.merge(*[numbered(run, i) for i, run in enumerate(runs)])
+    for sort_key, group in groupby(merged, itemgetter(0)):
+        _, _, k, acc = next(group)
+        for _, _, _, other in group:
+            acc = reducer.merge(acc, other)
+        yield sort_key, k, acc
+
+def dedupe(records, key=None, keep='first', max_keys=None, partitions=16, tmpdir=None, **kwargs):
+    '''Yield the records of an iterable without the duplicates, comparing the
+    strings with the collation, in the order they are found.
+
+    key is a function of the record or the name (or index) of a field, None
+    means the records are the strings. keep is 'first' to keep the first record
+    of each string (yielded lazily, as soon as it is found) or 'last' to keep the
+    last one (yielded when the iterable is exhausted). At most max_keys collation
+    keys are kept in memory (None means no limit): beyond that the records are
+    written to partitions temporary files in tmpdir by the hash of the collation
+    key and deduplicated one file at a time in the same way, splitting again
+    with a different hash the files with more keys, then merged back in their
+    order, so the records must be picklable. The kwargs set the comparison details.
+    '''
+    if keep not in ('first', 'last'):
+        raise ValueError("keep must be 'first' or 'last'")
+    if partitions < 1:
+        raise ValueError('partitions must be at least 1')
+    if max_keys is not None and max_keys < 1:
+        raise ValueError('max_keys must be at least 1')
+    get_key = _make_collator(**kwargs).getSortKey
+    if key is not None:
+        key = _key_function(key)
+        sort_key = lambda record: get_key(key(record))
+    else:
+        sort_key = get_key
+    if keep == 'first':
+        return _dedupe_first(records, sort_key, max_keys, partitions, tmpdir)
+    return _dedupe_last(records, sort_key, max_keys, partitions, tmpdir)
+
+def _dedupe_first(records, sort_key, max_keys, partitions, tmpdir):
+    seen = set()
+    runs = None
+    for i, record in enumerate(records):
+        k = sort_key(record)
+        if k in seen:
+            continue
+        if max_keys is None or len(seen) < max_keys:
+            seen.add(k)
+            yield record
+            continue
+        # The records already yielded are in seen, the others go to disk
+        if runs is None:
+            runs = [_spill_file(tmpdir) for _ in range(partitions)]
+        runs[hash((0, k)) % partitions].append((i, k, record))
+    if runs is None:
+        return
+    seen = None
+    for record in _dedupe_runs(runs, True, max_keys, partitions, tmpdir, []):
+        yield record
+
+def _dedupe_last(records, sort_key, max_keys, partitions, tmpdir):
+    kept = {} # collation key -> (position, record)
+    runs = None
+    for i, record in enumerate(records):
+        k = sort_key(record)
+        if max_keys is None or len(kept) < max_keys or k in kept:
+            kept[k] = (i, record)
+            continue
+        if runs is None:
+            runs = [_spill_file(tmpdir) for _ in range(partitions)]
+        runs[hash((0, k)) % partitions].append((i, k, record))
+    last = sorted(iter(kept.values()), key=itemgetter(0))
+    kept = None
+    if runs is None:
+        return (record for _, record in last)
+    return _dedupe_runs(runs, False, max_keys, partitions, tmpdir, last)
+
+def _dedupe_runs(runs, first, max_keys, partitions, tmpdir, last):
+    '''Deduplicate each partition keeping the first or the last record of each
+    collation key, then merge the survivors, and the (position, record) pairs
+    of last, by the position of the records. A partition with more than
+    max_keys collation keys keeps max_keys of them and splits the others again,
+    with a different hash, so that at most max_keys are in memory.
+    '''
+    survivors = []
+    for run in runs:
+        run.finish()
+    pending = [(1, run) for run in runs]
+    while pending:
+        level, run = pending.pop()
+        kept = {}
+        runs = None
+        for i, k, record in run:
+            if k in kept:
+                if not first:
+                    kept[k] = (i, record)
+            elif len(kept) < max_keys:
+                kept[k] = (i, record)
+            else:
+                if runs is None:
+                    runs = [_spill_file(tmpdir) for _ in range(partitions)]
+                runs[hash((level, k)) % partitions].append((i, k, record))
+        if kept:
+            survivor = _spill_file(tmpdir)
+            survivor.write(sorted(iter(kept.values()), key=itemgetter(0)))
+            survivor.finish()
+            survivors.append(survivor)
+        kept = None
+        if runs is not None:
+            for run in runs:
+                run.finish()
+            pending.extend((level + 1, run) for run in runs)
+    merge = lambda files: heapq.merge(*files)
+    survivors = _merge_passes(survivors, merge, lambda: _spill_file(tmpdir))
+    for _, record in merge(survivors + [last]):
+        yield record
+
+def external_sort(records, key=None, max_records=1000000, processes=None, tmpdir=None, **kwargs):
+    '''Yield the records of an iterable sorted by collation. The sort is stable.
+
+    key is a function of the record or the name (or index) of a field, None
+    means the records are the strings. The records are sorted in runs of
+    max_records, written to temporary files in tmpdir and merged, at most
+    _MAX_OPEN_RUNS files at a time (in more passes if there are more): strings
+    are stored as utf8, the other records must be picklable. A single run is
+    in memory at a time, so at most max_records records are kept. With
+    processes the collation keys of the runs are computed by that many worker
+    processes (key must then return strings) and up to processes more runs
+    wait in memory for their keys. The kwargs set the comparison details.
+    '''
+    if max_records < 1:
+        raise ValueError('max_records must be at least 1')
+    if key is not None:
+        key = _key_function(key)
+    if processes is not None and processes > 1:
+        runs = _parallel_runs(records, key, max_records, processes, kwargs)
+    else:
+        runs = _runs(records, key, max_records, kwargs)
+    return _merge_runs(runs, tmpdir)
+
+def _chunks(records, size):
+    '''Yield lists of at most size records and whether they are the last one.
+    The end is found reading a single record ahead, not a whole list.
+    '''
+    records = iter(records)
+    marker = object()
+    chunk = list(islice(records, size))
+    while chunk:
+        following = next(records, marker)
+        if following is marker:
+            yield chunk, True
+            return
+        yield chunk, False
+        chunk = [following]
+        chunk.extend(islice(records, size - 1))
+
+def _sorted_run(chunk, sort_keys):
+    run = list(zip(sort_keys, chunk))
+    run.sort(key=itemgetter(0))
+    return run
+
+def _runs(records, key, max_records, kwargs):
+    get_key = _make_collator(**kwargs).getSortKey
+    for chunk, last in _chunks(records, max_records):
+        strings = chunk if key is None else [key(record) for record in chunk]
+        sort_keys = [get_key(i) for i in strings]
+        strings = None
+        yield _sorted_run(chunk, sort_keys), last
+
+_collators = {} # collators of the worker processes by comparison details
+
+def _sort_keys(strings, kwargs):
+    params = tuple(sorted(kwargs.items()))
+    try:
+        collator = _collators[params]
+    except KeyError:
+        collator = _collators[params] = _make_collator(**kwargs)
+    get_key = collator.getSortKey
+    return [get_key(i) for i in strings]
+
+def _parallel_runs(records, key, max_records, processes, kwargs):
+    pool = multiprocessing.Pool(processes)
+    try:
+        # At most processes runs are waiting for their collation keys
+        pending = deque()
+        for chunk, last in _chunks(records, max_records):
+            strings = chunk if key is None else [key(record) for record in chunk]
+            pending.append((chunk, last, pool.apply_async(_sort_keys, (strings, kwargs))))
+            if len(pending) >= processes:
+                chunk, last, sort_keys = pending.popleft()
+                yield _sorted_run(chunk, sort_keys.get()), last
+        while pending:
+            chunk, last, sort_keys = pending.popleft()
+            yield _sorted_run(chunk, sort_keys.get()), last
+    finally:
+        pool.terminate()
+
+def _merge_runs(runs, tmpdir):
+    files = []
+    for run, last in runs:
+        if last:
+            break
+        f = _run_file(tmpdir)
+        f.write(run)
+        f.finish()
+        files.append(f)
+        # Released before the next run is read
+        run = None
+    else:
+        return
+    if not files:
+        for _, record in run:
+            yield record
+        return
+
+    new_file = lambda: _run_file(tmpdir)
+    files = _merge_passes(files, _merge_sorted, new_file)
+    for _, record in _merge_sorted(files + [run]):
+        yield record
+
+def _merge_sorted(runs):
+    '''Merge runs of (collation key, record) pairs sorted by collation key,
+    the earlier runs first for the same collation key to keep the sort stable
+    '''
+    def numbered(run, i):
+        for j, (sort_key, record) in enumerate(run):
+            yield sort_key, i, j, record
+    for sort_key, _, _, record in heapq.merge(*[numbered(run, i) for i, run in enumerate(runs)]):
+        yield sort_key, record